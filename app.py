@@ -94,6 +94,11 @@ if database_url.startswith('postgresql'):
         'pool_recycle': 3600,
         'connect_args': {'connect_timeout': 10},
     })
+    if database_url.startswith(('postgresql://', 'postgresql+psycopg2://')):
+        # psycopg2 only: batch executemany UPDATEs (bulk_update_mappings in
+        # the pathway pipeline) into pages instead of one round-trip per row.
+        # Engine-wide, so it applies to every executemany the app issues.
+        _engine_options['executemany_mode'] = 'values_plus_batch'
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = _engine_options
 
 # Initialize SQLAlchemy with app
@@ -306,6 +306,7 @@ class PathwayParent(db.Model):
 
     # Constraints
     __table_args__ = (
+        # Also the composite (child, parent) index used by link lookups and tuple IN fetches
         db.UniqueConstraint('child_pathway_id', 'parent_pathway_id', name='pathway_parent_unique'),
         db.CheckConstraint('child_pathway_id != parent_pathway_id', name='no_self_parent'),
         db.Index('idx_pathway_parents_child', 'child_pathway_id'),
@@ -174,6 +174,9 @@ def migrate():
             ("idx_pathways_hierarchy_level", "CREATE INDEX IF NOT EXISTS idx_pathways_hierarchy_level ON pathways(hierarchy_level)"),
             ("idx_pathways_is_leaf", "CREATE INDEX IF NOT EXISTS idx_pathways_is_leaf ON pathways(is_leaf)"),
             ("idx_pathways_ontology", "CREATE INDEX IF NOT EXISTS idx_pathways_ontology ON pathways(ontology_source, ontology_id)"),
+            # Backs the (child, parent) link lookups; matches the pathway_parent_unique
+            # constraint, so this is a no-op on tables created from the current model
+            ("pathway_parent_unique", "CREATE UNIQUE INDEX IF NOT EXISTS pathway_parent_unique ON pathway_parents(child_pathway_id, parent_pathway_id)"),
         ]
 
         for idx_name, idx_sql in indexes:
@@ -38,6 +38,7 @@ from scripts.pathway_hierarchy.hierarchy_utils import (
     ScriptStats,
     save_run_report,
     get_app_context,
+    insert_parent_links,
 )
 
 # =============================================================================
@@ -193,6 +194,33 @@ def create_parent_link(session, child_id: int, parent_id: int, source: str = 'on
     return True
 
 
+def create_parent_links(session, links: List[Tuple[int, int]], source: str = 'ontology') -> int:
+    """
+    Create many parent-child relationships with chunked INSERTs.
+
+    Pairs that already exist are skipped via ON CONFLICT on the
+    (child, parent) unique constraint, same as save_dag_to_db.
+
+    Args:
+        session: Database session
+        links: (child_id, parent_id) pairs
+        source: Value for PathwayParent.source
+
+    Returns:
+        Number of links created
+    """
+    return insert_parent_links(session, [
+        {
+            'child_pathway_id': child_id,
+            'parent_pathway_id': parent_id,
+            'relationship_type': 'is_a',
+            'confidence': 1.0,
+            'source': source,
+        }
+        for child_id, parent_id in links
+    ])
+
+
 def update_leaf_status(session):
     """Update is_leaf status for all pathways."""
     from models import Pathway, PathwayParent
@@ -258,7 +286,7 @@ def main():
             logger.info("-" * 40)
 
             sub_ids = {}
-            links_created = 0
+            pending_links = []
 
             for parent_name, subcats in INITIAL_SUB_CATEGORIES.items():
                 # Find parent ID
@@ -287,13 +315,13 @@ def main():
                     )
                     sub_ids[subcat['name']] = sub_id
 
-                    # Create parent link
-                    if create_parent_link(db.session, sub_id, parent_id, source='ontology'):
-                        links_created += 1
+                    # Parent links are inserted in one batch below
+                    pending_links.append((sub_id, parent_id))
 
                     logger.info(f"    - {subcat['name']} (ID: {sub_id})")
                     stats.items_processed += 1
 
+            links_created = create_parent_links(db.session, pending_links, source='ontology')
             db.session.commit()
             checkpoint_mgr.save(phase=2, data={'sub_ids': sub_ids})
             logger.info(f"Created {len(sub_ids)} sub-categories, {links_created} parent links")
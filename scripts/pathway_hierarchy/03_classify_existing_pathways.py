@@ -18,7 +18,7 @@ Batching: 10 pathways per AI call to avoid context window issues
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, Set, Optional, Callable
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -48,6 +48,7 @@ from scripts.pathway_hierarchy.pathway_config import ROOT_CATEGORY_NAMES
 
 
 BATCH_SIZE = 10  # Pathways per AI call
+AI_MAX_CONCURRENCY = 4  # AI calls in flight at once in Phase 3
 
 # ROOT categories imported from central config
 ROOT_CATEGORIES = ROOT_CATEGORY_NAMES
@@ -276,34 +277,65 @@ def classify_by_name_similarity(session, pathway_name: str) -> Optional[int]:
     return best_match
 
 
+def classify_with_ai(
+    ai_needed: List[Dict],
+    hierarchy_tree: str,
+    logger,
+    on_batch: Optional[Callable[[List[Dict], Dict[int, Dict]], None]] = None
+) -> Dict[int, Dict]:
+    """
+    Run the AI classification calls for all pathways concurrently.
+
+    Only the LLM calls run on worker threads. on_batch(batch, classifications)
+    runs on the main thread as each batch completes, so it can apply the
+    chains and checkpoint before the remaining calls finish.
+
+    Returns:
+        Dict mapping pathway ID -> {hierarchy_chain, confidence, reasoning}
+    """
+    def classify(batch: List[Dict]) -> Dict[int, Dict]:
+        classifications = classify_pathways_batch(
+            [{'name': pw['name'], 'description': pw['description']} for pw in batch],
+            hierarchy_tree
+        )
+        return {
+            pw['id']: classifications[pw['name']]
+            for pw in batch
+            if pw['name'] in classifications
+        }
+
+    outcome = process_in_batches(
+        ai_needed,
+        BATCH_SIZE,
+        classify,
+        logger=logger,
+        max_concurrency=AI_MAX_CONCURRENCY,
+        on_result=(
+            (lambda batch_num, batch, classifications: on_batch(batch, classifications))
+            if on_batch is not None else None
+        ),
+    )
+    for error in outcome['errors']:
+        logger.error(f"AI classification failed: {error['error']}")
+    return outcome['results']
+
+
 def process_ai_classification_batch(
     batch: List[Dict],
-    hierarchy_tree: str,
+    classifications: Dict[int, Dict],
     session,
     logger
 ) -> Dict[int, Dict]:
     """
-    Process a batch of pathways through AI classification.
+    Apply AI classifications for a batch of pathways.
 
     NEW: Uses hierarchy_chain response format from AI.
     Each classification contains a full chain from ROOT to the pathway.
     """
-    from models import Pathway
-
-    # Format batch for AI
-    batch_for_ai = [
-        {'name': pw['name'], 'description': pw['description']}
-        for pw in batch
-    ]
-
     try:
-        # NEW: classify_pathways_batch now returns {name: {hierarchy_chain, confidence, reasoning}}
-        classifications = classify_pathways_batch(batch_for_ai, hierarchy_tree)
-
-        # Map results back to pathway IDs and process hierarchy chains
         results = {}
         for pw in batch:
-            classification = classifications.get(pw['name'], {})
+            classification = classifications.get(pw['id'], {})
             hierarchy_chain = classification.get('hierarchy_chain', [])
             confidence = classification.get('confidence', 0.85)
 
@@ -439,20 +471,13 @@ def main():
                 hierarchy_tree = get_hierarchy_tree_string(db.session)
                 logger.info(f"Hierarchy tree prepared ({len(hierarchy_tree)} chars)")
 
-                # Process in batches
                 progress = ProgressTracker(len(ai_needed), "AI classification")
 
-                for i in range(0, len(ai_needed), BATCH_SIZE):
-                    batch = ai_needed[i:i + BATCH_SIZE]
-                    batch_num = i // BATCH_SIZE + 1
-                    total_batches = (len(ai_needed) + BATCH_SIZE - 1) // BATCH_SIZE
-
-                    logger.info(f"[Batch {batch_num}/{total_batches}] Processing {len(batch)} pathways...")
-
+                def apply_batch(batch: List[Dict], classifications: Dict[int, Dict]) -> None:
                     # NEW: process_ai_classification_batch now uses hierarchy_chain
                     # and calls ensure_hierarchy_chain_local() which creates all links
                     results = process_ai_classification_batch(
-                        batch, hierarchy_tree, db.session, logger
+                        batch, classifications, db.session, logger
                     )
 
                     # NEW: Results format is {child_id: {leaf_id, hierarchy_chain, confidence}}
@@ -473,9 +498,9 @@ def main():
                     # Save checkpoint
                     checkpoint_mgr.save(phase=3, data={'processed_ids': list(processed_ids)})
 
-                    # Rate limiting
-                    import time
-                    time.sleep(1.5)
+                # AI calls run concurrently; each batch is applied and
+                # checkpointed on this thread as soon as its call returns
+                classify_with_ai(ai_needed, hierarchy_tree, logger, on_batch=apply_batch)
 
             # Phase 4: Update hierarchy levels
             logger.info("")
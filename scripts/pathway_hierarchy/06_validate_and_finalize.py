@@ -61,10 +61,7 @@ def validate_dag_structure(dag: PathwayDAG, logger) -> Tuple[bool, List[str]]:
     if not roots:
         errors.append("No root nodes found!")
     else:
-        reachable = set()
-        for root in roots:
-            reachable.add(root.id)
-            reachable.update(dag.get_descendants(root.id))
+        reachable = dag.get_reachable_from_roots()
 
         unreachable = set(dag.nodes.keys()) - reachable
         if unreachable:
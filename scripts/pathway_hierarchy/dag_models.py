@@ -15,7 +15,7 @@ pathways before persisting to the database.
 
 from dataclasses import dataclass, field
 from typing import Dict, List, Set, Optional, Tuple
-from collections import defaultdict
+from collections import defaultdict, deque
 import json
 
 
@@ -48,6 +48,10 @@ class PathwayNode:
     ancestor_ids: Set[int] = field(default_factory=set)
     is_ai_generated: bool = False
     description: Optional[str] = None
+    _name_lower: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._name_lower = self.name.lower()
 
     def is_root(self) -> bool:
         """True if this pathway has no parents (top-level category)."""
@@ -57,21 +61,29 @@ class PathwayNode:
         """True if this pathway has no children (most specific level)."""
         return len(self.child_ids) == 0
 
-    def to_dict(self) -> Dict:
-        """Convert to dictionary for JSON serialization."""
-        return {
+    def to_dict(self, include_edges: bool = True) -> Dict:
+        """
+        Convert to dictionary for JSON serialization.
+
+        Args:
+            include_edges: If False, omit parent_ids/child_ids (PathwayDAG.to_dict
+                stores adjacency once as a global edge list instead)
+        """
+        data = {
             'id': self.id,
             'name': self.name,
             'ontology_id': self.ontology_id,
             'ontology_source': self.ontology_source,
-            'parent_ids': list(self.parent_ids),
-            'child_ids': list(self.child_ids),
             'hierarchy_level': self.hierarchy_level,
             'protein_count': self.protein_count,
             'ancestor_ids': list(self.ancestor_ids),
             'is_ai_generated': self.is_ai_generated,
             'description': self.description,
         }
+        if include_edges:
+            data['parent_ids'] = list(self.parent_ids)
+            data['child_ids'] = list(self.child_ids)
+        return data
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'PathwayNode':
@@ -117,6 +129,8 @@ class PathwayDAG:
         self.nodes: Dict[int, PathwayNode] = {}
         self.name_to_id: Dict[str, int] = {}  # Lowercase name -> ID for lookups
         self._next_temp_id: int = -1  # For nodes without DB IDs yet
+        self._roots: Set[int] = set()  # IDs of nodes with no parents
+        self._leaves: Set[int] = set()  # IDs of nodes with no children
 
     def add_node(self, node: PathwayNode) -> None:
         """
@@ -132,15 +146,31 @@ class PathwayDAG:
             self._next_temp_id -= 1
 
         self.nodes[node.id] = node
-        self.name_to_id[node.name.lower()] = node.id
+        self.name_to_id[node._name_lower] = node.id
+
+        if node.is_root():
+            self._roots.add(node.id)
+        else:
+            self._roots.discard(node.id)
+        if node.is_leaf():
+            self._leaves.add(node.id)
+        else:
+            self._leaves.discard(node.id)
 
     def get_node(self, node_id: int) -> Optional[PathwayNode]:
         """Get node by ID, or None if not found."""
         return self.nodes.get(node_id)
 
-    def get_node_by_name(self, name: str) -> Optional[PathwayNode]:
-        """Get node by name (case-insensitive), or None if not found."""
-        node_id = self.name_to_id.get(name.lower())
+    def get_node_by_name(self, name: str, already_lower: bool = False) -> Optional[PathwayNode]:
+        """
+        Get node by name (case-insensitive), or None if not found.
+
+        Args:
+            name: Pathway name to look up
+            already_lower: Set when the caller has lowercased name itself
+                (e.g. once up front for a bulk lookup) to skip re-lowercasing
+        """
+        node_id = self.name_to_id.get(name if already_lower else name.lower())
         return self.nodes.get(node_id) if node_id is not None else None
 
     def add_edge(self, child_id: int, parent_id: int) -> bool:
@@ -164,8 +194,7 @@ class PathwayDAG:
         if self._would_create_cycle(child_id, parent_id):
             return False
 
-        self.nodes[child_id].parent_ids.add(parent_id)
-        self.nodes[parent_id].child_ids.add(child_id)
+        self._link(child_id, parent_id)
         return True
 
     def remove_edge(self, child_id: int, parent_id: int) -> bool:
@@ -173,29 +202,44 @@ class PathwayDAG:
         if child_id not in self.nodes or parent_id not in self.nodes:
             return False
 
-        self.nodes[child_id].parent_ids.discard(parent_id)
-        self.nodes[parent_id].child_ids.discard(child_id)
+        self._unlink(child_id, parent_id)
         return True
 
+    def _link(self, child_id: int, parent_id: int) -> None:
+        """Record edge child->parent and keep the root/leaf sets in sync (no checks)."""
+        self.nodes[child_id].parent_ids.add(parent_id)
+        self.nodes[parent_id].child_ids.add(child_id)
+        self._roots.discard(child_id)
+        self._leaves.discard(parent_id)
+
+    def _unlink(self, child_id: int, parent_id: int) -> None:
+        """Drop edge child->parent and keep the root/leaf sets in sync (no checks)."""
+        child = self.nodes[child_id]
+        parent = self.nodes[parent_id]
+        child.parent_ids.discard(parent_id)
+        parent.child_ids.discard(child_id)
+        if not child.parent_ids:
+            self._roots.add(child_id)
+        if not parent.child_ids:
+            self._leaves.add(parent_id)
+
     def _would_create_cycle(self, child_id: int, parent_id: int) -> bool:
         """Check if adding edge child->parent would create a cycle."""
-        # If parent is reachable from child via existing edges, adding this edge creates a cycle
+        # A cycle appears iff child is already an ancestor of parent. Walking up
+        # from parent only visits its ancestor set, which in a hierarchy is far
+        # smaller than the subtree a downward walk from child would cover.
+        nodes = self.nodes
         visited = set()
-        stack = [child_id]
+        stack = list(nodes[parent_id].parent_ids)
 
         while stack:
             current = stack.pop()
-            if current == parent_id:
-                continue  # Skip the proposed parent
-            if current in visited:
+            if current == child_id:
+                return True  # Cycle detected
+            if current in visited or current not in nodes:
                 continue
             visited.add(current)
-
-            # Follow children (descendants)
-            for child in self.nodes[current].child_ids:
-                if child == parent_id:
-                    return True  # Cycle detected
-                stack.append(child)
+            stack.extend(nodes[current].parent_ids)
 
         return False
 
@@ -211,18 +255,7 @@ class PathwayDAG:
         """
         if node_id not in self.nodes:
             return set()
-
-        ancestors = set()
-        stack = list(self.nodes[node_id].parent_ids)
-
-        while stack:
-            parent_id = stack.pop()
-            if parent_id not in ancestors:
-                ancestors.add(parent_id)
-                if parent_id in self.nodes:
-                    stack.extend(self.nodes[parent_id].parent_ids)
-
-        return ancestors
+        return self._get_ancestors_unchecked(node_id)
 
     def get_descendants(self, node_id: int) -> Set[int]:
         """
@@ -236,26 +269,69 @@ class PathwayDAG:
         """
         if node_id not in self.nodes:
             return set()
+        return self._get_descendants_unchecked(node_id)
 
-        descendants = set()
-        stack = list(self.nodes[node_id].child_ids)
+    def _get_ancestors_unchecked(self, node_id: int) -> Set[int]:
+        """
+        Ancestor walk without per-edge membership checks.
 
-        while stack:
-            child_id = stack.pop()
-            if child_id not in descendants:
-                descendants.add(child_id)
-                if child_id in self.nodes:
-                    stack.extend(self.nodes[child_id].child_ids)
+        Assumes node_id and every referenced parent exist in self.nodes, which
+        holds for edges added through add_edge. New parents are merged into the
+        frontier with a set difference rather than item by item.
+        """
+        nodes = self.nodes
+        ancestors = set(nodes[node_id].parent_ids)
+        frontier = deque(ancestors)
+
+        while frontier:
+            new_ids = nodes[frontier.popleft()].parent_ids - ancestors
+            if new_ids:
+                ancestors |= new_ids
+                frontier.extend(new_ids)
+
+        return ancestors
+
+    def _get_descendants_unchecked(self, node_id: int) -> Set[int]:
+        """Descendant walk without per-edge membership checks (see _get_ancestors_unchecked)."""
+        nodes = self.nodes
+        descendants = set(nodes[node_id].child_ids)
+        frontier = deque(descendants)
+
+        while frontier:
+            new_ids = nodes[frontier.popleft()].child_ids - descendants
+            if new_ids:
+                descendants |= new_ids
+                frontier.extend(new_ids)
 
         return descendants
 
     def get_roots(self) -> List[PathwayNode]:
         """Get all root nodes (nodes with no parents)."""
-        return [n for n in self.nodes.values() if n.is_root()]
+        return [self.nodes[nid] for nid in self._roots]
 
     def get_leaves(self) -> List[PathwayNode]:
         """Get all leaf nodes (nodes with no children)."""
-        return [n for n in self.nodes.values() if n.is_leaf()]
+        return [self.nodes[nid] for nid in self._leaves]
+
+    def get_reachable_from_roots(self) -> Set[int]:
+        """
+        Get IDs of all nodes reachable from any root (roots included).
+
+        Single multi-source traversal, so subtrees shared by several roots
+        are only walked once.
+        """
+        nodes = self.nodes
+        reachable = set()
+        queue = deque(self._roots)
+
+        while queue:
+            node_id = queue.popleft()
+            if node_id in reachable or node_id not in nodes:
+                continue
+            reachable.add(node_id)
+            queue.extend(nodes[node_id].child_ids)
+
+        return reachable
 
     def topological_sort(self) -> List[int]:
         """
@@ -301,7 +377,7 @@ class PathwayDAG:
 
         for node_id in self.topological_sort():
             node = self.nodes[node_id]
-            if node.is_root():
+            if node_id in self._roots:
                 levels[node_id] = 0
             else:
                 # Level is max parent level + 1 (for DAG with multiple parents)
@@ -396,10 +472,7 @@ class PathwayDAG:
         if not roots and self.nodes:
             errors.append("No root nodes found (all nodes have parents)")
         else:
-            reachable = set()
-            for root in roots:
-                reachable.add(root.id)
-                reachable.update(self.get_descendants(root.id))
+            reachable = self.get_reachable_from_roots()
 
             unreachable = set(self.nodes.keys()) - reachable
             if unreachable:
@@ -467,20 +540,46 @@ class PathwayDAG:
         return min(paths, key=len)
 
     def to_dict(self) -> Dict:
-        """Serialize DAG to dictionary for JSON storage."""
+        """
+        Serialize DAG to dictionary for JSON storage.
+
+        Nodes carry scalar attributes only; each edge is stored once in a
+        flat [child_id, parent_id] list rather than twice per node.
+        """
         return {
-            'nodes': {str(nid): node.to_dict() for nid, node in self.nodes.items()},
-            'name_to_id': self.name_to_id,
+            'nodes': [node.to_dict(include_edges=False) for node in self.nodes.values()],
+            'edges': [
+                [child_id, parent_id]
+                for child_id, node in self.nodes.items()
+                for parent_id in node.parent_ids
+            ],
         }
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'PathwayDAG':
-        """Deserialize DAG from dictionary."""
+        """
+        Deserialize DAG from dictionary.
+
+        Accepts both the edge-list format written by to_dict and the older
+        format (nodes keyed by ID with per-node parent_ids/child_ids).
+        """
         dag = cls()
-        for nid_str, node_data in data.get('nodes', {}).items():
-            node = PathwayNode.from_dict(node_data)
-            dag.nodes[int(nid_str)] = node
-        dag.name_to_id = data.get('name_to_id', {})
+        nodes_data = data.get('nodes', [])
+
+        if isinstance(nodes_data, dict):
+            # Legacy format: adjacency duplicated on every node
+            for nid_str, node_data in nodes_data.items():
+                node = PathwayNode.from_dict(node_data)
+                node.id = int(nid_str)
+                dag.add_node(node)
+            return dag
+
+        for node_data in nodes_data:
+            dag.add_node(PathwayNode.from_dict(node_data))
+
+        for child_id, parent_id in data.get('edges', []):
+            dag._link(child_id, parent_id)
+
         return dag
 
     def save_to_file(self, filepath: str) -> None:
@@ -559,7 +658,7 @@ def save_dag_to_db(dag: PathwayDAG, db_session, update_existing: bool = True) ->
     Returns:
         Dict with statistics: {created, updated, edges_created}
     """
-    from models import Pathway, PathwayParent
+    from models import Pathway
 
     stats = {'created': 0, 'updated': 0, 'edges_created': 0}
 
@@ -574,6 +673,7 @@ def save_dag_to_db(dag: PathwayDAG, db_session, update_existing: bool = True) ->
 
     # Save/update pathways
     id_mapping = {}  # temp_id -> db_id
+    new_pathways = []  # (temp_id, Pathway) pairs, flushed together below
 
     for node in dag.nodes.values():
         if node.id < 0:  # Temporary ID, create new record
@@ -588,10 +688,7 @@ def save_dag_to_db(dag: PathwayDAG, db_session, update_existing: bool = True) ->
                 protein_count=node.protein_count,
                 ancestor_ids=list(node.ancestor_ids),
             )
-            db_session.add(pw)
-            db_session.flush()  # Get the ID
-            id_mapping[node.id] = pw.id
-            stats['created'] += 1
+            new_pathways.append((node.id, pw))
         else:
             if update_existing:
                 pw = db_session.query(Pathway).get(node.id)
@@ -605,28 +702,28 @@ def save_dag_to_db(dag: PathwayDAG, db_session, update_existing: bool = True) ->
                     stats['updated'] += 1
             id_mapping[node.id] = node.id
 
-    # Save parent-child relationships
-    for node in dag.nodes.values():
-        db_child_id = id_mapping.get(node.id, node.id)
-
-        for parent_id in node.parent_ids:
-            db_parent_id = id_mapping.get(parent_id, parent_id)
-
-            # Check if relationship already exists
-            existing = db_session.query(PathwayParent).filter_by(
-                child_pathway_id=db_child_id,
-                parent_pathway_id=db_parent_id
-            ).first()
-
-            if not existing:
-                link = PathwayParent(
-                    child_pathway_id=db_child_id,
-                    parent_pathway_id=db_parent_id,
-                    relationship_type='is_a',
-                    confidence=1.0,
-                    source='hierarchy_script',
-                )
-                db_session.add(link)
-                stats['edges_created'] += 1
+    if new_pathways:
+        db_session.add_all([pw for _, pw in new_pathways])
+        db_session.flush()  # One flush assigns IDs to every new pathway
+        for temp_id, pw in new_pathways:
+            id_mapping[temp_id] = pw.id
+        stats['created'] = len(new_pathways)
+
+    # Save parent-child relationships with chunked Core INSERTs; ON CONFLICT
+    # on the (child, parent) unique constraint skips pairs that already exist.
+    from scripts.pathway_hierarchy.hierarchy_utils import insert_parent_links
+
+    new_edges = [
+        {
+            'child_pathway_id': id_mapping.get(node.id, node.id),
+            'parent_pathway_id': id_mapping.get(parent_id, parent_id),
+            'relationship_type': 'is_a',
+            'confidence': 1.0,
+            'source': 'hierarchy_script',
+        }
+        for node in dag.nodes.values()
+        for parent_id in node.parent_ids
+    ]
+    stats['edges_created'] = insert_parent_links(db_session, new_edges)
 
     return stats
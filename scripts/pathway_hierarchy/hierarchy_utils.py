@@ -10,15 +10,25 @@ Provides:
 """
 
 import os
+import re
 import sys
 import json
 import time
 import logging
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Callable, Optional, TypeVar
 from dataclasses import dataclass, asdict
 
+try:
+    from rapidfuzz.fuzz import ratio as _fuzz_ratio
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
@@ -66,24 +76,69 @@ def get_app_context():
 T = TypeVar('T')
 
 
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting how often work may start.
+
+    Tokens refill at `rate_per_second` up to `burst`; acquire() blocks until
+    a token is available.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 def process_in_batches(
     items: List[T],
     batch_size: int,
     processor: Callable[[List[T]], Dict],
     delay_between_batches: float = 1.5,
     verbose: bool = True,
-    logger: Optional[logging.Logger] = None
+    logger: Optional[logging.Logger] = None,
+    max_concurrency: int = 1,
+    rate_per_second: Optional[float] = None,
+    on_result: Optional[Callable[[int, List[T], Dict], None]] = None,
 ) -> Dict[str, Any]:
     """
     Process items in batches with retry logic.
 
+    With max_concurrency == 1 batches run sequentially, sleeping
+    delay_between_batches between them. With max_concurrency > 1 batches
+    are submitted to a thread pool (for I/O-bound processors); only
+    max_concurrency bounds the load unless rate_per_second is given, in
+    which case a token bucket paces every processor call, including
+    per-item retries. on_result always runs on the calling thread, as each
+    batch finishes, so it may use the DB session and save checkpoints.
+
     Args:
         items: List of items to process
         batch_size: Number of items per batch
         processor: Function that processes a batch and returns results dict
-        delay_between_batches: Seconds to wait between batches
+        delay_between_batches: Seconds to wait between batches (sequential mode)
         verbose: Whether to log progress
         logger: Logger instance (uses default if None)
+        max_concurrency: Number of batches in flight at once
+        rate_per_second: Max processor calls started per second in concurrent
+            mode (None: not throttled)
+        on_result: Called as on_result(batch_num, batch, batch_results) once
+            per finished batch (in completion order when concurrent)
 
     Returns:
         Combined results from all batches
@@ -96,34 +151,76 @@ def process_in_batches(
     processed = 0
     errors = []
 
-    for i in range(0, len(items), batch_size):
-        batch = items[i:i + batch_size]
-        batch_num = i // batch_size + 1
+    limiter = (
+        RateLimiter(rate_per_second)
+        if max_concurrency > 1 and rate_per_second else None
+    )
+
+    def call(batch: List[T]) -> Dict:
+        if limiter is not None:
+            limiter.acquire()
+        return processor(batch)
+
+    def run_batch(batch_num: int, batch: List[T]):
+        """Run one batch, falling back to per-item retries on failure."""
+        batch_out = {}
+        batch_errors = []
+        batch_processed = 0
 
         if verbose:
             logger.info(f"[Batch {batch_num}/{total_batches}] Processing {len(batch)} items...")
 
         try:
-            batch_results = processor(batch)
-            results.update(batch_results)
-            processed += len(batch)
+            batch_out.update(call(batch))
+            batch_processed += len(batch)
         except Exception as e:
             logger.error(f"[Batch {batch_num}] Error: {e}")
-            errors.append({'batch': batch_num, 'error': str(e)})
+            batch_errors.append({'batch': batch_num, 'error': str(e)})
 
             # Retry individual items
             for item in batch:
                 try:
-                    single_result = processor([item])
-                    results.update(single_result)
-                    processed += 1
+                    batch_out.update(call([item]))
+                    batch_processed += 1
                 except Exception as e2:
                     logger.error(f"[Single item] Error: {e2}")
-                    errors.append({'item': str(item), 'error': str(e2)})
-
-        # Rate limiting
-        if i + batch_size < len(items):
-            time.sleep(delay_between_batches)
+                    batch_errors.append({'item': str(item), 'error': str(e2)})
+
+        return batch_out, batch_processed, batch_errors
+
+    batches = [
+        (i // batch_size + 1, items[i:i + batch_size])
+        for i in range(0, len(items), batch_size)
+    ]
+
+    if max_concurrency <= 1:
+        for batch_num, batch in batches:
+            batch_out, batch_processed, batch_errors = run_batch(batch_num, batch)
+            results.update(batch_out)
+            processed += batch_processed
+            errors.extend(batch_errors)
+            if on_result is not None:
+                on_result(batch_num, batch, batch_out)
+
+            # Rate limiting
+            if batch_num < total_batches:
+                time.sleep(delay_between_batches)
+    else:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {executor.submit(run_batch, num, batch): (num, batch) for num, batch in batches}
+            try:
+                for future in as_completed(futures):
+                    batch_out, batch_processed, batch_errors = future.result()
+                    results.update(batch_out)
+                    processed += batch_processed
+                    errors.extend(batch_errors)
+                    if on_result is not None:
+                        on_result(*futures[future], batch_out)
+            except BaseException:
+                # Don't start queued batches on the way out (e.g. Ctrl-C)
+                for future in futures:
+                    future.cancel()
+                raise
 
     return {
         'results': results,
@@ -260,10 +357,35 @@ class ProgressTracker:
 # Pathway Name Normalization
 # =============================================================================
 
+# Greek letter mapping (common in pathway names), applied in one translate() pass
+_GREEK_TRANS = str.maketrans({
+    'κ': 'k',
+    'β': 'beta',
+    'α': 'alpha',
+    'γ': 'gamma',
+    'δ': 'delta',
+    'ε': 'epsilon',
+    'ω': 'omega',
+})
+
+_RE_HYPHEN = re.compile(r'(?<=[a-zA-Z0-9])-(?=[a-zA-Z0-9])')
+_RE_PUNCT = re.compile(r'[^\w\s]')
+_RE_WS = re.compile(r'\s+')
+
+# Each prefix is stripped at most once, in this order
+_RE_PREFIX = re.compile(r'^(?:positive regulation of )?(?:negative regulation of )?(?:regulation of )?')
+# Any run of trailing suffix words ("... signaling pathway" -> "...")
+_RE_SUFFIX = re.compile(r'(?:\s+(?:pathway|signall?ing|process|cascade|response))+$')
+
+
+@functools.lru_cache(maxsize=100_000)
 def normalize_pathway_name(name: str) -> str:
     """
     Normalize a pathway name for comparison and deduplication.
 
+    Pure function of its input, so results are memoized (pathway names
+    repeat heavily across dedup and matching passes).
+
     Transformations:
     - Lowercase
     - Greek letter substitution (κ→k, β→beta, α→alpha, γ→gamma, δ→delta)
@@ -277,47 +399,25 @@ def normalize_pathway_name(name: str) -> str:
         "NF-kB Signaling"        → "nfkb"
         "TGF-beta Signaling"     → "tgfbeta"
     """
-    import re
-
-    # Greek letter mapping (common in pathway names)
-    greek_map = {
-        'κ': 'k',
-        'β': 'beta',
-        'α': 'alpha',
-        'γ': 'gamma',
-        'δ': 'delta',
-        'ε': 'epsilon',
-        'ω': 'omega',
-    }
-
     name = name.lower()
 
     # Replace Greek letters
-    for greek, latin in greek_map.items():
-        name = name.replace(greek, latin)
+    name = name.translate(_GREEK_TRANS)
 
     # Remove hyphens between alphanumeric chars (NF-kB → NFkB)
-    name = re.sub(r'(?<=[a-zA-Z0-9])-(?=[a-zA-Z0-9])', '', name)
+    name = _RE_HYPHEN.sub('', name)
 
     # Remove punctuation (except already handled hyphens)
-    name = re.sub(r'[^\w\s]', '', name)
+    name = _RE_PUNCT.sub('', name)
 
     # Collapse whitespace
-    name = re.sub(r'\s+', ' ', name).strip()
-
-    # Remove common prefixes (order matters - longest first)
-    for prefix in ['positive regulation of ', 'negative regulation of ', 'regulation of ']:
-        if name.startswith(prefix):
-            name = name[len(prefix):]
-
-    # Remove common suffixes (apply repeatedly until no more matches)
-    changed = True
-    while changed:
-        changed = False
-        for suffix in [' pathway', ' signaling', ' signalling', ' process', ' cascade', ' response']:
-            if name.endswith(suffix):
-                name = name[:-len(suffix)]
-                changed = True
+    name = _RE_WS.sub(' ', name).strip()
+
+    # Remove common prefixes
+    name = _RE_PREFIX.sub('', name, count=1)
+
+    # Remove common suffixes (all trailing ones in a single pass)
+    name = _RE_SUFFIX.sub('', name, count=1)
 
     return name.strip()
 
@@ -328,14 +428,16 @@ def pathway_name_similarity(name1: str, name2: str) -> float:
 
     Returns float between 0 (no match) and 1 (exact match).
     """
-    from difflib import SequenceMatcher
-
     norm1 = normalize_pathway_name(name1)
     norm2 = normalize_pathway_name(name2)
 
     if norm1 == norm2:
         return 1.0
 
+    if RAPIDFUZZ_AVAILABLE:
+        return _fuzz_ratio(norm1, norm2) / 100.0
+
+    from difflib import SequenceMatcher
     return SequenceMatcher(None, norm1, norm2).ratio()
 
 
@@ -380,11 +482,53 @@ def run_with_savepoint(func: Callable, *args, **kwargs) -> Any:
             raise e
 
 
+# Rows per INSERT statement; keeps 5 columns x rows well under the driver's
+# bind-parameter limit (65535 on PostgreSQL, 32766 on SQLite).
+PARENT_LINK_CHUNK_SIZE = 1000
+
+
+def insert_parent_links(session, rows: List[Dict[str, Any]],
+                        chunk_size: int = PARENT_LINK_CHUNK_SIZE) -> int:
+    """
+    Insert PathwayParent rows in chunks, skipping existing pairs.
+
+    Each chunk is one multi-row INSERT with ON CONFLICT DO NOTHING on the
+    (child, parent) unique constraint.
+
+    Args:
+        session: Database session
+        rows: Column dicts for PathwayParent
+        chunk_size: Maximum rows per INSERT statement
+
+    Returns:
+        Number of links created
+    """
+    from models import PathwayParent
+
+    if not rows:
+        return 0
+
+    if session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    created = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        stmt = insert(PathwayParent).values(chunk).on_conflict_do_nothing(
+            index_elements=['child_pathway_id', 'parent_pathway_id']
+        )
+        result = session.execute(stmt)
+        created += result.rowcount if result.rowcount >= 0 else len(chunk)
+    return created
+
+
 # =============================================================================
 # Statistics and Reporting
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class ScriptStats:
     """Statistics for script execution."""
     script_name: str
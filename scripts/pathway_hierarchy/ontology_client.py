@@ -9,15 +9,37 @@ Provides functions to:
 - Map between ontology IDs and human-readable names
 """
 
+import sys
+import functools
 import requests
 import json
-import time
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.pathway_hierarchy.hierarchy_utils import RateLimiter
+
+try:
+    from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,8 +51,33 @@ KEGG_BASE = "https://rest.kegg.jp"
 # Cache directory
 CACHE_DIR = Path(__file__).parent.parent.parent / "cache" / "ontology_hierarchies"
 
+# QuickGO concurrency: parallel workers, term IDs per batched request
+# (term details / children lookups), and a request rate shared by all
+# worker threads
+QUICKGO_MAX_WORKERS = 8
+QUICKGO_BATCH_SIZE = 20
+QUICKGO_CHILDREN_BATCH_SIZE = 50
+QUICKGO_REQUESTS_PER_SECOND = 10.0
+
+# Shared HTTP session for all GO/KEGG calls: keep-alive connection pooling
+# plus automatic retry with backoff on throttling and transient server errors
+_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+_SESSION = requests.Session()
+_SESSION.headers['User-Agent'] = 'pathway-hierarchy-ontology-client/1.0 (python-requests)'
+_SESSION.mount('https://', HTTPAdapter(max_retries=_RETRY, pool_connections=16, pool_maxsize=16))
+_SESSION.mount('http://', HTTPAdapter(max_retries=_RETRY, pool_connections=16, pool_maxsize=16))
 
-@dataclass
+_QUICKGO_LIMITER = RateLimiter(QUICKGO_REQUESTS_PER_SECOND, burst=QUICKGO_MAX_WORKERS)
+
+
+def _quickgo_get(url: str, **kwargs) -> requests.Response:
+    """Rate-limited GET against QuickGO through the shared session."""
+    _QUICKGO_LIMITER.acquire()
+    kwargs.setdefault('timeout', 30)
+    return _SESSION.get(url, headers={'Accept': 'application/json'}, **kwargs)
+
+
+@dataclass(slots=True)
 class OntologyTerm:
     """Represents a single ontology term (GO or KEGG)."""
     id: str  # e.g., "GO:0006914" or "hsa04140"
@@ -54,13 +101,15 @@ class OntologyTerm:
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'OntologyTerm':
+        # IDs recur across many parent/child sets; intern them so every
+        # occurrence shares one string object
         return cls(
-            id=data['id'],
+            id=sys.intern(data['id']),
             name=data['name'],
-            source=data['source'],
+            source=sys.intern(data['source']),
             definition=data.get('definition'),
-            parent_ids=set(data.get('parent_ids', [])),
-            child_ids=set(data.get('child_ids', [])),
+            parent_ids={sys.intern(pid) for pid in data.get('parent_ids', ())},
+            child_ids={sys.intern(cid) for cid in data.get('child_ids', ())},
             relationship_types=data.get('relationship_types', {}),
         )
 
@@ -72,10 +121,48 @@ class OntologyHierarchy:
         self.source = source  # "GO" or "KEGG"
         self.terms: Dict[str, OntologyTerm] = {}
         self.name_to_id: Dict[str, str] = {}  # Lowercase name -> ID
+        # Parallel lists (same order) scanned by find_best_ontology_match
+        self.term_ids: List[str] = []
+        self.names_lower: List[str] = []
+        self._token_index: Optional[Dict[str, List[int]]] = None  # Built lazily
+        # Transitive closures, filled by compute_closures()
+        self._ancestors: Optional[Dict[str, FrozenSet[str]]] = None
+        self._descendants: Optional[Dict[str, FrozenSet[str]]] = None
 
     def add_term(self, term: OntologyTerm) -> None:
+        term.id = sys.intern(term.id)
+        term.source = sys.intern(term.source)
+        name_lower = term.name.lower()
+        if term.id in self.terms:
+            self.names_lower[self.term_ids.index(term.id)] = name_lower
+        else:
+            self.term_ids.append(term.id)
+            self.names_lower.append(name_lower)
         self.terms[term.id] = term
-        self.name_to_id[term.name.lower()] = term.id
+        self.name_to_id[name_lower] = term.id
+        self._token_index = None
+        self._ancestors = None
+        self._descendants = None
+
+    def build_token_index(self) -> Dict[str, List[int]]:
+        """
+        Build (and cache) an inverted index: whitespace token -> positions in
+        term_ids/names_lower of every term whose name contains that token.
+        """
+        index: Dict[str, List[int]] = defaultdict(list)
+        for idx, name_lower in enumerate(self.names_lower):
+            for token in set(name_lower.split()):
+                index[token].append(idx)
+        self._token_index = dict(index)
+        return self._token_index
+
+    def get_candidate_indices(self, name_lower: str) -> List[int]:
+        """Positions of terms sharing at least one token with name_lower (sorted)."""
+        index = self._token_index if self._token_index is not None else self.build_token_index()
+        candidates = set()
+        for token in name_lower.split():
+            candidates.update(index.get(token, ()))
+        return sorted(candidates)
 
     def get_term(self, term_id: str) -> Optional[OntologyTerm]:
         return self.terms.get(term_id)
@@ -84,37 +171,69 @@ class OntologyHierarchy:
         term_id = self.name_to_id.get(name.lower())
         return self.terms.get(term_id) if term_id else None
 
-    def get_ancestors(self, term_id: str) -> Set[str]:
+    def get_ancestors(self, term_id: str) -> FrozenSet[str]:
         """Get all ancestors of a term (transitive closure)."""
-        if term_id not in self.terms:
-            return set()
+        if self._ancestors is None:
+            self.compute_closures()
+        return self._ancestors.get(term_id, frozenset())
 
-        ancestors = set()
-        stack = list(self.terms[term_id].parent_ids)
-
-        while stack:
-            parent_id = stack.pop()
-            if parent_id not in ancestors and parent_id in self.terms:
-                ancestors.add(parent_id)
-                stack.extend(self.terms[parent_id].parent_ids)
-
-        return ancestors
-
-    def get_descendants(self, term_id: str) -> Set[str]:
+    def get_descendants(self, term_id: str) -> FrozenSet[str]:
         """Get all descendants of a term (transitive closure)."""
-        if term_id not in self.terms:
-            return set()
-
-        descendants = set()
-        stack = list(self.terms[term_id].child_ids)
-
-        while stack:
-            child_id = stack.pop()
-            if child_id not in descendants and child_id in self.terms:
-                descendants.add(child_id)
-                stack.extend(self.terms[child_id].child_ids)
-
-        return descendants
+        if self._descendants is None:
+            self.compute_closures()
+        return self._descendants.get(term_id, frozenset())
+
+    def compute_closures(self) -> None:
+        """
+        Precompute ancestor and descendant sets for every term.
+
+        add_term resets the closures; call this again after editing
+        parent_ids/child_ids directly.
+        """
+        self._ancestors = self._closure({tid: t.parent_ids for tid, t in self.terms.items()})
+        self._descendants = self._closure({tid: t.child_ids for tid, t in self.terms.items()})
+
+    def _closure(self, edges: Dict[str, Set[str]]) -> Dict[str, FrozenSet[str]]:
+        """
+        Transitive closure of `edges` restricted to known terms.
+
+        Terms are resolved in dependency order (each after all of its
+        neighbours), so every closure is a union of already-computed ones.
+        Terms on or behind a cycle fall back to an explicit walk.
+        """
+        neighbours = {tid: [n for n in ids if n in edges] for tid, ids in edges.items()}
+        dependents: Dict[str, List[str]] = defaultdict(list)
+        for tid, ids in neighbours.items():
+            for n in ids:
+                dependents[n].append(tid)
+
+        remaining = {tid: len(ids) for tid, ids in neighbours.items()}
+        ready = deque(tid for tid, count in remaining.items() if count == 0)
+        closure: Dict[str, FrozenSet[str]] = {}
+
+        while ready:
+            tid = ready.popleft()
+            reach = set(neighbours[tid])
+            for n in neighbours[tid]:
+                reach |= closure[n]
+            closure[tid] = frozenset(reach)
+            for dep in dependents[tid]:
+                remaining[dep] -= 1
+                if remaining[dep] == 0:
+                    ready.append(dep)
+
+        for tid in edges:
+            if tid not in closure:
+                reach = set()
+                stack = list(neighbours[tid])
+                while stack:
+                    n = stack.pop()
+                    if n not in reach:
+                        reach.add(n)
+                        stack.extend(neighbours[n])
+                closure[tid] = frozenset(reach)
+
+        return closure
 
     def get_roots(self) -> List[OntologyTerm]:
         """Get all root terms (no parents)."""
@@ -129,22 +248,42 @@ class OntologyHierarchy:
     @classmethod
     def from_dict(cls, data: Dict) -> 'OntologyHierarchy':
         hierarchy = cls(data['source'])
+        intern = sys.intern
+        # Build terms straight from the parsed JSON (same fields as
+        # OntologyTerm.from_dict, without the per-term classmethod call)
         for tid, tdata in data.get('terms', {}).items():
-            hierarchy.add_term(OntologyTerm.from_dict(tdata))
+            hierarchy.add_term(OntologyTerm(
+                id=intern(tid),
+                name=tdata['name'],
+                source=intern(tdata['source']),
+                definition=tdata.get('definition'),
+                parent_ids={intern(pid) for pid in tdata.get('parent_ids', ())},
+                child_ids={intern(cid) for cid in tdata.get('child_ids', ())},
+                relationship_types=tdata.get('relationship_types', {}),
+            ))
+        hierarchy.compute_closures()
         return hierarchy
 
     def save_to_file(self, filepath: Path) -> None:
         filepath.parent.mkdir(parents=True, exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
         logger.info(f"Saved {len(self.terms)} terms to {filepath}")
 
     @classmethod
     def load_from_file(cls, filepath: Path) -> Optional['OntologyHierarchy']:
         if not filepath.exists():
             return None
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if ORJSON_AVAILABLE:
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         hierarchy = cls.from_dict(data)
         logger.info(f"Loaded {len(hierarchy.terms)} terms from {filepath}")
         return hierarchy
@@ -161,10 +300,9 @@ def fetch_go_term(go_id: str) -> Optional[Dict]:
     API: GET /ontology/go/terms/{ids}
     """
     url = f"{QUICKGO_BASE}/ontology/go/terms/{go_id}"
-    headers = {'Accept': 'application/json'}
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = _quickgo_get(url)
         response.raise_for_status()
         data = response.json()
 
@@ -176,6 +314,26 @@ def fetch_go_term(go_id: str) -> Optional[Dict]:
         return None
 
 
+def fetch_go_terms(go_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Fetch several GO terms in one QuickGO request.
+
+    API: GET /ontology/go/terms/{id1,id2,...}
+    Returns dict mapping GO ID -> term data (missing IDs are omitted).
+    """
+    url = f"{QUICKGO_BASE}/ontology/go/terms/{','.join(go_ids)}"
+
+    try:
+        response = _quickgo_get(url)
+        response.raise_for_status()
+        data = response.json()
+
+        return {r['id']: r for r in data.get('results', []) if r.get('id')}
+    except Exception as e:
+        logger.error(f"Error fetching GO terms {go_ids[0]}...({len(go_ids)}): {e}")
+        return {}
+
+
 def fetch_go_ancestors(go_id: str) -> List[Dict]:
     """
     Fetch all ancestors of a GO term.
@@ -184,10 +342,9 @@ def fetch_go_ancestors(go_id: str) -> List[Dict]:
     Returns list of ancestor terms with relationship info.
     """
     url = f"{QUICKGO_BASE}/ontology/go/terms/{go_id}/ancestors"
-    headers = {'Accept': 'application/json'}
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = _quickgo_get(url)
         response.raise_for_status()
         data = response.json()
 
@@ -197,24 +354,27 @@ def fetch_go_ancestors(go_id: str) -> List[Dict]:
         return []
 
 
-def fetch_go_children(go_id: str) -> List[Dict]:
+def fetch_go_children(go_ids: List[str]) -> Dict[str, List[Dict]]:
     """
-    Fetch direct children of a GO term.
+    Fetch direct children of several GO terms in one request.
+
+    API: GET /ontology/go/terms/{id1,id2,...}/children
+    Each result is one of the requested terms with its 'children' list.
 
-    API: GET /ontology/go/terms/{ids}/children
+    Returns:
+        Dict mapping GO ID -> list of child dicts (each with 'id', 'relation')
     """
-    url = f"{QUICKGO_BASE}/ontology/go/terms/{go_id}/children"
-    headers = {'Accept': 'application/json'}
+    url = f"{QUICKGO_BASE}/ontology/go/terms/{','.join(go_ids)}/children"
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = _quickgo_get(url)
         response.raise_for_status()
         data = response.json()
 
-        return data.get('results', [])
+        return {r['id']: r.get('children') or [] for r in data.get('results', []) if r.get('id')}
     except Exception as e:
-        logger.error(f"Error fetching children for {go_id}: {e}")
-        return []
+        logger.error(f"Error fetching children for {go_ids[0]}...({len(go_ids)}): {e}")
+        return {}
 
 
 def fetch_go_descendants(go_id: str, relation: str = "is_a,part_of") -> List[Dict]:
@@ -225,10 +385,9 @@ def fetch_go_descendants(go_id: str, relation: str = "is_a,part_of") -> List[Dic
     """
     url = f"{QUICKGO_BASE}/ontology/go/terms/{go_id}/descendants"
     params = {'relations': relation}
-    headers = {'Accept': 'application/json'}
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=60)
+        response = _quickgo_get(url, params=params, timeout=60)
         response.raise_for_status()
         data = response.json()
 
@@ -251,43 +410,60 @@ def build_go_subgraph(root_go_ids: List[str], max_depth: int = 5) -> OntologyHie
     """
     hierarchy = OntologyHierarchy("GO")
     visited = set()
-    queue = [(go_id, 0) for go_id in root_go_ids]
+    queue = deque((go_id, 0) for go_id in root_go_ids)
+
+    # Process one BFS layer at a time: term details are fetched in batched
+    # requests and children lookups fan out across a thread pool.
+    with ThreadPoolExecutor(max_workers=QUICKGO_MAX_WORKERS) as executor:
+        while queue:
+            depth = queue[0][1]
+            if depth > max_depth:
+                break  # BFS order: everything left is deeper
+
+            layer = []
+            while queue and queue[0][1] == depth:
+                go_id, _ = queue.popleft()
+                if go_id not in visited:
+                    visited.add(go_id)
+                    layer.append(go_id)
+
+            # Fetch term info
+            term_data = {}
+            batches = [layer[i:i + QUICKGO_BATCH_SIZE] for i in range(0, len(layer), QUICKGO_BATCH_SIZE)]
+            for batch_data in executor.map(fetch_go_terms, batches):
+                term_data.update(batch_data)
+            layer = [go_id for go_id in layer if go_id in term_data]
+
+            # Fetch children for the whole layer
+            children_map = {}
+            batches = [
+                layer[i:i + QUICKGO_CHILDREN_BATCH_SIZE]
+                for i in range(0, len(layer), QUICKGO_CHILDREN_BATCH_SIZE)
+            ]
+            for batch_children in executor.map(fetch_go_children, batches):
+                children_map.update(batch_children)
+
+            for go_id in layer:
+                children = children_map.get(go_id, [])
+                data = term_data[go_id]
+                term = OntologyTerm(
+                    id=go_id,
+                    name=data.get('name', go_id),
+                    source='GO',
+                    definition=(data.get('definition') or {}).get('text'),
+                )
 
-    while queue:
-        go_id, depth = queue.pop(0)
-
-        if go_id in visited or depth > max_depth:
-            continue
-        visited.add(go_id)
-
-        # Fetch term info
-        term_data = fetch_go_term(go_id)
-        if not term_data:
-            continue
-
-        # Create term
-        term = OntologyTerm(
-            id=go_id,
-            name=term_data.get('name', go_id),
-            source='GO',
-            definition=term_data.get('definition', {}).get('text'),
-        )
-
-        # Fetch and add children
-        children = fetch_go_children(go_id)
-        for child in children:
-            child_id = child.get('id')
-            if child_id:
-                term.child_ids.add(child_id)
-                # Queue child for processing
-                if child_id not in visited:
-                    queue.append((child_id, depth + 1))
+                for child in children:
+                    child_id = child.get('id')
+                    if child_id:
+                        term.child_ids.add(child_id)
+                        # Queue child for processing
+                        if child_id not in visited:
+                            queue.append((child_id, depth + 1))
 
-        hierarchy.add_term(term)
-        time.sleep(0.2)  # Rate limiting
+                hierarchy.add_term(term)
 
-        if len(visited) % 50 == 0:
-            logger.info(f"Processed {len(visited)} GO terms...")
+            logger.info(f"Processed {len(visited)} GO terms (depth {depth})...")
 
     # Second pass: set parent_ids based on child_ids
     for term_id, term in hierarchy.terms.items():
@@ -295,6 +471,7 @@ def build_go_subgraph(root_go_ids: List[str], max_depth: int = 5) -> OntologyHie
             if child_id in hierarchy.terms:
                 hierarchy.terms[child_id].parent_ids.add(term_id)
 
+    hierarchy.compute_closures()
     logger.info(f"Built GO subgraph with {len(hierarchy.terms)} terms")
     return hierarchy
 
@@ -313,18 +490,11 @@ def fetch_kegg_pathway_list(organism: str = "hsa") -> List[Tuple[str, str]]:
     url = f"{KEGG_BASE}/list/pathway/{organism}"
 
     try:
-        response = requests.get(url, timeout=30)
+        response = _SESSION.get(url, timeout=30)
         response.raise_for_status()
 
-        pathways = []
-        for line in response.text.strip().split('\n'):
-            if '\t' in line:
-                parts = line.split('\t')
-                pathway_id = parts[0].replace('path:', '')
-                pathway_name = parts[1] if len(parts) > 1 else pathway_id
-                pathways.append((pathway_id, pathway_name))
-
-        return pathways
+        rows = [line.split('\t') for line in response.text.splitlines() if '\t' in line]
+        return [(parts[0].replace('path:', ''), parts[1]) for parts in rows]
     except Exception as e:
         logger.error(f"Error fetching KEGG pathway list: {e}")
         return []
@@ -339,20 +509,23 @@ def fetch_kegg_pathway_info(pathway_id: str) -> Optional[Dict]:
     url = f"{KEGG_BASE}/get/{pathway_id}"
 
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        # Stream the flat file line by line; stop once all fields are found
+        with _SESSION.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            response.encoding = response.encoding or 'utf-8'
 
-        # Parse KEGG flat file format
-        info = {'id': pathway_id, 'name': '', 'class': '', 'description': ''}
-        current_field = None
+            info = {'id': pathway_id, 'name': '', 'class': '', 'description': ''}
 
-        for line in response.text.split('\n'):
-            if line.startswith('NAME'):
-                info['name'] = line[12:].strip()
-            elif line.startswith('CLASS'):
-                info['class'] = line[12:].strip()
-            elif line.startswith('DESCRIPTION'):
-                info['description'] = line[12:].strip()
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith('NAME'):
+                    info['name'] = line[12:].strip()
+                elif line.startswith('CLASS'):
+                    info['class'] = line[12:].strip()
+                elif line.startswith('DESCRIPTION'):
+                    info['description'] = line[12:].strip()
+
+                if info['name'] and info['class'] and info['description']:
+                    break
 
         return info
     except Exception as e:
@@ -370,32 +543,30 @@ def fetch_kegg_brite_hierarchy() -> Dict[str, List[str]]:
     url = f"{KEGG_BASE}/get/br:br08901/json"
 
     try:
-        response = requests.get(url, timeout=60)
+        response = _SESSION.get(url, timeout=60)
         response.raise_for_status()
         data = response.json()
 
-        # Parse BRITE hierarchy
+        # Parse BRITE hierarchy (iterative DFS; path is an immutable tuple)
         categories = {}
+        stack = [(data, ())]
 
-        def parse_node(node, path=[]):
+        while stack:
+            node, path = stack.pop()
             name = node.get('name', '')
-            children = node.get('children', [])
+            children = node.get('children', ())
 
             if not children:
                 # Leaf node (pathway)
                 if name.startswith('hsa'):
                     pathway_id = name.split()[0]
                     category = ' > '.join(path) if path else 'Uncategorized'
-                    if category not in categories:
-                        categories[category] = []
-                    categories[category].append(pathway_id)
+                    categories.setdefault(category, []).append(pathway_id)
             else:
-                # Category node
-                new_path = path + [name] if name else path
-                for child in children:
-                    parse_node(child, new_path)
+                # Category node; push reversed so children are visited in order
+                child_path = path + (name,) if name else path
+                stack.extend((child, child_path) for child in reversed(children))
 
-        parse_node(data)
         return categories
 
     except Exception as e:
@@ -423,7 +594,6 @@ def build_kegg_hierarchy() -> OntologyHierarchy:
             source='KEGG',
         )
         hierarchy.add_term(term)
-        time.sleep(0.1)  # Rate limiting
 
     # Fetch BRITE hierarchy for classification
     brite = fetch_kegg_brite_hierarchy()
@@ -449,6 +619,7 @@ def build_kegg_hierarchy() -> OntologyHierarchy:
                 hierarchy.terms[pw_id].parent_ids.add(cat_id)
                 hierarchy.terms[cat_id].child_ids.add(pw_id)
 
+    hierarchy.compute_closures()
     logger.info(f"Built KEGG hierarchy with {len(hierarchy.terms)} terms")
     return hierarchy
 
@@ -472,6 +643,9 @@ def get_cached_go_hierarchy(
     - GO:0010467 - gene expression (Gene Expression)
     - GO:0007165 - signal transduction (Signal Transduction)
     - GO:0007010 - cytoskeleton organization (Cytoskeletal Dynamics)
+
+    The loaded hierarchy is kept in memory, so repeated calls in one process
+    don't re-read the JSON. force_refresh clears that cache.
     """
     if root_go_ids is None:
         root_go_ids = [
@@ -484,6 +658,14 @@ def get_cached_go_hierarchy(
             "GO:0007010",  # cytoskeleton organization (Cytoskeletal Dynamics)
         ]
 
+    if force_refresh:
+        _load_go_hierarchy.cache_clear()
+    return _load_go_hierarchy(tuple(root_go_ids), force_refresh)
+
+
+@functools.lru_cache(maxsize=2)
+def _load_go_hierarchy(root_go_ids: Tuple[str, ...], force_refresh: bool) -> OntologyHierarchy:
+    """Load GO hierarchy from disk (or build it); memoized per process."""
     cache_file = CACHE_DIR / "go_hierarchy.json"
 
     if not force_refresh and cache_file.exists():
@@ -492,13 +674,26 @@ def get_cached_go_hierarchy(
             return hierarchy
 
     logger.info("Building GO hierarchy from API (this may take several minutes)...")
-    hierarchy = build_go_subgraph(root_go_ids, max_depth=4)
+    hierarchy = build_go_subgraph(list(root_go_ids), max_depth=4)
     hierarchy.save_to_file(cache_file)
     return hierarchy
 
 
 def get_cached_kegg_hierarchy(force_refresh: bool = False) -> OntologyHierarchy:
-    """Get KEGG hierarchy, using cache if available."""
+    """
+    Get KEGG hierarchy, using cache if available.
+
+    The loaded hierarchy is kept in memory, so repeated calls in one process
+    don't re-read the JSON. force_refresh clears that cache.
+    """
+    if force_refresh:
+        _load_kegg_hierarchy.cache_clear()
+    return _load_kegg_hierarchy(force_refresh)
+
+
+@functools.lru_cache(maxsize=2)
+def _load_kegg_hierarchy(force_refresh: bool) -> OntologyHierarchy:
+    """Load KEGG hierarchy from disk (or build it); memoized per process."""
     cache_file = CACHE_DIR / "kegg_hierarchy.json"
 
     if not force_refresh and cache_file.exists():
@@ -512,6 +707,57 @@ def get_cached_kegg_hierarchy(force_refresh: bool = False) -> OntologyHierarchy:
     return hierarchy
 
 
+def _best_fuzzy_match(
+    name_lower: str,
+    names_lower: List[str],
+    score_cutoff: float
+) -> Optional[Tuple[int, float]]:
+    """
+    Find the candidate with the highest fuzzy similarity to name_lower.
+
+    Uses RapidFuzz's native extractOne when installed, otherwise a
+    SequenceMatcher scan.
+
+    Returns:
+        Tuple of (index into names_lower, ratio in 0-1) or None if nothing
+        reaches score_cutoff
+    """
+    if RAPIDFUZZ_AVAILABLE:
+        hit = rf_process.extractOne(
+            name_lower, names_lower, scorer=rf_fuzz.ratio, score_cutoff=score_cutoff * 100
+        )
+        if hit is None:
+            return None
+        _, score, idx = hit
+        return idx, score / 100.0
+
+    # Pure-Python fallback; install rapidfuzz (requirements.txt) for the native path
+    from difflib import SequenceMatcher
+
+    # ratio() = 2*matches/(len_a+len_b) can never exceed 2*min_len/(len_a+len_b),
+    # so try candidates in order of that bound and stop once it can't win.
+    # Ties keep the lowest index, as a plain in-order scan would.
+    query_len = len(name_lower)
+    bounds = []
+    for term_name_lower in names_lower:
+        total = query_len + len(term_name_lower)
+        bounds.append(2.0 * min(query_len, len(term_name_lower)) / total if total else 1.0)
+
+    best = None
+    best_ratio = score_cutoff
+    for idx in sorted(range(len(names_lower)), key=bounds.__getitem__, reverse=True):
+        upper = bounds[idx]
+        if upper < best_ratio:
+            break
+        if best is not None and upper == best_ratio and idx > best:
+            continue
+        ratio = SequenceMatcher(None, name_lower, names_lower[idx]).ratio()
+        if ratio > best_ratio or (ratio == best_ratio and (best is None or idx < best)):
+            best = idx
+            best_ratio = ratio
+    return (best, best_ratio) if best is not None else None
+
+
 def find_best_ontology_match(
     pathway_name: str,
     go_hierarchy: OntologyHierarchy,
@@ -528,53 +774,57 @@ def find_best_ontology_match(
     Returns:
         Tuple of (ontology_id, source, confidence) or None if no match
     """
-    from difflib import SequenceMatcher
-
     name_lower = pathway_name.lower()
     best_match = None
     best_score = 0.0
 
-    # Check GO terms
-    for term in go_hierarchy.terms.values():
-        term_name_lower = term.name.lower()
-
-        # Exact match
-        if term_name_lower == name_lower:
-            return (term.id, 'GO', 1.0)
-
-        # Substring match
-        if name_lower in term_name_lower or term_name_lower in name_lower:
-            score = 0.9
-            if score > best_score:
-                best_score = score
-                best_match = (term.id, 'GO', score)
-
-        # Fuzzy match
-        ratio = SequenceMatcher(None, name_lower, term_name_lower).ratio()
-        if ratio > 0.7 and ratio > best_score:
-            best_score = ratio
-            best_match = (term.id, 'GO', ratio)
-
-    # Check KEGG terms
-    for term in kegg_hierarchy.terms.values():
-        term_name_lower = term.name.lower()
-
-        # Exact match
-        if term_name_lower == name_lower:
-            return (term.id, 'KEGG', 1.0)
-
-        # Substring match
-        if name_lower in term_name_lower or term_name_lower in name_lower:
-            score = 0.9
-            if score > best_score:
-                best_score = score
-                best_match = (term.id, 'KEGG', score)
-
-        # Fuzzy match
-        ratio = SequenceMatcher(None, name_lower, term_name_lower).ratio()
-        if ratio > 0.7 and ratio > best_score:
-            best_score = ratio
-            best_match = (term.id, 'KEGG', ratio)
+    hierarchies = (('GO', go_hierarchy), ('KEGG', kegg_hierarchy))
+
+    # Exact match (GO preferred over KEGG)
+    for source, hierarchy in hierarchies:
+        term_id = hierarchy.name_to_id.get(name_lower)
+        if term_id is not None:
+            return (term_id, source, 1.0)
+
+    for source, hierarchy in hierarchies:
+        # Substring match (either direction) over every term: a hit needn't
+        # share a whole token ("neuronal macroautophagy" contains "autophagy")
+        if best_score < 0.9:
+            if RAPIDFUZZ_AVAILABLE:
+                # partial_ratio == 100 iff the shorter string occurs in the longer
+                hit = rf_process.extractOne(
+                    name_lower, hierarchy.names_lower, scorer=rf_fuzz.partial_ratio, score_cutoff=100
+                )
+                if hit is not None:
+                    best_score = 0.9
+                    best_match = (hierarchy.term_ids[hit[2]], source, 0.9)
+            else:
+                for term_id, term_name_lower in zip(hierarchy.term_ids, hierarchy.names_lower):
+                    if name_lower in term_name_lower or term_name_lower in name_lower:
+                        best_score = 0.9
+                        best_match = (term_id, source, 0.9)
+                        break
+
+        # Fuzzy match over every term. Scoring the terms that share a token
+        # with the query first only raises the cutoff, so the full pass can
+        # skip more terms; it still returns what an unseeded full scan would.
+        cutoff = max(0.7, best_score)
+        candidates = hierarchy.get_candidate_indices(name_lower)
+        if candidates and len(candidates) < len(hierarchy.names_lower):
+            seed = _best_fuzzy_match(
+                name_lower, [hierarchy.names_lower[i] for i in candidates], cutoff
+            )
+            if seed:
+                # Leave slack: RapidFuzz's cutoff is not exact to the last
+                # digits, and the full pass returns the best score anyway
+                cutoff = max(cutoff, seed[1] - 0.01)
+
+        hit = _best_fuzzy_match(name_lower, hierarchy.names_lower, cutoff)
+        if hit:
+            idx, ratio = hit
+            if ratio > 0.7 and ratio > best_score:
+                best_score = ratio
+                best_match = (hierarchy.term_ids[idx], source, ratio)
 
     return best_match
 
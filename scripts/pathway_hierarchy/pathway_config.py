@@ -19,13 +19,23 @@ The module provides lazy-loaded access to:
 - ROOT_CATEGORIES: List of root pathway dicts (hierarchy_level=0)
 - ROOT_CATEGORY_NAMES: Set of root pathway names for validation
 - SUB_CATEGORIES: Dict mapping parent names to child pathway lists
+
+Loaded config is also snapshotted to cache/pathway_config.json, tagged with a
+cheap revision token of the pathway tables; a new process reuses the snapshot
+while the token still matches instead of re-running the loader queries.
+
+Loader queries select plain columns and carry raiseload("*"), so any
+relationship access added later fails loudly instead of lazy-loading per row.
 """
 
+import os
 import sys
+import json
 import logging
+import threading
 from pathlib import Path
-from functools import lru_cache
-from typing import List, Dict, Set, Optional
+from functools import lru_cache, wraps
+from typing import List, Dict, FrozenSet, Optional, Tuple
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -36,9 +46,41 @@ logger = logging.getLogger(__name__)
 # Cache timeout - clear cache periodically to pick up new pathways
 _cache_initialized = False
 
+# Bumped by every _clear_cache(); see get_config_generation()
+_config_generation = 0
+
+# On-disk snapshot of the loaded config, reused while the DB revision matches
+DISK_CACHE_PATH = PROJECT_ROOT / "cache" / "pathway_config.json"
+
+# Serializes cache fills so concurrent first callers share one DB round trip.
+# Re-entrant because derived loaders call the base loaders while holding it.
+_load_lock = threading.RLock()
+
+
+def _locked_cache(func):
+    """
+    lru_cache(maxsize=1) with double-checked locking around the fill.
+
+    Warm calls skip the lock; on a miss, callers queue on _load_lock and all
+    but the first find the value already cached when they get in.
+    """
+    cached = lru_cache(maxsize=1)(func)
+
+    @wraps(func)
+    def wrapper():
+        if cached.cache_info().currsize:
+            return cached()
+        with _load_lock:
+            return cached()
 
+    wrapper.cache_clear = cached.cache_clear
+    wrapper.cache_info = cached.cache_info
+    return wrapper
+
+
+@lru_cache(maxsize=1)
 def _get_db_context():
-    """Get database context safely."""
+    """Get database context safely (imports the Flask app once)."""
     try:
         from app import app, db
         return app, db
@@ -47,20 +89,144 @@ def _get_db_context():
         return None, None
 
 
+@lru_cache(maxsize=1)
+def _get_revision_engine():
+    """
+    Lightweight engine for the revision check, built from the same env vars
+    as app.py, so a warm disk cache never needs the Flask app imported.
+    Returns None when no database URL is configured.
+    """
+    database_url = os.getenv('DATABASE_PUBLIC_URL') or os.getenv('DATABASE_URL')
+    if not database_url:
+        return None
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+    try:
+        from sqlalchemy import create_engine
+        return create_engine(database_url, pool_pre_ping=True)
+    except Exception as e:
+        logger.debug(f"Could not create revision engine: {e}")
+        return None
+
+
+def _get_db_revision(executor) -> Optional[str]:
+    """
+    Cheap revision token for the pathway tables.
+
+    Combines row counts, max ids and the latest Pathway.updated_at with a
+    fingerprint of the link columns. PathwayParent has no updated_at, so
+    reparenting a link in place only shows up in the fingerprint; the sums
+    are weighted by link id so two links swapping parents changes it too.
+
+    Args:
+        executor: Anything with .execute() - db.session inside an app
+            context, or a plain Connection
+
+    Returns:
+        Revision string, or None if it could not be read
+    """
+    try:
+        from sqlalchemy import BigInteger, cast, func, select
+        from models import Pathway, PathwayParent
+
+        link_id = cast(PathwayParent.id, BigInteger)
+        row = executor.execute(select(
+            select(func.count(Pathway.id)).scalar_subquery(),
+            select(func.max(Pathway.id)).scalar_subquery(),
+            select(func.max(Pathway.updated_at)).scalar_subquery(),
+            select(func.count(PathwayParent.id)).scalar_subquery(),
+            select(func.max(PathwayParent.id)).scalar_subquery(),
+            select(func.sum(link_id * PathwayParent.child_pathway_id)).scalar_subquery(),
+            select(func.sum(link_id * PathwayParent.parent_pathway_id)).scalar_subquery(),
+        )).one()
+        return "|".join(str(v) for v in row)
+    except Exception as e:
+        logger.warning(f"Could not read pathway revision: {e}")
+        return None
+
+
+def _load_from_disk_if_fresh(key: str):
+    """
+    Return the snapshot value for key without importing the Flask app, or
+    None if there is no usable snapshot or its revision is stale.
+    """
+    if not DISK_CACHE_PATH.exists():
+        return None
+    engine = _get_revision_engine()
+    if engine is None:
+        return None
+    try:
+        with engine.connect() as conn:
+            revision = _get_db_revision(conn)
+    except Exception as e:
+        logger.debug(f"Revision check failed: {e}")
+        return None
+    return _read_disk_cache(revision, key)
+
+
+def _read_disk_cache(revision: Optional[str], key: str):
+    """Return the cached value for key if the snapshot matches revision."""
+    if revision is None or not DISK_CACHE_PATH.exists():
+        return None
+    try:
+        with open(DISK_CACHE_PATH, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable pathway config cache: {e}")
+        return None
+    if snapshot.get("revision") != revision:
+        return None
+    return snapshot.get(key)
+
+
+def _write_disk_cache(revision: Optional[str], key: str, value) -> None:
+    """Store value under key in the snapshot for revision (atomic replace)."""
+    if revision is None:
+        return
+    snapshot = {"revision": revision}
+    try:
+        with open(DISK_CACHE_PATH, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+        if existing.get("revision") == revision:
+            snapshot = existing
+    except Exception:
+        pass
+    snapshot[key] = value
+
+    try:
+        DISK_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = DISK_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, DISK_CACHE_PATH)
+    except Exception as e:
+        logger.warning(f"Failed to save pathway config cache: {e}")
+
+
 def _clear_cache():
     """Clear all cached data - call when pathways are modified."""
-    global _cache_initialized
+    global _cache_initialized, _config_generation
     _get_root_categories_from_db.cache_clear()
     _get_sub_categories_from_db.cache_clear()
+    _get_indexes_from_db.cache_clear()
+    _get_all_names_cached.cache_clear()
+    _get_root_names_cached.cache_clear()
+    for name in _LAZY_ATTRS:
+        globals().pop(name, None)
     _cache_initialized = False
+    _config_generation += 1
 
 
-@lru_cache(maxsize=1)
+@_locked_cache
 def _get_root_categories_from_db() -> List[Dict]:
     """
     Query root categories from database (hierarchy_level = 0).
     Returns list of dicts with name, go_id, description.
     """
+    cached = _load_from_disk_if_fresh("root_categories")
+    if cached is not None:
+        return cached
+
     app, db = _get_db_context()
     if app is None:
         logger.warning("Database not available, returning empty root categories")
@@ -68,28 +234,42 @@ def _get_root_categories_from_db() -> List[Dict]:
 
     try:
         with app.app_context():
+            from sqlalchemy.orm import raiseload
             from models import Pathway
 
-            roots = Pathway.query.filter_by(hierarchy_level=0).all()
-            return [
+            revision = _get_db_revision(db.session)
+            cached = _read_disk_cache(revision, "root_categories")
+            if cached is not None:
+                return cached
+
+            roots = Pathway.query.options(raiseload("*")).filter_by(hierarchy_level=0).with_entities(
+                Pathway.name, Pathway.ontology_id, Pathway.description
+            ).all()
+            root_cats = [
                 {
-                    "name": p.name,
-                    "go_id": p.ontology_id,
-                    "description": p.description or "",
+                    "name": name,
+                    "go_id": ontology_id,
+                    "description": description or "",
                 }
-                for p in roots
+                for name, ontology_id, description in roots
             ]
+            _write_disk_cache(revision, "root_categories", root_cats)
+            return root_cats
     except Exception as e:
         logger.warning(f"Error querying root categories: {e}")
         return []
 
 
-@lru_cache(maxsize=1)
+@_locked_cache
 def _get_sub_categories_from_db() -> Dict[str, List[Dict]]:
     """
     Query sub-categories from pathway_parents relationships.
     Returns dict mapping parent name to list of child dicts.
     """
+    cached = _load_from_disk_if_fresh("sub_categories")
+    if cached is not None:
+        return cached
+
     app, db = _get_db_context()
     if app is None:
         logger.warning("Database not available, returning empty sub-categories")
@@ -97,36 +277,78 @@ def _get_sub_categories_from_db() -> Dict[str, List[Dict]]:
 
     try:
         with app.app_context():
+            from sqlalchemy.orm import aliased, raiseload
             from models import Pathway, PathwayParent
 
-            # Build parent_id -> parent_name lookup
-            pathways = {p.id: p for p in Pathway.query.all()}
-
-            # Get all parent-child links
-            links = PathwayParent.query.all()
+            revision = _get_db_revision(db.session)
+            cached = _read_disk_cache(revision, "sub_categories")
+            if cached is not None:
+                return cached
+
+            # One joined query for (parent name, child name, child ontology id)
+            ParentP = aliased(Pathway)
+            ChildP = aliased(Pathway)
+            rows = (
+                db.session.query(ParentP.name, ChildP.name, ChildP.ontology_id)
+                .select_from(PathwayParent)
+                .options(raiseload("*"))
+                .join(ParentP, PathwayParent.parent_pathway_id == ParentP.id)
+                .join(ChildP, PathwayParent.child_pathway_id == ChildP.id)
+                .order_by(PathwayParent.id)
+                .all()
+            )
 
             sub_cats = {}
-            for link in links:
-                parent = pathways.get(link.parent_pathway_id)
-                child = pathways.get(link.child_pathway_id)
-
-                if parent and child:
-                    if parent.name not in sub_cats:
-                        sub_cats[parent.name] = []
-                    sub_cats[parent.name].append({
-                        "name": child.name,
-                        "go_id": child.ontology_id,
-                    })
-
+            for parent_name, child_name, child_go_id in rows:
+                if parent_name not in sub_cats:
+                    sub_cats[parent_name] = []
+                sub_cats[parent_name].append({
+                    "name": child_name,
+                    "go_id": child_go_id,
+                })
+
+            _write_disk_cache(revision, "sub_categories", sub_cats)
             return sub_cats
     except Exception as e:
         logger.warning(f"Error querying sub-categories: {e}")
         return {}
 
 
-def get_root_category_names() -> Set[str]:
+@_locked_cache
+def _get_indexes_from_db() -> Tuple[Dict[str, str], Dict[str, Tuple[str, ...]]]:
+    """
+    Build lookup indexes over the sub-category links.
+    Returns (child name -> first parent name, parent name -> child names).
+    """
+    child_to_parent = {}
+    parent_to_children = {}
+    for parent, children in _get_sub_categories_from_db().items():
+        names = tuple(child["name"] for child in children)
+        parent_to_children[parent] = names
+        for name in names:
+            child_to_parent.setdefault(name, parent)
+    return child_to_parent, parent_to_children
+
+
+@_locked_cache
+def _get_root_names_cached() -> FrozenSet[str]:
+    """Root category names, built once per cache generation."""
+    return frozenset(cat["name"] for cat in _get_root_categories_from_db())
+
+
+@_locked_cache
+def _get_all_names_cached() -> FrozenSet[str]:
+    """All pathway names (roots + sub-categories), built once per cache generation."""
+    return _get_root_names_cached() | {
+        child["name"]
+        for children in _get_sub_categories_from_db().values()
+        for child in children
+    }
+
+
+def get_root_category_names() -> FrozenSet[str]:
     """Get set of root category names for validation."""
-    return {cat["name"] for cat in _get_root_categories_from_db()}
+    return _get_root_names_cached()
 
 
 def get_root_categories() -> List[Dict]:
@@ -153,7 +375,7 @@ class _LazyConfig:
         return get_root_categories()
 
     @property
-    def ROOT_CATEGORY_NAMES(self) -> Set[str]:
+    def ROOT_CATEGORY_NAMES(self) -> FrozenSet[str]:
         return get_root_category_names()
 
     @property
@@ -164,22 +386,23 @@ class _LazyConfig:
 # Create singleton instance
 _config = _LazyConfig()
 
-# Export as module-level attributes for backward compatibility
-# Scripts can do: from pathway_config import ROOT_CATEGORY_NAMES
-ROOT_CATEGORIES = property(lambda self: _config.ROOT_CATEGORIES)
-ROOT_CATEGORY_NAMES = property(lambda self: _config.ROOT_CATEGORY_NAMES)
-SUB_CATEGORIES = property(lambda self: _config.SUB_CATEGORIES)
+# Module-level names resolved lazily by __getattr__ below
+_LAZY_ATTRS = ("ROOT_CATEGORIES", "ROOT_CATEGORY_NAMES", "SUB_CATEGORIES")
 
 
-# For direct attribute access (when imported as module)
+# Export as module-level attributes for backward compatibility
+# Scripts can do: from pathway_config import ROOT_CATEGORY_NAMES
 def __getattr__(name):
-    """Allow module-level attribute access to lazy-loaded config."""
-    if name == "ROOT_CATEGORIES":
-        return get_root_categories()
-    elif name == "ROOT_CATEGORY_NAMES":
-        return get_root_category_names()
-    elif name == "SUB_CATEGORIES":
-        return get_sub_categories()
+    """
+    Allow module-level attribute access to lazy-loaded config (PEP 562).
+
+    The resolved value is stored in the module globals, so later accesses are
+    plain dict lookups that never reach __getattr__; _clear_cache() drops them.
+    """
+    if name in _LAZY_ATTRS:
+        value = getattr(_config, name)
+        globals()[name] = value
+        return value
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
@@ -187,32 +410,34 @@ def __getattr__(name):
 # HELPER FUNCTIONS
 # =============================================================================
 
-def get_all_pathway_names() -> Set[str]:
+def get_all_pathway_names() -> FrozenSet[str]:
     """Get all pathway names (roots + sub-categories)."""
-    names = get_root_category_names().copy()
-    for subcats in get_sub_categories().values():
-        for sub in subcats:
-            names.add(sub["name"])
-    return names
+    return _get_all_names_cached()
 
 
 def get_parent_for_pathway(pathway_name: str) -> Optional[str]:
     """Get the parent pathway name for a given pathway."""
-    for parent, children in get_sub_categories().items():
-        for child in children:
-            if child["name"] == pathway_name:
-                return parent
-    return None
+    return _get_indexes_from_db()[0].get(pathway_name)
 
 
 def get_children_for_pathway(pathway_name: str) -> List[str]:
     """Get child pathway names for a given pathway."""
-    return [child["name"] for child in get_sub_categories().get(pathway_name, [])]
+    return list(_get_indexes_from_db()[1].get(pathway_name, ()))
 
 
 def is_root_category(pathway_name: str) -> bool:
     """Check if a pathway is a root category."""
-    return pathway_name in get_root_category_names()
+    return pathway_name in _get_root_names_cached()
+
+
+def get_config_generation() -> int:
+    """
+    Counter bumped each time the cached config is cleared.
+
+    Caches built on top of the config stamp entries with it and treat a
+    different value as stale.
+    """
+    return _config_generation
 
 
 def refresh_config():
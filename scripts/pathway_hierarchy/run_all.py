@@ -2,7 +2,7 @@
 """
 Pathway Hierarchy Orchestrator
 
-Runs all pathway hierarchy scripts in sequence:
+Runs all pathway hierarchy scripts in dependency order:
 1. Fetch ontology hierarchies (GO/KEGG)
 2. Build base hierarchy scaffold
 3. Classify existing pathways
@@ -18,14 +18,20 @@ Options:
     --to STEP       Stop after step N (1-6), default: 6
     --force         Force re-run even if already completed
     --dry-run       Show what would be run without executing
+
+Each SCRIPTS entry lists the steps it depends on ('depends_on'). Steps whose
+dependencies are all satisfied run together as one wave; today every step
+reads what the previous one wrote, so the waves are a single chain.
 """
 
 import sys
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -41,6 +47,7 @@ SCRIPTS = [
         'description': 'Fetch GO/KEGG ontology hierarchies',
         'file': '01_fetch_ontology_hierarchies.py',
         'estimated_time': '5-10 minutes (with cache: instant)',
+        'depends_on': [],
     },
     {
         'number': 2,
@@ -48,6 +55,7 @@ SCRIPTS = [
         'description': 'Build base hierarchy scaffold in database',
         'file': '02_build_base_hierarchy.py',
         'estimated_time': '1-2 minutes',
+        'depends_on': [1],
     },
     {
         'number': 3,
@@ -55,6 +63,7 @@ SCRIPTS = [
         'description': 'Classify existing pathways into hierarchy (AI)',
         'file': '03_classify_existing_pathways.py',
         'estimated_time': '5-15 minutes depending on pathway count',
+        'depends_on': [2],
     },
     {
         'number': 4,
@@ -62,6 +71,7 @@ SCRIPTS = [
         'description': 'Create intermediate pathways where needed (AI)',
         'file': '04_ai_create_missing_branches.py',
         'estimated_time': '5-10 minutes',
+        'depends_on': [3],
     },
     {
         'number': 5,
@@ -69,6 +79,7 @@ SCRIPTS = [
         'description': 'Assign interactions to most specific pathways (AI)',
         'file': '05_assign_interactions_to_leaves.py',
         'estimated_time': '10-30 minutes depending on interaction count',
+        'depends_on': [4],
     },
     {
         'number': 6,
@@ -76,6 +87,7 @@ SCRIPTS = [
         'description': 'Validate hierarchy and finalize',
         'file': '06_validate_and_finalize.py',
         'estimated_time': '2-5 minutes',
+        'depends_on': [5],
     },
     {
         'number': 7,
@@ -83,51 +95,125 @@ SCRIPTS = [
         'description': 'Merge duplicate pathways by normalized name',
         'file': '07_merge_duplicate_pathways.py',
         'estimated_time': '1-2 minutes',
+        'depends_on': [6],
     },
 ]
 
 
-def run_script(script_path: Path, logger) -> Tuple[bool, float]:
+def run_script(script_path: Path, logger, timeout: float = 3600) -> Tuple[bool, float]:
     """
     Run a script and return (success, duration_seconds).
+
+    Output (stdout and stderr merged) is streamed to the logger line by line
+    while the script runs instead of being buffered until it exits.
     """
     start = time.time()
+    timed_out = threading.Event()
 
     try:
-        result = subprocess.run(
-            [sys.executable, str(script_path)],
-            capture_output=True,
+        # -u keeps the child's stdout unbuffered so lines arrive as printed
+        proc = subprocess.Popen(
+            [sys.executable, '-u', str(script_path)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=3600,  # 1 hour timeout
+            bufsize=1,
         )
 
+        def _kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, _kill)  # 1 hour timeout by default
+        timer.start()
+        try:
+            for line in proc.stdout:
+                logger.info(f"  | {line.rstrip()}")
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+
         duration = time.time() - start
 
-        # Log output
-        if result.stdout:
-            for line in result.stdout.strip().split('\n'):
-                logger.info(f"  | {line}")
+        if timed_out.is_set():
+            logger.error(f"Script timed out after {timeout:.0f}s")
+            return False, duration
 
-        if result.returncode != 0:
-            logger.error(f"Script failed with return code {result.returncode}")
-            if result.stderr:
-                for line in result.stderr.strip().split('\n'):
-                    logger.error(f"  | {line}")
+        if returncode != 0:
+            logger.error(f"Script failed with return code {returncode}")
             return False, duration
 
         return True, duration
 
-    except subprocess.TimeoutExpired:
-        duration = time.time() - start
-        logger.error("Script timed out after 1 hour")
-        return False, duration
-
     except Exception as e:
         duration = time.time() - start
         logger.error(f"Error running script: {e}")
         return False, duration
 
 
+def plan_waves(scripts: List[Dict]) -> List[List[Dict]]:
+    """
+    Group scripts into waves that can run concurrently.
+
+    A script joins the first wave after all of its 'depends_on' steps.
+    Dependencies outside the selected scripts (e.g. skipped with --from)
+    count as already satisfied.
+
+    Args:
+        scripts: SCRIPTS entries to schedule
+
+    Returns:
+        List of waves, each a list of SCRIPTS entries in step order
+    """
+    selected = {s['number'] for s in scripts}
+    done = set()
+    pending = sorted(scripts, key=lambda s: s['number'])
+    waves = []
+
+    while pending:
+        wave = [
+            s for s in pending
+            if all(d in done or d not in selected for d in s.get('depends_on', []))
+        ]
+        if not wave:
+            raise ValueError(
+                f"Unsatisfiable step dependencies: {[s['number'] for s in pending]}"
+            )
+        waves.append(wave)
+        done.update(s['number'] for s in wave)
+        pending = [s for s in pending if s['number'] not in done]
+
+    return waves
+
+
+def run_step(script: Dict, logger) -> Tuple[int, bool, float]:
+    """
+    Run one orchestrator step and return (step_number, success, duration_seconds).
+    """
+    logger.info("-" * 70)
+    logger.info(f"STEP {script['number']}: {script['description']}")
+    logger.info("-" * 70)
+
+    script_path = Path(__file__).parent / script['file']
+
+    logger.info(f"Running: {script['file']}")
+    logger.info(f"Path: {script_path}")
+    logger.info("")
+
+    success, duration = run_script(script_path, logger)
+
+    if success:
+        logger.info("")
+        logger.info(f"Step {script['number']} completed successfully in {duration:.1f}s")
+    else:
+        logger.error("")
+        logger.error(f"Step {script['number']} FAILED after {duration:.1f}s")
+
+    logger.info("")
+    return script['number'], success, duration
+
+
 def main(from_step: int = 1, to_step: int = 6, force: bool = False, dry_run: bool = False):
     """
     Run pathway hierarchy scripts in sequence.
@@ -168,52 +254,45 @@ def main(from_step: int = 1, to_step: int = 6, force: bool = False, dry_run: boo
         logger.info("Dry run complete. No scripts executed.")
         return True
 
-    # Run scripts
+    # Run scripts, one dependency wave at a time
     results = []
     total_duration = 0
-
-    for script in scripts_to_run:
-        logger.info("-" * 70)
-        logger.info(f"STEP {script['number']}: {script['description']}")
-        logger.info("-" * 70)
-
-        script_path = Path(__file__).parent / script['file']
-
-        if not script_path.exists():
-            logger.error(f"Script not found: {script_path}")
-            results.append((script['number'], False, 0))
-            stats.errors += 1
-            continue
-
-        logger.info(f"Running: {script['file']}")
-        logger.info(f"Path: {script_path}")
-        logger.info("")
-
-        success, duration = run_script(script_path, logger)
-        results.append((script['number'], success, duration))
-        total_duration += duration
-
-        if success:
-            logger.info("")
-            logger.info(f"Step {script['number']} completed successfully in {duration:.1f}s")
-            stats.items_processed += 1
+    waves = plan_waves(scripts_to_run)
+
+    for wave in waves:
+        runnable = []
+        for script in wave:
+            script_path = Path(__file__).parent / script['file']
+            if not script_path.exists():
+                logger.error(f"Script not found: {script_path}")
+                results.append((script['number'], False, 0))
+                stats.errors += 1
+                continue
+            runnable.append(script)
+
+        if len(runnable) <= 1:
+            wave_results = [run_step(script, logger) for script in runnable]
         else:
-            logger.error("")
-            logger.error(f"Step {script['number']} FAILED after {duration:.1f}s")
-            stats.errors += 1
-
-            # Ask whether to continue
+            logger.info(f"Running steps {[s['number'] for s in runnable]} concurrently")
+            with ThreadPoolExecutor(max_workers=len(runnable)) as executor:
+                wave_results = list(executor.map(lambda s: run_step(s, logger), runnable))
+
+        failed_in_wave = False
+        for step_num, success, duration in wave_results:
+            results.append((step_num, success, duration))
+            total_duration += duration
+            if success:
+                stats.items_processed += 1
+            else:
+                stats.errors += 1
+                failed_in_wave = True
+
+        if failed_in_wave:
             logger.warning("")
             logger.warning("Script failed. Stopping orchestrator.")
             logger.warning("Fix the issue and re-run with --from to resume.")
             break
 
-        logger.info("")
-
-        # Brief pause between scripts
-        if script['number'] < to_step:
-            time.sleep(2)
-
     # Summary
     logger.info("=" * 70)
     logger.info("ORCHESTRATOR SUMMARY")
@@ -5,11 +5,13 @@ Async Utilities for Parallel LLM Calls
 Provides semaphore-controlled parallel execution for Gemini API calls.
 """
 
+import os
 import asyncio
 import logging
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Callable, Any, TypeVar, Optional
+from typing import List, Callable, Any, AsyncIterator, Iterable, Iterator, TypeVar, Optional, Tuple
 from functools import partial
+from itertools import chain, islice
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +23,9 @@ logger = logging.getLogger(__name__)
 MAX_CONCURRENT_FLASH = 15  # For gemini-3-flash-preview
 MAX_CONCURRENT_PRO = 4     # For gemini-2.5-pro (more conservative)
 
-# Thread pool for blocking calls
+# Thread pool for blocking calls, sized so a flash and a pro batch can both
+# run at their full semaphore limits without queueing for threads
+EXECUTOR_MAX_WORKERS = max(MAX_CONCURRENT_FLASH + MAX_CONCURRENT_PRO, os.cpu_count() or 4)
 _executor: Optional[ThreadPoolExecutor] = None
 
 
@@ -29,7 +33,7 @@ def get_executor() -> ThreadPoolExecutor:
     """Get or create the shared thread pool executor."""
     global _executor
     if _executor is None:
-        _executor = ThreadPoolExecutor(max_workers=20, thread_name_prefix="llm_")
+        _executor = ThreadPoolExecutor(max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="llm_")
     return _executor
 
 
@@ -50,20 +54,23 @@ T = TypeVar('T')
 
 async def run_in_executor(func: Callable[..., T], *args, **kwargs) -> T:
     """Run a blocking function in the thread pool executor."""
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     if kwargs:
         func = partial(func, **kwargs)
     return await loop.run_in_executor(get_executor(), func, *args)
 
 
-async def parallel_llm_calls(
+async def parallel_llm_calls_stream(
     items: List[Any],
     call_fn: Callable[[Any], Any],
     max_concurrent: int = MAX_CONCURRENT_FLASH,
     desc: str = "Processing"
-) -> List[Any]:
+) -> AsyncIterator[Tuple[int, Any]]:
     """
-    Run LLM calls in parallel with semaphore-based rate limiting.
+    Run LLM calls in parallel and yield (index, result) as each one finishes.
+
+    Results arrive in completion order, so callers can act on early results
+    (e.g. write them to the database) while stragglers are still running.
 
     Args:
         items: List of items to process
@@ -71,40 +78,67 @@ async def parallel_llm_calls(
         max_concurrent: Maximum concurrent calls
         desc: Description for logging
 
-    Returns:
-        List of results (or Exception objects for failed calls)
+    Yields:
+        (index into items, result or Exception object for a failed call)
     """
     if not items:
-        return []
+        return
 
     semaphore = asyncio.Semaphore(max_concurrent)
     total = len(items)
     completed = 0
+    failures = 0
 
-    async def bounded_call(idx: int, item: Any) -> Any:
-        nonlocal completed
+    async def bounded_call(idx: int, item: Any) -> Tuple[int, Any]:
+        nonlocal completed, failures
         async with semaphore:
             try:
                 result = await run_in_executor(call_fn, item)
                 completed += 1
                 if completed % 5 == 0 or completed == total:
                     logger.info(f"{desc}: {completed}/{total} complete")
-                return result
+                return idx, result
             except Exception as e:
                 completed += 1
+                failures += 1
                 logger.warning(f"{desc} item {idx} failed: {e}")
-                return e
+                return idx, e
 
     logger.info(f"{desc}: Starting {total} items (max {max_concurrent} concurrent)")
 
-    tasks = [bounded_call(i, item) for i, item in enumerate(items)]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    tasks = [asyncio.ensure_future(bounded_call(i, item)) for i, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Consumer stopped early: don't leave calls queued behind the semaphore
+        for task in tasks:
+            task.cancel()
+
+    logger.info(f"{desc}: Complete. {total - failures} succeeded, {failures} failed")
+
+
+async def parallel_llm_calls(
+    items: List[Any],
+    call_fn: Callable[[Any], Any],
+    max_concurrent: int = MAX_CONCURRENT_FLASH,
+    desc: str = "Processing"
+) -> List[Any]:
+    """
+    Run LLM calls in parallel with semaphore-based rate limiting.
 
-    # Count successes/failures
-    successes = sum(1 for r in results if not isinstance(r, Exception))
-    failures = total - successes
-    logger.info(f"{desc}: Complete. {successes} succeeded, {failures} failed")
+    Args:
+        items: List of items to process
+        call_fn: Function to call for each item (blocking is OK)
+        max_concurrent: Maximum concurrent calls
+        desc: Description for logging
 
+    Returns:
+        List of results in input order (or Exception objects for failed calls)
+    """
+    results = [None] * len(items)
+    async for idx, result in parallel_llm_calls_stream(items, call_fn, max_concurrent, desc):
+        results[idx] = result
     return results
 
 
@@ -157,11 +191,24 @@ def run_parallel(
 # BATCHING UTILITIES
 # ==============================================================================
 
+def iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Lazily yield chunks of specified size from any iterable.
+
+    Raises:
+        ValueError: size is less than 1
+    """
+    if size < 1:
+        raise ValueError(f"chunk size must be at least 1, got {size}")
+    it = iter(items)
+    return iter(lambda: list(islice(it, size)), [])
+
+
 def chunk_list(items: List[Any], size: int) -> List[List[Any]]:
     """Split a list into chunks of specified size."""
-    return [items[i:i + size] for i in range(0, len(items), size)]
+    return list(iter_chunks(items, size))
 
 
 def flatten_results(results: List[List[Any]]) -> List[Any]:
     """Flatten a list of lists into a single list."""
-    return [item for sublist in results for item in sublist]
+    return list(chain.from_iterable(results))
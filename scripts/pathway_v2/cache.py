@@ -5,11 +5,22 @@ Pathway Cache - Avoid Redundant LLM Calls
 Simple in-memory cache with JSON file persistence.
 """
 
+import os
 import json
 import logging
+import threading
+from functools import lru_cache
 from pathlib import Path
 from threading import Lock
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Tuple, Any
+
+from scripts.pathway_hierarchy.pathway_config import get_config_generation
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -17,14 +28,29 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 CACHE_FILE = PROJECT_ROOT / "cache" / "pathway_hierarchy_cache.json"
 
 
+@lru_cache(maxsize=65536)
+def _normalize_key(name: str) -> str:
+    """Normalize pathway name for cache key (memoized; names repeat heavily)."""
+    return name.strip().lower()
+
+
 class PathwayCache:
     """
     Simple cache for parent-child relationships and sibling lists.
     Thread-safe with optional disk persistence.
+
+    Entries are stored as (revision, value), where the revision pairs this
+    cache's own counter with the pathway config generation. bump_revision()
+    or a pathway config refresh invalidates the whole cache in O(1): entries
+    stamped with an older revision read as misses and are dropped on the
+    next save.
     """
 
     def __init__(self, cache_file: Path = CACHE_FILE, load_existing: bool = True):
-        self._cache: Dict[str, Any] = {}
+        # Separate maps per entry kind, keyed by normalized pathway name
+        self._parents: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._siblings: Dict[str, Tuple[Tuple[int, int], List[Dict]]] = {}
+        self._revision = 0
         self._lock = Lock()
         self._cache_file = cache_file
         self._dirty = False
@@ -32,9 +58,21 @@ class PathwayCache:
         if load_existing:
             self._load_from_disk()
 
-    def _normalize_key(self, name: str) -> str:
-        """Normalize pathway name for cache key."""
-        return name.strip().lower()
+    def _current_revision(self) -> Tuple[int, int]:
+        """Stamp for new entries: (own revision, pathway config generation)."""
+        return (self._revision, get_config_generation())
+
+    def _live(self, entry: Optional[Tuple[Tuple[int, int], Any]]) -> Optional[Any]:
+        """Value of an entry if it belongs to the current revision."""
+        if entry is None or entry[0] != self._current_revision():
+            return None
+        return entry[1]
+
+    def bump_revision(self):
+        """Invalidate every cached entry without touching the maps."""
+        with self._lock:
+            self._revision += 1
+            self._dirty = True
 
     # -------------------------------------------------------------------------
     # Parent Cache
@@ -42,20 +80,18 @@ class PathwayCache:
 
     def get_parent(self, child_name: str) -> Optional[str]:
         """Get cached parent for a pathway, or None if not cached."""
-        key = f"parent:{self._normalize_key(child_name)}"
-        return self._cache.get(key)
+        return self._live(self._parents.get(_normalize_key(child_name)))
 
     def set_parent(self, child_name: str, parent_name: str):
         """Cache a parent relationship."""
+        key = _normalize_key(child_name)
         with self._lock:
-            key = f"parent:{self._normalize_key(child_name)}"
-            self._cache[key] = parent_name
+            self._parents[key] = (self._current_revision(), parent_name)
             self._dirty = True
 
     def has_parent(self, child_name: str) -> bool:
         """Check if parent is cached."""
-        key = f"parent:{self._normalize_key(child_name)}"
-        return key in self._cache
+        return self._live(self._parents.get(_normalize_key(child_name))) is not None
 
     # -------------------------------------------------------------------------
     # Siblings Cache
@@ -63,38 +99,53 @@ class PathwayCache:
 
     def get_siblings(self, parent_name: str) -> Optional[List[Dict]]:
         """Get cached siblings for a parent, or None if not cached."""
-        key = f"siblings:{self._normalize_key(parent_name)}"
-        return self._cache.get(key)
+        return self._live(self._siblings.get(_normalize_key(parent_name)))
 
     def set_siblings(self, parent_name: str, siblings: List[Dict]):
         """Cache sibling list for a parent."""
+        key = _normalize_key(parent_name)
         with self._lock:
-            key = f"siblings:{self._normalize_key(parent_name)}"
-            self._cache[key] = siblings
+            self._siblings[key] = (self._current_revision(), siblings)
             self._dirty = True
 
     def has_siblings(self, parent_name: str) -> bool:
         """Check if siblings are cached."""
-        key = f"siblings:{self._normalize_key(parent_name)}"
-        return key in self._cache
+        return self._live(self._siblings.get(_normalize_key(parent_name))) is not None
 
     # -------------------------------------------------------------------------
     # Persistence
     # -------------------------------------------------------------------------
 
     def save_to_disk(self):
-        """Persist cache to JSON file."""
+        """Persist cache to JSON file (atomic replace, serialized outside the lock)."""
         if not self._dirty:
             return
 
+        # Only the snapshot is taken under the lock; setters aren't blocked
+        # while the file is serialized and written
+        with self._lock:
+            rev = self._current_revision()
+            snapshot = {
+                "parents": {k: v for k, (r, v) in self._parents.items() if r == rev},
+                "siblings": {k: v for k, (r, v) in self._siblings.items() if r == rev},
+            }
+            self._dirty = False
+
+        tmp_file = self._cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
         try:
             self._cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with self._lock:
-                with open(self._cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(self._cache, f, indent=2, ensure_ascii=False)
-                self._dirty = False
-            logger.info(f"Cache saved to {self._cache_file} ({len(self._cache)} entries)")
+            if ORJSON_AVAILABLE:
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(snapshot, option=orjson.OPT_INDENT_2))
+            else:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, self._cache_file)
+            entries = len(snapshot["parents"]) + len(snapshot["siblings"])
+            logger.info(f"Cache saved to {self._cache_file} ({entries} entries)")
         except Exception as e:
+            self._dirty = True
+            tmp_file.unlink(missing_ok=True)
             logger.warning(f"Failed to save cache: {e}")
 
     def _load_from_disk(self):
@@ -104,25 +155,43 @@ class PathwayCache:
             return
 
         try:
-            with open(self._cache_file, 'r', encoding='utf-8') as f:
-                self._cache = json.load(f)
-            logger.info(f"Loaded cache from {self._cache_file} ({len(self._cache)} entries)")
+            if ORJSON_AVAILABLE:
+                with open(self._cache_file, 'rb') as f:
+                    data = orjson.loads(f.read())
+            else:
+                with open(self._cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+            if set(data) <= {"parents", "siblings"}:
+                parents = data.get("parents", {})
+                siblings = data.get("siblings", {})
+            else:
+                # Legacy flat format: "parent:<name>" / "siblings:<name>" keys
+                parents = {k[len("parent:"):]: v for k, v in data.items() if k.startswith("parent:")}
+                siblings = {k[len("siblings:"):]: v for k, v in data.items() if k.startswith("siblings:")}
+            rev = self._current_revision()
+            self._parents = {k: (rev, v) for k, v in parents.items()}
+            self._siblings = {k: (rev, v) for k, v in siblings.items()}
+            logger.info(f"Loaded cache from {self._cache_file} ({len(self._parents) + len(self._siblings)} entries)")
         except Exception as e:
             logger.warning(f"Failed to load cache: {e}")
-            self._cache = {}
+            self._parents = {}
+            self._siblings = {}
 
     def clear(self):
         """Clear the cache."""
         with self._lock:
-            self._cache.clear()
+            self._parents.clear()
+            self._siblings.clear()
             self._dirty = True
 
     def stats(self) -> Dict[str, int]:
         """Get cache statistics."""
-        parent_count = sum(1 for k in self._cache if k.startswith("parent:"))
-        sibling_count = sum(1 for k in self._cache if k.startswith("siblings:"))
+        rev = self._current_revision()
+        parent_count = sum(1 for r, _ in self._parents.values() if r == rev)
+        sibling_count = sum(1 for r, _ in self._siblings.values() if r == rev)
         return {
-            "total": len(self._cache),
+            "total": parent_count + sibling_count,
             "parents": parent_count,
             "siblings": sibling_count
         }
@@ -140,6 +209,12 @@ def get_pathway_cache() -> PathwayCache:
     return _pathway_cache
 
 
+def invalidate_pathway_cache():
+    """Invalidate the global cache (if created) by bumping its revision."""
+    if _pathway_cache is not None:
+        _pathway_cache.bump_revision()
+
+
 def save_cache():
     """Save the global cache to disk."""
     if _pathway_cache is not None:
@@ -10,12 +10,70 @@ Options:
               (more specific pathway should be the child, not the parent)
 """
 import sys
+import pickle
 import argparse
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+PARENT_GRAPH_CACHE_PATH = PROJECT_ROOT / "logs" / "parent_graph.cache"
+
+
+def load_or_build_parent_graph(db, PathwayParent):
+    """
+    Load the child -> [parent_ids] graph from the disk cache, or rebuild it.
+
+    The cache is keyed by a fingerprint of the pathway_parents table: row
+    count, newest created_at and sums of the child/parent IDs weighted by
+    link id, so in-place re-parenting (including two links swapping
+    parents) is noticed too. The aggregates still scan the table, but only
+    one row comes back instead of every link.
+
+    Args:
+        db: SQLAlchemy db instance
+        PathwayParent: PathwayParent model class
+
+    Returns:
+        Dict of child pathway ID -> list of parent pathway IDs
+    """
+    from sqlalchemy import BigInteger, cast, func
+    from scripts.pathway_v2.step6_utils import build_parent_graph
+
+    link_id = cast(PathwayParent.id, BigInteger)
+    row = db.session.query(
+        func.count(PathwayParent.id),
+        func.max(PathwayParent.created_at),
+        func.sum(link_id * PathwayParent.child_pathway_id),
+        func.sum(link_id * PathwayParent.parent_pathway_id),
+    ).one()
+    fingerprint = tuple(str(value) for value in row)
+
+    try:
+        with open(PARENT_GRAPH_CACHE_PATH, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("fingerprint") == fingerprint:
+            return cached["graph"]
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+        pass
+
+    graph = build_parent_graph(PathwayParent)
+    try:
+        PARENT_GRAPH_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(PARENT_GRAPH_CACHE_PATH, "wb") as f:
+            pickle.dump({"fingerprint": fingerprint, "graph": graph}, f)
+    except OSError as e:
+        print(f"Warning: could not write parent graph cache: {e}")
+    return graph
+
+
+def invalidate_parent_graph_cache():
+    """Remove the on-disk parent graph cache."""
+    try:
+        PARENT_GRAPH_CACHE_PATH.unlink()
+    except FileNotFoundError:
+        pass
+
 
 def main():
     parser = argparse.ArgumentParser(description="Fix pathway hierarchy cycles")
@@ -23,126 +81,188 @@ def main():
                         help="Automatically fix based on hierarchy levels")
     args = parser.parse_args()
 
+    from sqlalchemy import delete, tuple_
     from app import app, db
     from models import Pathway, PathwayParent
-    from scripts.pathway_v2.step6_utils import find_all_cycles, build_parent_graph
+    from scripts.pathway_v2.step6_utils import detect_back_edges
 
     with app.app_context():
-        # Build graph and find all cycles
-        parent_graph = build_parent_graph(PathwayParent)
-        cycles = find_all_cycles(parent_graph)
+        # Build graph and find every back-edge in one DFS pass
+        parent_graph = load_or_build_parent_graph(db, PathwayParent)
+        back_edges = detect_back_edges(parent_graph)
 
-        if not cycles:
+        if not back_edges:
             print("No cycles detected in pathway hierarchy.")
             return
 
-        print(f"Found {len(cycles)} cycle(s)")
+        # A back-edge (u, v) is a 2-node cycle when v also lists u as a parent;
+        # any other back-edge closes a longer cycle, which this script can't fix
+        pair_edges = {(u, v) for u, v in back_edges if u in parent_graph.get(v, ())}
+        cycle_pairs = sorted({tuple(sorted(edge)) for edge in pair_edges})
+        skipped_edges = sorted(back_edges - pair_edges)
+
+        # Prefetch every pathway and both-direction link in two queries
+        all_ids = {pw_id for pair in cycle_pairs for pw_id in pair}
+        all_ids.update(pw_id for edge in skipped_edges for pw_id in edge)
+        pathways = {
+            p.id: p for p in Pathway.query.filter(Pathway.id.in_(all_ids)).all()
+        } if all_ids else {}
+        link_keys = {(a, b) for a, b in cycle_pairs} | {(b, a) for a, b in cycle_pairs}
+        links = {
+            (l.child_pathway_id, l.parent_pathway_id): l
+            for l in PathwayParent.query.filter(
+                tuple_(PathwayParent.child_pathway_id, PathwayParent.parent_pathway_id).in_(link_keys)
+            ).all()
+        } if link_keys else {}
+
+        print(f"Found {len(cycle_pairs)} 2-node cycle(s)")
+        if skipped_edges:
+            print(f"Skipping {len(skipped_edges)} back-edge(s) on longer cycles (fix these manually):")
+            for child_id, parent_id in skipped_edges:
+                child = pathways.get(child_id)
+                parent = pathways.get(parent_id)
+                print(f"  {child_id} '{child.name if child else '?'}' -> "
+                      f"{parent_id} '{parent.name if parent else '?'}'")
         print("=" * 60)
 
-        # Process each unique cycle
-        processed_pairs = set()
+        # In --auto mode, decide every cycle up front from the prefetched data
+        decisions = {
+            pair: decide(pair, pathways, links)
+            for pair in cycle_pairs
+            if pair[0] in pathways and pair[1] in pathways
+        } if args.auto else {}
+
+        # Links to delete are collected and removed with one bulk DELETE after the loop
+        deleted_links = []
+
+        for id_a, id_b in cycle_pairs:
+            pw_a = pathways.get(id_a)
+            pw_b = pathways.get(id_b)
 
-        for cycle in cycles:
-            if len(cycle) < 3:
+            if not pw_a or not pw_b:
+                print(f"Warning: Could not find pathways {id_a} or {id_b}")
                 continue
 
-            # Get the two pathways involved (for a 2-node cycle: A -> B -> A)
-            # cycle format is [A, B, A] for a 2-node cycle
-            pw_ids = cycle[:-1]  # Remove duplicate last element
+            print(f"\n=== CYCLE DETECTED ===")
+            print(f"Pathway A (ID {id_a}): '{pw_a.name}'")
+            print(f"  - hierarchy_level: {pw_a.hierarchy_level}")
+            print(f"  - is_leaf: {pw_a.is_leaf}")
 
-            if len(pw_ids) == 2:
-                pair = tuple(sorted(pw_ids))
-                if pair in processed_pairs:
-                    continue
-                processed_pairs.add(pair)
+            print(f"\nPathway B (ID {id_b}): '{pw_b.name}'")
+            print(f"  - hierarchy_level: {pw_b.hierarchy_level}")
+            print(f"  - is_leaf: {pw_b.is_leaf}")
+
+            # Find the two links
+            link_a_to_b = links.get((id_a, id_b))
+            link_b_to_a = links.get((id_b, id_a))
+
+            print(f"\n=== PARENT LINKS ===")
+            if link_a_to_b:
+                print(f"Link 1: '{pw_a.name}' -> '{pw_b.name}' (A is child of B)")
+            if link_b_to_a:
+                print(f"Link 2: '{pw_b.name}' -> '{pw_a.name}' (B is child of A)")
+
+            print(f"\n=== FIX OPTIONS ===")
+            if link_a_to_b:
+                print(f"A) Delete Link 1: Make '{pw_a.name}' NOT a child of '{pw_b.name}'")
+            if link_b_to_a:
+                print(f"B) Delete Link 2: Make '{pw_b.name}' NOT a child of '{pw_a.name}'")
 
-                id_a, id_b = pw_ids[0], pw_ids[1]
-                pw_a = Pathway.query.get(id_a)
-                pw_b = Pathway.query.get(id_b)
+            if args.auto:
+                link = decisions.get((id_a, id_b))
+                level_a = _level(pw_a)
 
-                if not pw_a or not pw_b:
-                    print(f"Warning: Could not find pathways {id_a} or {id_b}")
+                if link:
+                    # The parent of the deleted link is the more specific pathway
+                    child = pathways[link.child_pathway_id]
+                    parent = pathways[link.parent_pathway_id]
+                    print(f"\n[AUTO] '{parent.name}' (level {_level(parent)}) is more specific than '{child.name}' (level {_level(child)})")
+                    print(f"[AUTO] Deleting link: '{child.name}' -> '{parent.name}'")
+                    deleted_links.append(link)
+                    print("[AUTO] Done.")
+                elif level_a == _level(pw_b):
+                    print(f"\n[AUTO] Both pathways have same level ({level_a}). Manual decision needed.")
+                    choice = input("Which link to delete? (A/B): ").strip().upper()
+                    link = apply_choice(choice, link_a_to_b, link_b_to_a)
+                    if link:
+                        deleted_links.append(link)
+            else:
+                choice = input("\nWhich link to delete? (A/B/skip): ").strip().upper()
+                if choice == "SKIP":
+                    print("Skipped.")
                     continue
+                link = apply_choice(choice, link_a_to_b, link_b_to_a)
+                if link:
+                    deleted_links.append(link)
 
-                print(f"\n=== CYCLE DETECTED ===")
-                print(f"Pathway A (ID {id_a}): '{pw_a.name}'")
-                print(f"  - hierarchy_level: {pw_a.hierarchy_level}")
-                print(f"  - is_leaf: {pw_a.is_leaf}")
-
-                print(f"\nPathway B (ID {id_b}): '{pw_b.name}'")
-                print(f"  - hierarchy_level: {pw_b.hierarchy_level}")
-                print(f"  - is_leaf: {pw_b.is_leaf}")
-
-                # Find the two links
-                link_a_to_b = PathwayParent.query.filter_by(
-                    child_pathway_id=id_a, parent_pathway_id=id_b
-                ).first()
-                link_b_to_a = PathwayParent.query.filter_by(
-                    child_pathway_id=id_b, parent_pathway_id=id_a
-                ).first()
-
-                print(f"\n=== PARENT LINKS ===")
-                if link_a_to_b:
-                    print(f"Link 1: '{pw_a.name}' -> '{pw_b.name}' (A is child of B)")
-                if link_b_to_a:
-                    print(f"Link 2: '{pw_b.name}' -> '{pw_a.name}' (B is child of A)")
-
-                print(f"\n=== FIX OPTIONS ===")
-                if link_a_to_b:
-                    print(f"A) Delete Link 1: Make '{pw_a.name}' NOT a child of '{pw_b.name}'")
-                if link_b_to_a:
-                    print(f"B) Delete Link 2: Make '{pw_b.name}' NOT a child of '{pw_a.name}'")
-
-                if args.auto:
-                    # Auto-fix: The pathway with higher level should be child, not parent
-                    # So we delete the link where the higher-level pathway is the parent
-                    level_a = pw_a.hierarchy_level if pw_a.hierarchy_level is not None else 99
-                    level_b = pw_b.hierarchy_level if pw_b.hierarchy_level is not None else 99
-
-                    if level_a > level_b:
-                        # A is more specific (higher level), should be child not parent
-                        # Delete link where A is parent (B is child of A)
-                        if link_b_to_a:
-                            print(f"\n[AUTO] '{pw_a.name}' (level {level_a}) is more specific than '{pw_b.name}' (level {level_b})")
-                            print(f"[AUTO] Deleting link: '{pw_b.name}' -> '{pw_a.name}'")
-                            db.session.delete(link_b_to_a)
-                            db.session.commit()
-                            print("[AUTO] Done.")
-                    elif level_b > level_a:
-                        # B is more specific, should be child not parent
-                        if link_a_to_b:
-                            print(f"\n[AUTO] '{pw_b.name}' (level {level_b}) is more specific than '{pw_a.name}' (level {level_a})")
-                            print(f"[AUTO] Deleting link: '{pw_a.name}' -> '{pw_b.name}'")
-                            db.session.delete(link_a_to_b)
-                            db.session.commit()
-                            print("[AUTO] Done.")
-                    else:
-                        print(f"\n[AUTO] Both pathways have same level ({level_a}). Manual decision needed.")
-                        choice = input("Which link to delete? (A/B): ").strip().upper()
-                        apply_choice(choice, link_a_to_b, link_b_to_a, db)
-                else:
-                    choice = input("\nWhich link to delete? (A/B/skip): ").strip().upper()
-                    if choice == "SKIP":
-                        print("Skipped.")
-                        continue
-                    apply_choice(choice, link_a_to_b, link_b_to_a, db)
+        if deleted_links:
+            try:
+                db.session.execute(
+                    delete(PathwayParent).where(
+                        PathwayParent.id.in_([link.id for link in deleted_links])
+                    )
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            invalidate_parent_graph_cache()
+            print(f"\nCommitted {len(deleted_links)} link deletion(s).")
 
         print("\n" + "=" * 60)
         print("Cycle fix complete. Run verify_pipeline.py --check-only to confirm.")
 
 
-def apply_choice(choice, link_a_to_b, link_b_to_a, db):
-    """Apply the user's choice to delete a link."""
+def _level(pathway) -> int:
+    """Hierarchy level used for cycle decisions (unknown levels sort last)."""
+    return pathway.hierarchy_level if pathway.hierarchy_level is not None else 99
+
+
+def decide(pair, pathways, links):
+    """
+    Pick the link to delete for a 2-node cycle based on hierarchy levels.
+
+    The pathway with the higher level is more specific and should be the
+    child, not the parent, so the link where it is the parent is dropped.
+
+    Args:
+        pair: (id_a, id_b) pathway IDs forming the cycle
+        pathways: Dict of pathway ID -> Pathway
+        links: Dict of (child_id, parent_id) -> PathwayParent
+
+    Returns:
+        The PathwayParent link to delete, or None if the levels are equal
+        or the link to delete does not exist
+    """
+    id_a, id_b = pair
+    level_a = _level(pathways[id_a])
+    level_b = _level(pathways[id_b])
+
+    if level_a > level_b:
+        return links.get((id_b, id_a))
+    if level_b > level_a:
+        return links.get((id_a, id_b))
+    return None
+
+
+def apply_choice(choice, link_a_to_b, link_b_to_a):
+    """
+    Apply the user's choice to delete a link.
+
+    The link is only selected here; the caller deletes and commits.
+
+    Returns:
+        The PathwayParent link to delete, or None if nothing was chosen
+    """
     if choice == 'A' and link_a_to_b:
-        db.session.delete(link_a_to_b)
-        db.session.commit()
         print("Deleted Link 1 (A -> B)")
+        return link_a_to_b
     elif choice == 'B' and link_b_to_a:
-        db.session.delete(link_b_to_a)
-        db.session.commit()
         print("Deleted Link 2 (B -> A)")
+        return link_b_to_a
     else:
         print("Invalid choice or link not found. No changes made.")
+        return None
 
 
 if __name__ == "__main__":
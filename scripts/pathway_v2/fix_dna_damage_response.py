@@ -26,7 +26,7 @@ import sys
 import logging
 import argparse
 from pathlib import Path
-from collections import deque
+from collections import defaultdict
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -61,8 +61,17 @@ def fix_dna_damage_response(dry_run: bool = False):
         logger.info(f"Mode: {'DRY RUN' if dry_run else 'LIVE'}")
         logger.info("=" * 60)
 
+        # Look up all four pathways involved in one query
+        names = [
+            "DNA Damage Response",
+            "Cellular Signaling",
+            "Cellular Response to Stimuli",
+            "Cellular Stress Response",
+        ]
+        by_name = {p.name: p for p in Pathway.query.filter(Pathway.name.in_(names)).all()}
+
         # Step 1: Find DNA Damage Response
-        dna_damage = Pathway.query.filter_by(name="DNA Damage Response").first()
+        dna_damage = by_name.get("DNA Damage Response")
         if not dna_damage:
             logger.warning("DNA Damage Response pathway not found in database - nothing to fix.")
             return True
@@ -79,14 +88,14 @@ def fix_dna_damage_response(dry_run: bool = False):
                     return True
 
         # Step 2: Find Cellular Signaling root (must exist)
-        cellular_signaling = Pathway.query.filter_by(name="Cellular Signaling").first()
+        cellular_signaling = by_name.get("Cellular Signaling")
         if not cellular_signaling:
             logger.error("Root 'Cellular Signaling' not found - cannot proceed!")
             return False
         logger.info(f"Found root: '{cellular_signaling.name}' (ID: {cellular_signaling.id})")
 
         # Step 3: Find or create "Cellular Response to Stimuli" (L1)
-        cellular_response = Pathway.query.filter_by(name="Cellular Response to Stimuli").first()
+        cellular_response = by_name.get("Cellular Response to Stimuli")
         if not cellular_response:
             logger.info("Creating 'Cellular Response to Stimuli' at Level 1...")
             if not dry_run:
@@ -100,6 +109,7 @@ def fix_dna_damage_response(dry_run: bool = False):
                 )
                 db.session.add(cellular_response)
                 db.session.flush()  # Get ID
+                by_name[cellular_response.name] = cellular_response
 
                 # Link to Cellular Signaling
                 link = PathwayParent(
@@ -115,7 +125,7 @@ def fix_dna_damage_response(dry_run: bool = False):
             logger.info(f"Found: '{cellular_response.name}' (ID: {cellular_response.id})")
 
         # Step 4: Find or create "Cellular Stress Response" (L2)
-        cellular_stress = Pathway.query.filter_by(name="Cellular Stress Response").first()
+        cellular_stress = by_name.get("Cellular Stress Response")
         if not cellular_stress:
             logger.info("Creating 'Cellular Stress Response' at Level 2...")
             if not dry_run:
@@ -129,6 +139,7 @@ def fix_dna_damage_response(dry_run: bool = False):
                 )
                 db.session.add(cellular_stress)
                 db.session.flush()  # Get ID
+                by_name[cellular_stress.name] = cellular_stress
 
                 # Link to Cellular Response to Stimuli
                 if cellular_response:
@@ -222,40 +233,83 @@ def fix_dna_damage_response(dry_run: bool = False):
 
 
 def _recalculate_descendant_levels(db, Pathway, PathwayParent, parent_id: int, parent_level: int) -> int:
-    """Recursively update hierarchy levels and ancestor_ids for all descendants."""
+    """
+    Update hierarchy levels and ancestor_ids for all descendants.
+
+    Walks breadth-first one depth at a time: each depth loads its child links
+    with one IN query and any not-yet-seen child pathways with another,
+    instead of a Pathway.get and a link query per visited node. The new values
+    are collected first and assigned to the loaded Pathway objects at the end,
+    so the session stays consistent and the flush writes them as one batched
+    UPDATE.
+
+    Ancestor chains are kept as tuples so a node's chain is extended once and
+    shared by all of its children; they become lists only when written.
+    """
     updated = 0
-    queue = deque([(parent_id, parent_level)])
+    pathways = {}
+    # pathway_id -> (hierarchy_level, ancestor tuple) computed so far
+    pending = {}
+    # pathway_id -> ancestor tuple as currently stored on the pathway
+    stored_ancestors = {}
+
+    def ancestors_of(pathway) -> tuple:
+        if pathway.id in pending:
+            return pending[pathway.id][1]
+        if pathway.id not in stored_ancestors:
+            stored_ancestors[pathway.id] = tuple(pathway.ancestor_ids or ())
+        return stored_ancestors[pathway.id]
 
-    # Build ancestor chain for parent
     parent_pathway = Pathway.query.get(parent_id)
-    parent_ancestors = parent_pathway.ancestor_ids if parent_pathway else []
-
-    while queue:
-        current_id, current_level = queue.popleft()
-        current_pathway = Pathway.query.get(current_id)
-        current_ancestors = current_pathway.ancestor_ids if current_pathway else []
-
-        # Find all children
-        children = PathwayParent.query.filter_by(parent_pathway_id=current_id).all()
-        for child_link in children:
-            child = Pathway.query.get(child_link.child_pathway_id)
-            if child:
-                new_level = current_level + 1
-                new_ancestors = current_ancestors + [current_id]
-
-                changed = False
-                if child.hierarchy_level != new_level:
-                    child.hierarchy_level = new_level
-                    changed = True
-                if child.ancestor_ids != new_ancestors:
-                    child.ancestor_ids = new_ancestors
-                    changed = True
-
-                if changed:
-                    updated += 1
-                    logger.info(f"  Updated '{child.name}': level -> {new_level}")
-
-                queue.append((child.id, new_level))
+    if parent_pathway:
+        pathways[parent_id] = parent_pathway
+
+    # (pathway_id, level) entries in visit order, exactly as a FIFO queue would hold them
+    frontier = [(parent_id, parent_level)]
+
+    while frontier:
+        frontier_ids = {current_id for current_id, _ in frontier}
+        children_by_parent = defaultdict(list)
+        for link in PathwayParent.query.filter(
+            PathwayParent.parent_pathway_id.in_(frontier_ids)
+        ).order_by(PathwayParent.id).all():
+            children_by_parent[link.parent_pathway_id].append(link.child_pathway_id)
+
+        unseen = {
+            child_id for child_ids in children_by_parent.values() for child_id in child_ids
+        } - pathways.keys()
+        if unseen:
+            for pathway in Pathway.query.filter(Pathway.id.in_(unseen)).all():
+                pathways[pathway.id] = pathway
+
+        next_frontier = []
+        for current_id, current_level in frontier:
+            child_ids = children_by_parent.get(current_id)
+            if not child_ids:
+                continue
+
+            current_pathway = pathways.get(current_id)
+            current_ancestors = ancestors_of(current_pathway) if current_pathway else ()
+            new_level = current_level + 1
+            new_ancestors = current_ancestors + (current_id,)
+
+            for child_id in child_ids:
+                child = pathways.get(child_id)
+                if child:
+                    old_level = pending[child.id][0] if child.id in pending else child.hierarchy_level
+                    if old_level != new_level or ancestors_of(child) != new_ancestors:
+                        pending[child.id] = (new_level, new_ancestors)
+                        updated += 1
+                        logger.info(f"  Updated '{child.name}': level -> {new_level}")
+
+                    next_frontier.append((child.id, new_level))
+
+        frontier = next_frontier
+
+    for pathway_id, (level, ancestors) in pending.items():
+        pathway = pathways[pathway_id]
+        pathway.hierarchy_level = level
+        pathway.ancestor_ids = list(ancestors)
 
     return updated
 
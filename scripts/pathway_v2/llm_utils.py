@@ -7,18 +7,209 @@ Shared functions for calling Gemini 2.5 Pro and parsing JSON responses.
 
 import os
 import time
+import hashlib
+import sqlite3
+import atexit
 import logging
+import logging.handlers
+import queue
 import json
+import random
 import re
+import threading
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 
+# Proactive client-side limits shared by every Gemini call in the process
+# (0 disables a limit). Override with GEMINI_RPM_LIMIT / GEMINI_TPM_LIMIT.
+GEMINI_RPM_LIMIT = int(os.environ.get('GEMINI_RPM_LIMIT', 1000))
+GEMINI_TPM_LIMIT = int(os.environ.get('GEMINI_TPM_LIMIT', 0))
+
+
+class GeminiRateLimiter:
+    """
+    Sliding-window limiter for requests and tokens per minute.
+
+    acquire() blocks the calling thread until the request fits in the
+    window, so parallel workers throttle themselves before the API starts
+    returning 429s. Thread-safe; one instance is shared per process.
+    """
+
+    def __init__(self, rpm: int, tpm: int = 0, window: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._events = deque()  # (timestamp, tokens)
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until a request using `tokens` tokens can be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._events and self._events[0][0] <= now - self.window:
+                    _, expired = self._events.popleft()
+                    self._tokens -= expired
+
+                over_rpm = self.rpm > 0 and len(self._events) >= self.rpm
+                # An oversized request is let through alone rather than blocking forever
+                over_tpm = self.tpm > 0 and self._events and self._tokens + tokens > self.tpm
+                if not over_rpm and not over_tpm:
+                    self._events.append((now, tokens))
+                    self._tokens += tokens
+                    return
+
+                wait = self._events[0][0] + self.window - now
+
+            time.sleep(max(wait, 0.01))
+
+
+RATE_LIMITER = GeminiRateLimiter(GEMINI_RPM_LIMIT, GEMINI_TPM_LIMIT)
+
+
+class LLMRateLimitError(RuntimeError):
+    """Raised when Gemini keeps rejecting a call for rate/quota limits (429)."""
+
+
+class LLMTransientError(RuntimeError):
+    """Raised when a Gemini call keeps failing with retryable errors (5xx, timeouts, empty responses)."""
+
+
+class LLMShapeError(RuntimeError):
+    """Raised when a parsed response doesn't have the JSON shape the caller expects."""
+
+
+_RATE_LIMIT_MARKERS = ("429", "RESOURCE_EXHAUSTED")
+_TRANSIENT_CODES = {408, 500, 502, 503, 504, 529}
+
+
+def _classify_llm_error(error: Exception) -> str:
+    """
+    Classify an error from a Gemini call.
+
+    Returns:
+        'rate_limit', 'transient' (worth retrying) or 'terminal' (a 4xx client
+        error that will fail the same way again). Unknown errors are treated
+        as transient.
+    """
+    code = getattr(error, 'code', None)
+    if not isinstance(code, int):
+        code = getattr(error, 'status_code', None)
+
+    message = str(error)
+    if code == 429 or any(marker in message for marker in _RATE_LIMIT_MARKERS):
+        return 'rate_limit'
+    if isinstance(code, int) and 400 <= code < 500 and code not in _TRANSIENT_CODES:
+        return 'terminal'
+    return 'transient'
+
+
+# Content-addressed store of validated responses; callers read and write it
+# around their own shape checks so a malformed answer is never replayed.
+# Bump PROMPT_VERSION to invalidate every entry; GEMINI_RESPONSE_CACHE=0 disables it.
+PROMPT_VERSION = 1
+RESPONSE_CACHE_PATH = PROJECT_ROOT / "cache" / "gemini_responses.sqlite"
+RESPONSE_CACHE_ENABLED = os.environ.get('GEMINI_RESPONSE_CACHE', '1') != '0'
+
+
+class ResponseCache:
+    """
+    On-disk cache of parsed JSON responses, keyed by a hash of the prompt,
+    model, generation config and PROMPT_VERSION.
+
+    Backed by sqlite3 so entries survive reruns. Thread-safe; the database is
+    opened on first use, and cache errors are logged and treated as misses.
+    """
+
+    def __init__(self, path: Path = RESPONSE_CACHE_PATH):
+        self.path = Path(path)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(prompt: str, temperature: float, max_output_tokens: int) -> str:
+        config = f"{GEMINI_MODEL}\0{temperature}\0{max_output_tokens}\0{THINKING_BUDGET}"
+        return hashlib.sha256(f"{PROMPT_VERSION}\0{config}\0{prompt}".encode()).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)")
+        return self._conn
+
+    def get(self, prompt: str, temperature: float, max_output_tokens: int):
+        """Return the cached response dict, or None on a miss."""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT response FROM responses WHERE key = ?",
+                    (self.key(prompt, temperature, max_output_tokens),)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except (sqlite3.Error, ValueError) as e:
+            logger.debug(f"Response cache read failed: {e}")
+            return None
+
+    def set(self, prompt: str, temperature: float, max_output_tokens: int, response: dict) -> None:
+        """Store a response; only call this once the caller has validated it."""
+        try:
+            payload = json.dumps(response)
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)",
+                    (self.key(prompt, temperature, max_output_tokens), payload)
+                )
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.debug(f"Response cache write failed: {e}")
+
+
+RESPONSE_CACHE = ResponseCache()
+
+# Thinking tokens count against max_output_tokens, so callers sizing a tight
+# output cap must add this on top of the expected JSON size
+THINKING_BUDGET = 4096
+DEFAULT_TIMEOUT = 120.0  # seconds per request
+GEMINI_MODEL = "gemini-3-flash-preview"
+
+# Gemini Batch Mode: jobs are billed at about half the realtime price and
+# don't count against realtime rate limits, but can take minutes to hours
+BATCH_POLL_INTERVAL = 30.0  # seconds between job status checks
+BATCH_MAX_WAIT = 3600.0  # seconds before a job is cancelled and callers fall back
+_BATCH_DONE_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+# Precompiled patterns for the JSON salvage paths
+# Match patterns like: "interaction_id": "123", ... "specific_pathway": "Some Pathway"
+# Handle both quoted and unquoted IDs
+_PARTIAL_ASSIGNMENT_RE = re.compile(
+    r'"interaction_id"\s*:\s*"?(\d+)"?\s*,\s*"specific_pathway"\s*:\s*"([^"]+)"',
+    re.IGNORECASE
+)
+_CODEBLOCK_RE = re.compile(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```', re.DOTALL)
+# A backslash escape, consumed together with the character it escapes
+_ESCAPE_RE = re.compile(r'\\.', re.DOTALL)
+# Tokens that matter to brace matching: a complete string literal, an
+# unterminated opening quote, an escape outside a string, or a brace
+_JSON_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|"|\\.|[{}]', re.DOTALL)
+
+@lru_cache(maxsize=1)
 def _get_api_key() -> str:
-    """Get Google API key from environment."""
+    """Get Google API key from environment (.env is only read on the first call)."""
     api_key = os.environ.get('GOOGLE_API_KEY')
     if not api_key:
         from dotenv import load_dotenv
@@ -28,40 +219,71 @@ def _get_api_key() -> str:
         raise RuntimeError("GOOGLE_API_KEY not found in environment")
     return api_key
 
+@lru_cache(maxsize=1)
+def _get_parse_fail_logger() -> logging.Logger:
+    """
+    Logger for full unparseable responses, written behind a queue.
+
+    Records go through a QueueHandler to a QueueListener thread that owns a
+    RotatingFileHandler on logs/json_parse_failures.log, so callers never
+    wait on file I/O. The listener is flushed and stopped at exit.
+    """
+    debug_file = PROJECT_ROOT / 'logs' / 'json_parse_failures.log'
+    debug_file.parent.mkdir(exist_ok=True)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        debug_file, maxBytes=5_000_000, backupCount=3, encoding='utf-8', delay=True
+    )
+    file_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    parse_fail_logger = logging.getLogger(f"{__name__}.parse_failures")
+    parse_fail_logger.setLevel(logging.INFO)
+    parse_fail_logger.propagate = False
+    parse_fail_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    return parse_fail_logger
+
+
+def _json_loads(text: str):
+    """
+    Parse JSON with orjson when available, falling back to the stdlib.
+
+    The stdlib retry keeps its leniencies (NaN/Infinity, huge integers, lone
+    surrogates). Raises json.JSONDecodeError on failure either way.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
 def _find_balanced_json(text: str, start_pos: int) -> str | None:
     """Find a balanced JSON object starting at start_pos."""
     if start_pos >= len(text) or text[start_pos] != '{':
         return None
 
     depth = 0
-    in_string = False
-    escape_next = False
-
-    for i in range(start_pos, len(text)):
-        char = text[i]
-
-        # Handle string escapes
-        if escape_next:
-            escape_next = False
-            continue
-
-        if char == '\\':
-            escape_next = True
-            continue
-
-        # Track string boundaries
-        if char == '"':
-            in_string = not in_string
-            continue
-
-        # Only count brackets outside strings
-        if not in_string:
-            if char == '{':
-                depth += 1
-            elif char == '}':
-                depth -= 1
-                if depth == 0:
-                    return text[start_pos:i+1]
+
+    # Skip whole string literals and escapes in C; only braces outside
+    # strings reach the Python loop
+    for match in _JSON_TOKEN_RE.finditer(text, start_pos):
+        token = match.group()
+
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start_pos:match.end()]
+        elif token == '"':
+            # Unterminated string runs to the end of the text
+            return None
 
     return None
 
@@ -72,10 +294,7 @@ def _extract_partial_assignments(text: str) -> list:
     Returns list of dicts with interaction_id and specific_pathway.
     """
     assignments = []
-    # Match patterns like: "interaction_id": "123", ... "specific_pathway": "Some Pathway"
-    # Handle both quoted and unquoted IDs
-    pattern = r'"interaction_id"\s*:\s*"?(\d+)"?\s*,\s*"specific_pathway"\s*:\s*"([^"]+)"'
-    matches = re.findall(pattern, text, re.IGNORECASE)
+    matches = _PARTIAL_ASSIGNMENT_RE.findall(text)
     for interaction_id, pathway in matches:
         assignments.append({
             'interaction_id': interaction_id,
@@ -96,18 +315,9 @@ def _fix_truncated_json(text: str) -> str:
     open_braces = text.count('{') - text.count('}')
     open_brackets = text.count('[') - text.count(']')
 
-    # Check if we're inside a string (unclosed quote)
-    in_string = False
-    escape_next = False
-    for char in text:
-        if escape_next:
-            escape_next = False
-            continue
-        if char == '\\':
-            escape_next = True
-            continue
-        if char == '"':
-            in_string = not in_string
+    # Check if we're inside a string (unclosed quote): drop escape sequences,
+    # then an odd number of remaining quotes means a string is still open
+    in_string = _ESCAPE_RE.sub('', text).count('"') % 2 == 1
 
     fixed = text
 
@@ -131,44 +341,49 @@ def _extract_json_from_text(text: str) -> dict:
         logger.warning("Empty response text")
         return {}
 
-    # Strategy 1: Try direct parsing
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+    # Whole-text parses (strategies 1 and 3) can only succeed when the text
+    # starts like JSON; every other strategy needs a '{' somewhere
+    looks_like_json = text.lstrip()[:1] in ('{', '[')
+    start = text.find('{')
 
-    # Strategy 2: Extract from ```json ... ``` blocks
-    match = re.search(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```', text, re.DOTALL)
-    if match:
+    # Strategy 1: Try direct parsing
+    if looks_like_json:
         try:
-            return json.loads(match.group(1))
+            return _json_loads(text)
         except json.JSONDecodeError:
             pass
 
+    # Strategy 2: Extract from ```json ... ``` blocks
+    if start != -1 and '```' in text:
+        match = _CODEBLOCK_RE.search(text)
+        if match:
+            try:
+                return _json_loads(match.group(1))
+            except json.JSONDecodeError:
+                pass
+
     # Strategy 3: Replace single quotes with double quotes (Python dict notation)
-    try:
-        fixed_quotes = text.replace("'", '"')
-        return json.loads(fixed_quotes)
-    except json.JSONDecodeError:
-        pass
+    if looks_like_json and "'" in text:
+        try:
+            fixed_quotes = text.replace("'", '"')
+            return _json_loads(fixed_quotes)
+        except json.JSONDecodeError:
+            pass
 
-    # Strategy 4: Balanced bracket search - find properly balanced JSON object
-    start = text.find('{')
     if start != -1:
+        # Strategy 4: Balanced bracket search - find properly balanced JSON object
         json_str = _find_balanced_json(text, start)
         if json_str:
             try:
-                return json.loads(json_str)
+                return _json_loads(json_str)
             except json.JSONDecodeError:
                 pass
 
-    # Strategy 5: Try to fix truncated JSON by closing brackets
-    start = text.find('{')
-    if start != -1:
+        # Strategy 5: Try to fix truncated JSON by closing brackets
         truncated_json = text[start:]
         fixed_json = _fix_truncated_json(truncated_json)
         try:
-            return json.loads(fixed_json)
+            return _json_loads(fixed_json)
         except json.JSONDecodeError:
             pass
 
@@ -188,32 +403,60 @@ def _extract_json_from_text(text: str) -> dict:
         f"  TAIL: {preview_tail if preview_tail else '(same as head)'}"
     )
 
-    # Log full response to file for debugging
+    # Log full response to file for debugging (written by a background thread)
     try:
-        debug_file = PROJECT_ROOT / 'logs' / 'json_parse_failures.log'
-        debug_file.parent.mkdir(exist_ok=True)
-        with open(debug_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n{'='*80}\n")
-            f.write(f"TIMESTAMP: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"RESPONSE LENGTH: {response_len}\n")
-            f.write(f"FULL RESPONSE:\n{text}\n")
+        _get_parse_fail_logger().warning(
+            f"\n{'='*80}\n"
+            f"TIMESTAMP: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"RESPONSE LENGTH: {response_len}\n"
+            f"FULL RESPONSE:\n{text}"
+        )
     except Exception as e:
         logger.debug(f"Could not write debug log: {e}")
 
     return {}
 
+@lru_cache(maxsize=4)
+def _get_client(api_key: str, timeout: float = DEFAULT_TIMEOUT):
+    """Return a shared genai.Client per API key/timeout so its HTTP connections are reused."""
+    from google import genai
+    from google.genai import types
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(timeout=int(timeout * 1000)),  # milliseconds
+    )
+
+
 def _call_gemini_json(
     prompt: str,
     api_key: str = None,
     max_retries: int = 3,
     temperature: float = 0.3,
-    max_output_tokens: int = 16384
+    max_output_tokens: int = 16384,
+    timeout: float = DEFAULT_TIMEOUT,
+    raise_errors: bool = False
 ) -> dict:
     """
     Call Gemini 2.5 Pro and parse JSON response.
+
+    Args:
+        prompt: Prompt text
+        api_key: API key (defaults to GOOGLE_API_KEY)
+        max_retries: Attempts before giving up (at least one is always made)
+        temperature: Sampling temperature
+        max_output_tokens: Output cap, including THINKING_BUDGET thinking tokens
+        timeout: Per-request timeout in seconds
+        raise_errors: Raise instead of returning {} when every attempt failed
+
+    Returns:
+        Parsed JSON dict, or {} on failure
+
+    Raises:
+        LLMRateLimitError: raise_errors is set and the last failure was a 429
+        LLMTransientError: raise_errors is set and the last failure was retryable
+        Exception: raise_errors is set and the call failed with a terminal error
     """
     try:
-        from google import genai
         from google.genai import types
     except ImportError:
         logger.error("google-genai SDK not installed. Please run `pip install google-genai`.")
@@ -226,20 +469,26 @@ def _call_gemini_json(
             logger.error(str(e))
             return {}
 
-    client = genai.Client(api_key=api_key)
+    client = _get_client(api_key, timeout)
     config = types.GenerateContentConfig(
         max_output_tokens=max_output_tokens,
         temperature=temperature,
         top_p=0.95,
         response_mime_type="application/json",
-        thinking_config=types.ThinkingConfig(thinking_budget=4096),
+        thinking_config=types.ThinkingConfig(thinking_budget=THINKING_BUDGET),
     )
 
+    max_retries = max(1, max_retries)
     last_err = None
+    last_kind = None
+    # Rough token estimate (~4 chars per token) plus the output budget
+    est_tokens = len(prompt) // 4 + max_output_tokens
+
     for attempt in range(1, max_retries + 1):
         try:
+            RATE_LIMITER.acquire(est_tokens)
             resp = client.models.generate_content(
-                model="gemini-3-flash-preview", # Using Flash 2.0 or Pro 1.5 as 2.5 might not be avail? 
+                model=GEMINI_MODEL, # Using Flash 2.0 or Pro 1.5 as 2.5 might not be avail? 
                 # User config says "2.5 Pro" but user instructions clarify "gemini-3-flash-preview" in past context
                 # Safe bet: gemini-1.5-pro-latest or gemini-2.0-flash-exp. 
                 # Let's try gemini-1.5-pro-002 (reliable) or gemini-2.0-flash-exp (fast).
@@ -262,13 +511,121 @@ def _call_gemini_json(
             
         except Exception as e:
             last_err = e
+            last_kind = _classify_llm_error(e)
             logger.warning(f"Attempt {attempt} failed: {e}")
-            time.sleep(2 * attempt)
-
-    logger.error(f"LLM call failed after {max_retries} attempts: {last_err}")
+            if last_kind == 'terminal':
+                # Retrying a client error would fail the same way
+                break
+            if attempt < max_retries:
+                # Jittered, capped backoff so parallel workers don't retry in lockstep
+                time.sleep(min(30.0, random.uniform(1.0, 2.0 ** attempt)))
+
+    logger.error(f"LLM call failed after {attempt} attempt(s): {last_err}")
+    if raise_errors:
+        if last_kind == 'rate_limit':
+            raise LLMRateLimitError(str(last_err)) from last_err
+        if last_kind == 'transient':
+            raise LLMTransientError(str(last_err)) from last_err
+        raise last_err
     return {}
 
 
+def _call_gemini_batch(
+    prompts: list,
+    api_key: str = None,
+    temperature: float = 0.3,
+    max_output_tokens: int = 16384,
+    poll_interval: float = BATCH_POLL_INTERVAL,
+    max_wait: float = BATCH_MAX_WAIT
+):
+    """
+    Run many prompts as one Gemini Batch Mode job and parse each JSON response.
+
+    Requests are sent inline with the same generation config as
+    _call_gemini_json. Only for offline passes: the call blocks, polling the
+    job, until it finishes or `max_wait` runs out (the job is then cancelled).
+
+    Args:
+        prompts: Prompt texts
+        api_key: API key (defaults to GOOGLE_API_KEY)
+        temperature: Sampling temperature
+        max_output_tokens: Output cap per request, including THINKING_BUDGET
+        poll_interval: Seconds between status checks
+        max_wait: Wall-clock budget in seconds
+
+    Returns:
+        Parsed JSON dict per prompt, in order ({} where a request failed or
+        didn't parse), or None if the job couldn't run or finish in time;
+        callers should then fall back to realtime calls
+    """
+    if not prompts:
+        return []
+
+    if api_key is None:
+        try:
+            api_key = _get_api_key()
+        except RuntimeError as e:
+            logger.error(str(e))
+            return None
+
+    try:
+        client = _get_client(api_key)
+    except ImportError:
+        logger.error("google-genai SDK not installed. Please run `pip install google-genai`.")
+        return None
+
+    config = {
+        "max_output_tokens": max_output_tokens,
+        "temperature": temperature,
+        "top_p": 0.95,
+        "response_mime_type": "application/json",
+        "thinking_config": {"thinking_budget": THINKING_BUDGET},
+    }
+    requests = [
+        {"contents": [{"role": "user", "parts": [{"text": prompt}]}], "config": config}
+        for prompt in prompts
+    ]
+
+    try:
+        job = client.batches.create(
+            model=GEMINI_MODEL,
+            src=requests,
+            config={"display_name": f"pathway-v2-{int(time.time())}"},
+        )
+        logger.info(f"Submitted batch job {job.name} with {len(prompts)} requests")
+        deadline = time.monotonic() + max_wait
+        while job.state.name not in _BATCH_DONE_STATES:
+            if time.monotonic() > deadline:
+                logger.warning(f"Batch job {job.name} still {job.state.name} after {max_wait:.0f}s; cancelling")
+                client.batches.cancel(name=job.name)
+                return None
+            time.sleep(poll_interval)
+            job = client.batches.get(name=job.name)
+    except Exception as e:
+        logger.error(f"Batch job failed: {e}")
+        return None
+
+    if job.state.name != "JOB_STATE_SUCCEEDED":
+        logger.error(f"Batch job {job.name} ended in {job.state.name}")
+        return None
+
+    responses = job.dest.inlined_responses if job.dest else None
+    if not responses or len(responses) != len(prompts):
+        logger.error(f"Batch job {job.name} returned {len(responses or [])} responses for {len(prompts)} requests")
+        return None
+
+    results = []
+    for r in responses:
+        text = ""
+        if getattr(r, "response", None) is not None:
+            try:
+                text = r.response.text or ""
+            except Exception:
+                text = ""
+        results.append(_extract_json_from_text(text) if text else {})
+    return results
+
+
 # ==============================================================================
 # CACHED LLM CALLS
 # ==============================================================================
@@ -2,36 +2,123 @@
 """
 Run Full V2 Pipeline
 ====================
-Executes Steps 1 through 5 sequentially.
+Executes Steps 1 through 6 and verification.
+
+Each step lists the steps it depends on; a step starts as soon as all of its
+dependencies have finished, so independent steps run concurrently. Today every
+step reads what the previous one wrote, so the graph is a single chain.
+Use --sequential to run the steps strictly one after another.
 """
+import argparse
+import os
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
+# (step name, names of the steps it depends on)
 STEPS = [
-    "scripts/pathway_v2/step1_init_roots.py",
-    "scripts/pathway_v2/step2_assign_initial_terms.py",
-    "scripts/pathway_v2/step3_refine_pathways.py",
-    "scripts/pathway_v2/step4_build_hierarchy_backwards.py",
-    "scripts/pathway_v2/step5_discover_siblings.py",
-    "scripts/pathway_v2/step6_reorganize_pathways.py",
-    "scripts/pathway_v2/verify_pipeline.py"
+    ("step1_init_roots", ()),
+    ("step2_assign_initial_terms", ("step1_init_roots",)),
+    ("step3_refine_pathways", ("step2_assign_initial_terms",)),
+    ("step4_build_hierarchy_backwards", ("step3_refine_pathways",)),
+    ("step5_discover_siblings", ("step4_build_hierarchy_backwards",)),
+    ("step6_reorganize_pathways", ("step5_discover_siblings",)),
+    ("verify_pipeline", ("step6_reorganize_pathways",)),
 ]
 
-def run_step(script_path):
-    print(f"\n>>> RUNNING: {script_path}")
+
+def script_path(name):
+    return f"scripts/pathway_v2/{name}.py"
+
+
+def run_step(name):
+    """
+    Run one step script and return its exit code.
+
+    The child runs unbuffered and its output is streamed line by line as it
+    arrives, prefixed with the step name so concurrent steps stay readable.
+    """
+    path = script_path(name)
+    print(f"\n>>> RUNNING: {path}", flush=True)
     start = time.time()
-    result = subprocess.run([sys.executable, script_path], capture_output=False)
+    process = subprocess.Popen(
+        [sys.executable, path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env={**os.environ, 'PYTHONUNBUFFERED': '1'},
+    )
+    for line in process.stdout:
+        print(f"[{name}] {line}", end='', flush=True)
+    returncode = process.wait()
     duration = time.time() - start
-    print(f">>> FINISHED: {script_path} in {duration:.1f}s (Exit Code: {result.returncode})")
-    if result.returncode != 0:
-        print("!!! ERROR: Step failed. Stopping pipeline.")
-        sys.exit(result.returncode)
+    print(f">>> FINISHED: {path} in {duration:.1f}s (Exit Code: {returncode})", flush=True)
+    return returncode
+
+
+def run_sequential():
+    """Run every step in order; return the first non-zero exit code, else 0."""
+    for name, _ in STEPS:
+        returncode = run_step(name)
+        if returncode != 0:
+            return returncode
+    return 0
+
+
+def run_parallel():
+    """
+    Run steps as their dependencies complete.
+
+    Steps are subprocesses, so a thread pool is enough to overlap them. After
+    a failure no new steps are started; steps already running are allowed to
+    finish.
+
+    Returns:
+        The first non-zero exit code, else 0
+    """
+    remaining = dict(STEPS)
+    done = set()
+    running = {}
+    failed_code = 0
+
+    with ThreadPoolExecutor(max_workers=len(STEPS)) as executor:
+        while remaining or running:
+            if not failed_code:
+                ready = [name for name, deps in remaining.items() if done.issuperset(deps)]
+                for name in ready:
+                    del remaining[name]
+                    running[executor.submit(run_step, name)] = name
+
+            if not running:
+                if remaining and not failed_code:
+                    raise ValueError(f"Unsatisfiable step dependencies: {sorted(remaining)}")
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                returncode = future.result()
+                if returncode != 0:
+                    failed_code = failed_code or returncode
+                else:
+                    done.add(name)
+
+    return failed_code
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the full V2 pathway pipeline")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Run steps strictly one after another")
+    args = parser.parse_args()
+
     print("Starting V2 Pathway Pipeline...")
-    for script in STEPS:
-        run_step(script)
+    returncode = run_sequential() if args.sequential else run_parallel()
+    if returncode != 0:
+        print("!!! ERROR: Step failed. Stopping pipeline.")
+        sys.exit(returncode)
     print("\nALL STEPS COMPLETED SUCCESSFULLY.")
 
 if __name__ == "__main__":
@@ -55,9 +55,12 @@ def init_roots():
     with app.app_context():
         logger.info("Checking Root Pathways...")
         
-        # 1. Ensure all defined roots exist
+        # 1. Ensure all defined roots exist (one lookup for all names)
+        names = [r['name'] for r in ROOT_PATHWAYS]
+        existing = {p.name: p for p in Pathway.query.filter(Pathway.name.in_(names)).all()}
+
         for root_def in ROOT_PATHWAYS:
-            pathway = Pathway.query.filter_by(name=root_def['name']).first()
+            pathway = existing.get(root_def['name'])
             if not pathway:
                 logger.info(f"Creating NEW root: {root_def['name']}")
                 pathway = Pathway(
@@ -76,16 +79,17 @@ def init_roots():
                     logger.warning(f"Correcting hierarchy_level for {pathway.name} (was {pathway.hierarchy_level} -> 0)")
                     pathway.hierarchy_level = 0
                 pathway.description = root_def['description']
-                
-                # Check for parents (Roots should NOT have parents in our strict tree)
-                parents = PathwayParent.query.filter_by(child_pathway_id=pathway.id).all()
-                if parents:
-                    logger.warning(f"Root '{pathway.name}' has parents! Removing them to enforce Strict Tree.")
-                    for p in parents:
-                        db.session.delete(p)
-                        
-        db.session.commit()
-        
+
+        # Check for parents (Roots should NOT have parents in our strict tree)
+        if existing:
+            root_ids = {p.id: p.name for p in existing.values()}
+            parents_query = PathwayParent.query.filter(PathwayParent.child_pathway_id.in_(list(root_ids)))
+            with_parents = {cid for (cid,) in parents_query.with_entities(PathwayParent.child_pathway_id).distinct()}
+            for root_id in sorted(with_parents):
+                logger.warning(f"Root '{root_ids[root_id]}' has parents! Removing them to enforce Strict Tree.")
+            if with_parents:
+                parents_query.delete(synchronize_session=False)
+
         # 2. Check for ILLEGAL roots (everything else at level 0)
         valid_names = {r['name'] for r in ROOT_PATHWAYS}
         existing_roots = Pathway.query.filter_by(hierarchy_level=0).all()
@@ -95,7 +99,8 @@ def init_roots():
                 logger.warning(f"Found ILLEGAL ROOT: '{p.name}'. Demoting to Level 1 (Unknown Parent).")
                 p.hierarchy_level = 1
                 # We can't assign a parent automatically here, but we push it down so it's not a root.
-                
+
+        # One transaction for the whole initialization
         db.session.commit()
         logger.info("Root Pathway Initialization Complete.")
 
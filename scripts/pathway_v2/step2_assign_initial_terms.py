@@ -9,18 +9,27 @@ Different functions between the same protein pair can (and often do) belong to
 different pathways. Each function is evaluated independently.
 
 GUARANTEE: 100% of interactions MUST have step2_proposal when this function completes.
-Uses retry cascade: batch → split → individual until success.
+Uses retry cascade: batch → bisect → individual until success.
 
 Goldilocks Principle:
 - Not too broad (e.g., "Metabolism" is BAD).
 - Not too specific (e.g., "ATXN3 phosphorylation" is BAD).
 - Just right (e.g., "Protein Quality Control" is okay, "Aggrephagy" is better).
 
+Results are written with bulk_update_mappings(), which issues one executemany
+UPDATE per batch. On Postgres/psycopg2 the engine is created with
+executemany_mode='values_plus_batch' (see app.py), so that runs as paged
+batches rather than a round-trip per interaction.
+
 Usage:
     python3 scripts/pathway_v2/step2_assign_initial_terms.py
 """
 
 import sys
+import asyncio
+import bisect
+import random
+import string
 import logging
 import time
 from pathlib import Path
@@ -34,10 +43,35 @@ sys.path.insert(0, str(PROJECT_ROOT))
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-from scripts.pathway_v2.llm_utils import _call_gemini_json
+from scripts.pathway_v2.llm_utils import (
+    _call_gemini_json,
+    THINKING_BUDGET,
+    RESPONSE_CACHE,
+    RESPONSE_CACHE_ENABLED,
+    LLMRateLimitError,
+    LLMTransientError,
+    LLMShapeError,
+)
+from scripts.pathway_v2.async_utils import parallel_llm_calls_stream, chunk_list, MAX_CONCURRENT_FLASH
 
 BATCH_SIZE = 20
 MAX_RETRY_ROUNDS = 5  # Maximum retry rounds for failed batches
+RETRY_BATCH_SIZE = 10  # Starting batch size in the retry cascade, bisected on failure
+
+# Per-call LLM bounds, sized to the expected JSON (~120 tokens per function
+# assignment with reasoning) on top of the model's thinking budget
+TOKENS_PER_FUNCTION = 120
+RESPONSE_OVERHEAD_TOKENS = 256
+MAX_OUTPUT_TOKENS = 16384
+# Functions whose answers fit in one batch's output cap (~100)
+MAX_BATCH_FUNCTIONS = (MAX_OUTPUT_TOKENS - THINKING_BUDGET - RESPONSE_OVERHEAD_TOKENS) // TOKENS_PER_FUNCTION
+LLM_TIMEOUT = 120  # seconds
+LLM_MAX_RETRIES = 3
+
+# Backoff between retry-cascade calls after rate-limit/transient failures
+BACKOFF_BASE = 1.0  # seconds
+BACKOFF_JITTER = 1.0
+BACKOFF_MAX = 30.0
 
 STEP2_PROMPT = """You are a biological pathway curator with a "Goldilocks" mindset.
 Task: Assign a SINGLE, highly appropriate Pathway Name to EACH FUNCTION of each protein-protein interaction.
@@ -110,130 +144,421 @@ Respond with ONLY JSON:
 """
 
 
-def _get_existing_pathways(db) -> tuple[Set[str], str]:
-    """Get existing pathway names with hierarchy info for prompt.
-    
-    Returns:
-        Tuple of (set of all pathway names, formatted string showing hierarchy levels)
+def _split_template(template: str) -> tuple:
     """
-    try:
-        from models import Pathway
-        pathways = Pathway.query.all()
-        
-        if not pathways:
-            return set(), "None yet"
-        
-        # Group by hierarchy level
-        by_level = {}
-        for p in pathways:
-            if p.name:
-                level = p.hierarchy_level if p.hierarchy_level is not None else 0
-                by_level.setdefault(level, []).append(p.name)
-        
-        # Format for prompt - show structure with specificity guidance
+    Split a str.format template into (literal, field) pairs once at import.
+
+    Prompts are then built by plain concatenation in _render_template instead
+    of re-parsing the ~3KB template on every call. {{ }} escapes are already
+    resolved in the literals; the last pair's field is None.
+    """
+    return tuple((literal, field) for literal, field, _, _ in string.Formatter().parse(template))
+
+
+def _render_template(parts: tuple, **values) -> str:
+    """Fill a template split by _split_template; equivalent to template.format(**values)."""
+    return "".join([
+        literal if field is None else literal + str(values[field])
+        for literal, field in parts
+    ])
+
+
+STEP2_PROMPT_PARTS = _split_template(STEP2_PROMPT)
+SIMPLE_PROMPT_PARTS = _split_template(SIMPLE_PROMPT)
+
+class PathwayIndex:
+    """
+    Pathway names grouped by hierarchy level, plus the prompt listing built
+    from them.
+
+    The listing is cached and only rebuilt after add() sees a name it didn't
+    already have. The first pass builds all of its prompts before any call
+    returns, so only the retry cascade's prompts include names proposed
+    earlier in the run.
+    """
+
+    MAX_PER_LEVEL = 25  # Limit per level to avoid prompt bloat
+    NEW_PATHWAY_LEVEL = 2  # Proposals made during this run are specific terms
+
+    def __init__(self):
+        self.by_level: Dict[int, List[str]] = {}
+        self.names: Set[str] = set()
+        self._formatted = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self.names
+
+    def add(self, name: str, level: int = NEW_PATHWAY_LEVEL) -> bool:
+        """Add a pathway name; returns True if it was new."""
+        if not name or name in self.names:
+            return False
+        self.names.add(name)
+        bisect.insort(self.by_level.setdefault(level, []), name)
+        self._formatted = None
+        return True
+
+    def update(self, names, level: int = NEW_PATHWAY_LEVEL) -> None:
+        for name in names:
+            self.add(name, level)
+
+    @property
+    def formatted(self) -> str:
+        """Hierarchy listing for the prompt, e.g. "Level 1 (Broad ...): A, B"."""
+        if self._formatted is None:
+            self._formatted = self._format()
+        return self._formatted
+
+    def _format(self) -> str:
+        # Show structure with specificity guidance
         lines = []
-        for level in sorted(by_level.keys()):
-            names = sorted(by_level[level])[:25]  # Limit per level to avoid prompt bloat
+        for level in sorted(self.by_level):
+            level_names = self.by_level[level]
+            names = level_names[:self.MAX_PER_LEVEL]
             if level == 0:
                 prefix = "Level 0 (ROOT - AVOID unless function spans multiple children)"
             elif level == 1:
                 prefix = "Level 1 (Broad - prefer more specific if available)"
             else:
                 prefix = f"Level {level}+ (Specific - PREFERRED)"
-            
-            if len(by_level[level]) > 25:
-                lines.append(f"  {prefix}: {', '.join(names)}, ... (+{len(by_level[level]) - 25} more)")
+
+            if len(level_names) > self.MAX_PER_LEVEL:
+                lines.append(f"  {prefix}: {', '.join(names)}, ... (+{len(level_names) - self.MAX_PER_LEVEL} more)")
             else:
                 lines.append(f"  {prefix}: {', '.join(names)}")
-        
-        formatted = "\n".join(lines) if lines else "None yet"
-        all_names = {p.name for p in pathways if p.name}
-        return all_names, formatted
+
+        return "\n".join(lines) if lines else "None yet"
+
+
+def _get_existing_pathways(db) -> PathwayIndex:
+    """Get existing pathway names with hierarchy info for prompt.
+    
+    Returns:
+        PathwayIndex of all pathway names by hierarchy level
+    """
+    index = PathwayIndex()
+    try:
+        from models import Pathway
+        for name, level in db.session.query(Pathway.name, Pathway.hierarchy_level):
+            index.add(name, level if level is not None else 0)
     except Exception as e:
         logger.warning(f"Could not fetch existing pathways: {e}")
-        return set(), "None yet"
+        return PathwayIndex()
+    return index
+
+
+def _prefetch_hints(interactions: List, db) -> Dict[int, List[str]]:
+    """
+    Get pathway hints for many interactions with a single query.
 
+    Hints are the step2_proposal values of other interactions that share a
+    protein with the interaction.
 
-def _get_protein_pathway_hints(interaction, db) -> List[str]:
-    """Get pathway hints from other interactions involving the same proteins."""
+    Returns:
+        Dict of interaction ID -> up to 5 unique hints
+    """
     try:
         from models import Interaction
-        protein_a_id = interaction.protein_a_id
-        protein_b_id = interaction.protein_b_id
-
-        # Find interactions involving either protein that have pathway assignments
-        related = Interaction.query.filter(
-            ((Interaction.protein_a_id == protein_a_id) |
-             (Interaction.protein_b_id == protein_a_id) |
-             (Interaction.protein_a_id == protein_b_id) |
-             (Interaction.protein_b_id == protein_b_id)) &
-            (Interaction.id != interaction.id)
-        ).all()
-
-        hints = []
-        for r in related:
-            if r.data and 'step2_proposal' in r.data:
-                hints.append(r.data['step2_proposal'])
-
-        return list(set(hints))[:5]  # Return up to 5 unique hints
+        from sqlalchemy import or_
+        from sqlalchemy.orm import load_only
+
+        protein_ids = {i.protein_a_id for i in interactions} | {i.protein_b_id for i in interactions}
+        if not protein_ids:
+            return {}
+
+        # Find interactions involving any of the proteins
+        related = Interaction.query.options(
+            load_only(Interaction.id, Interaction.protein_a_id, Interaction.protein_b_id, Interaction.data)
+        ).filter(
+            or_(Interaction.protein_a_id.in_(protein_ids), Interaction.protein_b_id.in_(protein_ids))
+        ).order_by(Interaction.id).all()
     except Exception as e:
         logger.debug(f"Could not get pathway hints: {e}")
-        return []
+        return {}
 
+    # protein_id -> [(interaction_id, proposal)] for interactions with assignments
+    proposals_by_protein = {}
+    for r in related:
+        if r.data and 'step2_proposal' in r.data:
+            for protein_id in {r.protein_a_id, r.protein_b_id}:
+                proposals_by_protein.setdefault(protein_id, []).append((r.id, r.data['step2_proposal']))
+
+    hints = {}
+    for interaction in interactions:
+        # Ordered dedupe so the same interaction always gets the same prompt
+        found = dict.fromkeys(
+            proposal
+            for protein_id in (interaction.protein_a_id, interaction.protein_b_id)
+            for related_id, proposal in proposals_by_protein.get(protein_id, ())
+            if related_id != interaction.id
+        )
+        hints[interaction.id] = list(found)[:5]  # Up to 5 unique hints
+    return hints
+
+
+def _attach_proteins(interactions: List) -> None:
+    """
+    Load the proteins of already-loaded interactions in one query and attach
+    them as protein_a/protein_b, so prompt building doesn't lazy-load two
+    proteins per interaction.
+    """
+    try:
+        from models import Protein
+        from sqlalchemy.orm import object_session
+        from sqlalchemy.orm.attributes import set_committed_value
+
+        session = object_session(interactions[0]) if interactions else None
+        if session is None:
+            return
+
+        protein_ids = {i.protein_a_id for i in interactions} | {i.protein_b_id for i in interactions}
+        proteins = {p.id: p for p in session.query(Protein).filter(Protein.id.in_(protein_ids)).all()}
+        for i in interactions:
+            set_committed_value(i, 'protein_a', proteins.get(i.protein_a_id))
+            set_committed_value(i, 'protein_b', proteins.get(i.protein_b_id))
+    except Exception as e:
+        logger.debug(f"Could not preload proteins: {e}")
+
+
+def _format_interaction(item, emit=None) -> str | None:
+    """
+    Format a single interaction with ALL its functions for the prompt.
+
+    Args:
+        item: Interaction to format
+        emit: Optional callable (e.g. a shared list's append) that receives
+              each prompt line; batches use this to join all lines once
+
+    Returns:
+        The formatted lines joined with newlines, or None when `emit` is given
+    """
+    if emit is None:
+        lines = []
+        _format_interaction(item, lines.append)
+        return "\n".join(lines)
 
-def _format_interaction(item) -> str:
-    """Format a single interaction with ALL its functions for the prompt."""
     funcs = item.data.get('functions', []) if item.data else []
+    header = f"- ID: {item.id} | Proteins: {item.protein_a.symbol} <-> {item.protein_b.symbol}"
 
     if not funcs:
-        return f"- ID: {item.id} | Proteins: {item.protein_a.symbol} <-> {item.protein_b.symbol} | Functions: [No functions - assign based on interaction type]"
+        emit(f"{header} | Functions: [No functions - assign based on interaction type]")
+        return None
 
-    func_details = []
+    emit(header)
+    emit("  Functions:")
     for idx, f in enumerate(funcs):
         desc = f.get('description') or f.get('function') or str(f) if isinstance(f, dict) else str(f)
-        func_details.append(f"    [{idx}] {desc[:150]}")
+        emit(f"    [{idx}] {desc[:150]}")
+    return None
 
-    func_str = "\n".join(func_details)
-    return f"- ID: {item.id} | Proteins: {item.protein_a.symbol} <-> {item.protein_b.symbol}\n  Functions:\n{func_str}"
 
+def _function_count(item) -> int:
+    """Number of assignments expected for an interaction (at least one)."""
+    return max(1, len(item.data.get('functions', []) if item.data else []))
 
-def _process_batch(batch: List, existing_pathways: Set[str], pathways_formatted: str, db) -> Dict[str, Dict]:
+
+def _max_output_tokens(interactions: List) -> int:
+    """Output token cap for a prompt covering these interactions' functions."""
+    n_functions = sum(_function_count(item) for item in interactions)
+    return min(
+        MAX_OUTPUT_TOKENS,
+        THINKING_BUDGET + RESPONSE_OVERHEAD_TOKENS + TOKENS_PER_FUNCTION * n_functions
+    )
+
+
+def _pack_batches(interactions: List, max_items: int = BATCH_SIZE, max_functions: int = None) -> List[List]:
     """
-    Process a batch of interactions. Returns dict of:
-    {interaction_id: {"function_pathways": [...], "primary_pathway": "..."}}
+    Group interactions into batches whose answers fit the output cap.
 
-    Note: `db` parameter is unused here but kept for API consistency with
-    _process_single and _retry_cascade which do use it.
+    Interactions are sorted by function count, largest first, and packed
+    greedily: a batch closes at `max_items` interactions or when the next one
+    would push its function count past `max_functions`. Batches then have
+    similar token footprints, and the heaviest are sent first so they aren't
+    the tail of the run.
+
+    Args:
+        interactions: Interactions to batch
+        max_items: Maximum interactions per batch
+        max_functions: Maximum functions per batch (defaults to MAX_BATCH_FUNCTIONS)
+
+    Returns:
+        List of batches
     """
-    if not batch:
+    if max_functions is None:
+        max_functions = MAX_BATCH_FUNCTIONS
+    batches = []
+    batch, running = [], 0
+    for item in sorted(interactions, key=lambda i: (-_function_count(i), i.id)):
+        n = _function_count(item)
+        if batch and (len(batch) >= max_items or running + n > max_functions):
+            batches.append(batch)
+            batch, running = [], 0
+        batch.append(item)
+        running += n
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _call_step2_llm(
+    prompt: str,
+    max_output_tokens: int,
+    temperature: float,
+    raise_errors: bool = False,
+    cache: bool = False,
+    check_shape=None
+) -> Dict:
+    """
+    Call the LLM with Step 2's output cap, timeout and retry bounds.
+
+    If `check_shape` is given and rejects the parsed response (raises
+    LLMShapeError), the prompt is re-sent once before giving up; a malformed
+    answer costs one targeted retry instead of the whole batch falling into
+    the retry cascade. With `cache`, the response is served from
+    RESPONSE_CACHE on a hit and stored only after it passed `check_shape`.
+
+    Returns:
+        Parsed response, or {} when it is still malformed and raise_errors is off
+
+    Raises:
+        LLMShapeError: raise_errors is set and the retry was malformed too
+    """
+    cache = cache and RESPONSE_CACHE_ENABLED
+    if cache:
+        cached = RESPONSE_CACHE.get(prompt, temperature, max_output_tokens)
+        if cached is not None:
+            return cached
+
+    resp = _call_gemini_json(
+        prompt,
+        temperature=temperature,
+        max_output_tokens=max_output_tokens,
+        timeout=LLM_TIMEOUT,
+        max_retries=LLM_MAX_RETRIES,
+        raise_errors=raise_errors
+    )
+    if check_shape is None or (not resp and not raise_errors):
+        # Without raise_errors an empty response may be a call that already
+        # exhausted its retries; don't send it again
+        if cache and resp:
+            RESPONSE_CACHE.set(prompt, temperature, max_output_tokens, resp)
+        return resp
+    try:
+        check_shape(resp)
+    except LLMShapeError as e:
+        logger.warning(f"Malformed Step 2 response ({e}); retrying once")
+    else:
+        if cache:
+            RESPONSE_CACHE.set(prompt, temperature, max_output_tokens, resp)
+        return resp
+
+    resp = _call_gemini_json(
+        prompt,
+        temperature=temperature,
+        max_output_tokens=max_output_tokens,
+        timeout=LLM_TIMEOUT,
+        max_retries=LLM_MAX_RETRIES,
+        raise_errors=raise_errors
+    )
+    try:
+        check_shape(resp)
+    except LLMShapeError:
+        if raise_errors:
+            raise
         return {}
+    if cache:
+        RESPONSE_CACHE.set(prompt, temperature, max_output_tokens, resp)
+    return resp
+
+
+def _check_batch_shape(resp) -> None:
+    """Raise LLMShapeError unless resp looks like {"assignments": [{...}, ...]}."""
+    if not isinstance(resp, dict) or not isinstance(resp.get('assignments'), list):
+        raise LLMShapeError("expected an object with an 'assignments' list")
+    if resp['assignments'] and not any(isinstance(a, dict) for a in resp['assignments']):
+        raise LLMShapeError("'assignments' has no objects")
 
-    batch_map = {str(item.id): item for item in batch}
-    items_str = "\n".join([_format_interaction(item) for item in batch])
 
-    prompt = STEP2_PROMPT.format(
+def _check_single_shape(resp) -> None:
+    """Raise LLMShapeError unless resp has a primary_pathway string."""
+    if not isinstance(resp, dict) or not isinstance(resp.get('primary_pathway'), str):
+        raise LLMShapeError("expected an object with a 'primary_pathway' string")
+
+
+def _function_pathways(result: Dict) -> List[Dict]:
+    """The result's function_pathways entries, keeping only objects."""
+    entries = result.get('function_pathways')
+    if not isinstance(entries, list):
+        return []
+    return [fp for fp in entries if isinstance(fp, dict)]
+
+
+def _sleep_backoff(attempt: int) -> None:
+    """Sleep with capped exponential backoff plus jitter for the given failure count."""
+    time.sleep(min(BACKOFF_BASE * 2 ** attempt + random.uniform(0, BACKOFF_JITTER), BACKOFF_MAX))
+
+
+def _build_batch_prompt(batch: List, pathways_formatted: str) -> str:
+    """Build the Step 2 prompt for a batch of interactions."""
+    parts: List[str] = []
+    for item in batch:
+        _format_interaction(item, parts.append)
+    items_str = "\n".join(parts)
+    return _render_template(
+        STEP2_PROMPT_PARTS,
         existing_pathways=pathways_formatted,
         interactions_list=items_str
     )
 
-    resp = _call_gemini_json(prompt, temperature=0.2)
-    assignments = resp.get('assignments', [])
 
+def _parse_batch_response(batch: List, resp: Dict, index: PathwayIndex = None) -> Dict[str, Dict]:
+    """
+    Map a batch LLM response to {interaction_id: result} for the batch's interactions.
+
+    If `index` is given, the proposed pathway names are added to it in the
+    same pass, so callers don't walk the results again.
+    """
+    batch_ids = {str(item.id) for item in batch}
     results = {}
-    for a in assignments:
+    for a in resp.get('assignments', []):
+        if not isinstance(a, dict):
+            continue  # Malformed entry; its interaction falls through to the retry cascade
         str_id = str(a.get('interaction_id'))
-        if str_id in batch_map:
-            results[str_id] = {
-                "function_pathways": a.get('function_pathways', []),
+        if str_id in batch_ids:
+            result = {
+                "function_pathways": _function_pathways(a),
                 "primary_pathway": a.get('primary_pathway')
             }
-
+            results[str_id] = result
+            if index is not None:
+                index.update(_extract_pathways_from_result(result))
     return results
 
 
-def _process_single(interaction, existing_pathways: Set[str], pathways_formatted: str, db) -> Dict | None:
+def _process_batch(batch: List, index: PathwayIndex, db) -> Dict[str, Dict]:
+    """
+    Process a batch of interactions. Returns dict of:
+    {interaction_id: {"function_pathways": [...], "primary_pathway": "..."}}
+    Proposed pathway names are added to `index` while parsing.
+
+    Note: `db` parameter is unused here but kept for API consistency with
+    _retry_cascade, which uses it to prefetch hints.
+    """
+    if not batch:
+        return {}
+
+    prompt = _build_batch_prompt(batch, index.formatted)
+    resp = _call_step2_llm(prompt, _max_output_tokens(batch), temperature=0.2, raise_errors=True,
+                           check_shape=_check_batch_shape)
+    return _parse_batch_response(batch, resp, index)
+
+
+def _process_single(interaction, index: PathwayIndex, hints: List[str]) -> Dict | None:
     """
     Process a single interaction with simplified prompt.
+    `hints` are pathway names from related interactions (see _prefetch_hints).
     Returns dict with function_pathways and primary_pathway, or None.
     """
     funcs = interaction.data.get('functions', []) if interaction.data else []
@@ -248,18 +573,16 @@ def _process_single(interaction, existing_pathways: Set[str], pathways_formatted
             func_details.append(f"[{idx}] {desc[:150]}")
         funcs_str = "\n".join(func_details)
 
-    # Get pathway hints from related interactions
-    hints = _get_protein_pathway_hints(interaction, db)
-
     # Combine existing pathways and hints for the prompt
     # Use formatted string but append hints if any
     if hints:
         hints_str = ", ".join(hints[:10])
-        prompt_pathways = f"{pathways_formatted}\n  Hints from related interactions: {hints_str}"
+        prompt_pathways = f"{index.formatted}\n  Hints from related interactions: {hints_str}"
     else:
-        prompt_pathways = pathways_formatted
+        prompt_pathways = index.formatted
 
-    prompt = SIMPLE_PROMPT.format(
+    prompt = _render_template(
+        SIMPLE_PROMPT_PARTS,
         existing_pathways=prompt_pathways,
         protein_a=interaction.protein_a.symbol,
         protein_b=interaction.protein_b.symbol,
@@ -267,12 +590,13 @@ def _process_single(interaction, existing_pathways: Set[str], pathways_formatted
         interaction_id=interaction.id
     )
 
-    resp = _call_gemini_json(prompt, temperature=0.3)
+    resp = _call_step2_llm(prompt, _max_output_tokens([interaction]), temperature=0.3, raise_errors=True,
+                           check_shape=_check_single_shape)
     primary = resp.get('primary_pathway')
     if not primary:
         return None
     return {
-        "function_pathways": resp.get('function_pathways', []),
+        "function_pathways": _function_pathways(resp),
         "primary_pathway": primary
     }
 
@@ -288,54 +612,151 @@ def _extract_pathways_from_result(result: Dict) -> Set[str]:
     return pathways
 
 
-def _retry_cascade(failed_interactions: List, existing_pathways: Set[str], pathways_formatted: str, db) -> Dict[str, Dict]:
+def _retry_cascade(failed_interactions: List, index: PathwayIndex, db) -> Dict[str, Dict]:
     """
-    Retry failed interactions with progressively smaller batches.
+    Retry failed interactions, bisecting batches that still fail.
+
+    Interactions are retried in batches of RETRY_BATCH_SIZE. Whatever a batch
+    leaves unassigned is split in half and retried, down to single
+    interactions with the simplified prompt, so one bad interaction costs
+    O(log n) extra calls instead of a retry at every fixed size.
     Returns dict of {interaction_id: {"function_pathways": [...], "primary_pathway": "..."}}.
     """
     results = {}
-    remaining = list(failed_interactions)
-
-    batch_sizes = [10, 5, 3, 1]  # Progressive split
+    # Explicit stack of batches still to try; reversed so the first chunk is tried first
+    pending = chunk_list(list(failed_interactions), RETRY_BATCH_SIZE)[::-1]
+    hints = None  # Singles get pathway hints from related interactions, fetched once when first needed
+    throttled = 0  # Consecutive rate-limit/transient failures
+    gave_up = 0
 
-    for batch_size in batch_sizes:
-        if not remaining:
-            break
+    logger.info(f"  Retrying {len(failed_interactions)} interactions in batches of up to {RETRY_BATCH_SIZE}...")
 
-        logger.info(f"  Retrying {len(remaining)} interactions with batch size {batch_size}...")
+    while pending:
+        batch = pending.pop()
         still_failed = []
 
-        for i in range(0, len(remaining), batch_size):
-            batch = remaining[i:i + batch_size]
+        try:
+            if len(batch) == 1:
+                # Single interaction - use simplified prompt
+                if hints is None:
+                    hints = _prefetch_hints(failed_interactions, db)
+                result = _process_single(batch[0], index, hints.get(batch[0].id, []))
+                if result:
+                    results[str(batch[0].id)] = result
+                    index.update(_extract_pathways_from_result(result))
+                else:
+                    still_failed = batch
+            else:
+                batch_results = _process_batch(batch, index, db)
+                results.update(batch_results)
+
+                # Track which ones still failed
+                still_failed = [item for item in batch if str(item.id) not in batch_results]
+
+            throttled = 0
+        except (LLMRateLimitError, LLMTransientError) as e:
+            # Back off before the next call instead of hammering a throttled endpoint
+            logger.warning(f"  Retry batch failed: {e}")
+            still_failed = batch
+            throttled += 1
+            _sleep_backoff(throttled)
+        except Exception as e:
+            logger.warning(f"  Retry batch failed: {e}")
+            still_failed = batch
+
+        if len(still_failed) > 1:
+            half = len(still_failed) // 2
+            pending.append(still_failed[half:])
+            pending.append(still_failed[:half])
+        elif still_failed and len(batch) > 1:
+            pending.append(still_failed)
+        else:
+            gave_up += len(still_failed)
+
+    if gave_up:
+        logger.info(f"  {gave_up} interactions still unassigned after retries")
+    return results
+
+
+def _write_results(interactions: List, results: Dict[str, Dict], db) -> int:
+    """
+    Write Step 2 proposals back to the interactions' data in one bulk UPDATE.
 
+    The new data is also set as each object's committed value so callers that
+    keep using these objects (the recovery loops in later steps) see it without
+    a reload, and the session doesn't flush them a second time.
+
+    Args:
+        interactions: Interaction objects that were processed
+        results: Dict mapping str(interaction_id) -> {function_pathways, primary_pathway}
+        db: Database session
+
+    Returns:
+        Number of interactions updated
+    """
+    from sqlalchemy.orm.attributes import set_committed_value
+    from models import Interaction
+
+    updates = []
+    for interaction in interactions:
+        result = results.get(str(interaction.id))
+        if result is None:
+            continue
+        # Update the loaded dict in place; the bulk UPDATE below writes it, so
+        # no copy is needed for change detection
+        d = interaction.data if interaction.data is not None else {}
+
+        # Store function-level pathways
+        d['step2_function_proposals'] = result.get('function_pathways', [])
+        d['step2_proposal'] = result.get('primary_pathway')  # Backward compat
+
+        # Also update each function in the data
+        functions = d.get('functions', [])
+        for fp in result.get('function_pathways', []):
             try:
-                if batch_size == 1 and batch:
-                    # Single interaction - use simplified prompt
-                    result = _process_single(batch[0], existing_pathways, pathways_formatted, db)
-                    if result:
-                        results[str(batch[0].id)] = result
-                        existing_pathways.update(_extract_pathways_from_result(result))
-                    else:
-                        still_failed.extend(batch)
-                elif batch:
-                    batch_results = _process_batch(batch, existing_pathways, pathways_formatted, db)
-                    results.update(batch_results)
-                    for r in batch_results.values():
-                        existing_pathways.update(_extract_pathways_from_result(r))
-
-                    # Track which ones still failed
-                    for item in batch:
-                        if str(item.id) not in batch_results:
-                            still_failed.append(item)
-
-                time.sleep(0.5)
-            except Exception as e:
-                logger.warning(f"  Retry batch failed: {e}")
-                still_failed.extend(batch)
+                idx = int(fp.get('function_index', -1))
+            except (TypeError, ValueError):
+                idx = -1
+            if 0 <= idx < len(functions):
+                functions[idx]['step2_pathway'] = fp.get('pathway')
+        d['functions'] = functions
 
-        remaining = still_failed
+        updates.append({"id": interaction.id, "data": d})
+        set_committed_value(interaction, 'data', d)
+
+    if updates:
+        db.session.bulk_update_mappings(Interaction, updates)
+    return len(updates)
 
-    return results
+
+
+def _commit_results(interactions: List, results: Dict[str, Dict], db) -> int:
+    """
+    Write and commit results for one batch; a failed write is rolled back and
+    logged so earlier batches stay committed.
+
+    The commit doesn't expire loaded objects: _write_results already set the
+    committed data, and expiring would make every later item.id/item.data
+    access (response parsing, retry prompts) reload its row one SELECT at a time.
+
+    Returns:
+        Number of interactions committed
+    """
+    if not results:
+        return 0
+    session = db.session()
+    expire_on_commit = session.expire_on_commit
+    try:
+        count = _write_results(interactions, results, db)
+        session.expire_on_commit = False
+        session.commit()
+        return count
+    except Exception as e:
+        logger.error(f"Failed to save {len(results)} Step 2 results: {e}")
+        session.rollback()
+        return 0
+    finally:
+        session.expire_on_commit = expire_on_commit
 
 
 def assign_initial_terms(interaction_ids: List[int] = None):
@@ -358,56 +779,85 @@ def assign_initial_terms(interaction_ids: List[int] = None):
         null_data_query = Interaction.query.filter(Interaction.data.is_(None))
         if interaction_ids:
             null_data_query = null_data_query.filter(Interaction.id.in_(interaction_ids))
-        null_data_interactions = null_data_query.all()
+        fixed = null_data_query.update({"data": {}}, synchronize_session=False)
 
-        if null_data_interactions:
-            logger.info(f"Fixing {len(null_data_interactions)} interactions with NULL data...")
-            for i in null_data_interactions:
-                i.data = {}
-            db.session.commit()
+        if fixed:
+            logger.info(f"Fixed {fixed} interactions with NULL data")
+        db.session.commit()
 
-        # Get interactions needing assignment
-        query = Interaction.query.order_by(Interaction.id)
+        # Get interactions needing assignment: only rows without a proposal and
+        # only the columns prompt building needs (proteins joined in)
+        from sqlalchemy.orm import joinedload, load_only
+        query = Interaction.query.options(
+            load_only(Interaction.id, Interaction.protein_a_id, Interaction.protein_b_id, Interaction.data),
+            joinedload(Interaction.protein_a),
+            joinedload(Interaction.protein_b)
+        ).filter(
+            ~Interaction.data.has_key('step2_proposal')
+        ).order_by(Interaction.id)
         if interaction_ids:
             query = query.filter(Interaction.id.in_(interaction_ids))
             logger.info(f"Filtering to {len(interaction_ids)} interactions from query filter")
 
-        interactions = query.all()
-        todo = [i for i in interactions if 'step2_proposal' not in (i.data or {})]
+        todo = query.all()
 
         logger.info(f"Interactions requiring Step 2 assignment: {len(todo)}")
         if not todo:
             return
 
-        # Get existing pathways for consistency (returns set and formatted string)
-        existing_pathways, pathways_formatted = _get_existing_pathways(db)
-        logger.info(f"Found {len(existing_pathways)} existing pathways in database")
+        # Get existing pathways for consistency; names proposed during the run
+        # are added as we go and reach the retry cascade's prompts
+        index = _get_existing_pathways(db)
+        logger.info(f"Found {len(index)} existing pathways in database")
 
-        total_batches = (len(todo) + BATCH_SIZE - 1) // BATCH_SIZE
-        all_results = {}
+        batches = _pack_batches(todo)
+        total_batches = len(batches)
+        success_count = 0
         failed_interactions = []
 
-        # First pass: process in batches
-        for batch_idx in range(total_batches):
-            batch = todo[batch_idx * BATCH_SIZE : (batch_idx + 1) * BATCH_SIZE]
-            logger.info(f"Processing batch {batch_idx + 1}/{total_batches}...")
-
+        # First pass: run all batches concurrently. Prompts are built here so
+        # ORM objects are only touched on this thread; workers just call the LLM.
+        requests = []
+        for batch_idx, batch in enumerate(batches):
             try:
-                batch_results = _process_batch(batch, existing_pathways, pathways_formatted, db)
-                all_results.update(batch_results)
-                for r in batch_results.values():
-                    existing_pathways.update(_extract_pathways_from_result(r))
-
-                # Track failed interactions
-                for item in batch:
-                    if str(item.id) not in batch_results:
-                        failed_interactions.append(item)
-
-                logger.info(f"  Updated {len(batch_results)}/{len(batch)} interactions.")
-                time.sleep(1)
+                requests.append((_build_batch_prompt(batch, index.formatted), _max_output_tokens(batch)))
             except Exception as e:
-                logger.error(f"Error in batch {batch_idx+1}: {e}")
+                logger.error(f"Error building batch {batch_idx+1}: {e}")
+                requests.append(None)  # Whole batch falls through to the retry cascade
+
+        def _apply_batch(batch_idx: int, resp) -> None:
+            nonlocal success_count
+            batch = batches[batch_idx]
+            if isinstance(resp, Exception):
+                logger.error(f"Error in batch {batch_idx+1}: {resp}")
                 failed_interactions.extend(batch)
+                return
+
+            batch_results = _parse_batch_response(batch, resp, index)
+            success_count += _commit_results(batch, batch_results, db)
+
+            # Track failed interactions
+            for item in batch:
+                if str(item.id) not in batch_results:
+                    failed_interactions.append(item)
+
+            logger.info(f"Batch {batch_idx + 1}/{total_batches}: updated {len(batch_results)}/{len(batch)} interactions.")
+
+        async def _run_batches():
+            # Commit each batch as soon as its call returns, so finished work
+            # survives a crash and results don't pile up in memory. First-pass
+            # answers are cached so an identical rerun doesn't pay for them again;
+            # the retry cascade never uses the cache since it needs fresh answers.
+            async for batch_idx, resp in parallel_llm_calls_stream(
+                requests,
+                lambda request: _call_step2_llm(*request, temperature=0.2, cache=True, check_shape=_check_batch_shape) if request else {},
+                max_concurrent=MAX_CONCURRENT_FLASH,
+                desc="Step 2 batches"
+            ):
+                _apply_batch(batch_idx, resp)
+
+        asyncio.run(_run_batches())
+        failed_interactions.sort(key=lambda i: i.id)  # Completion order varies
 
         # Retry cascade for failed interactions
         retry_round = 0
@@ -415,8 +865,8 @@ def assign_initial_terms(interaction_ids: List[int] = None):
             retry_round += 1
             logger.info(f"\n=== Retry Round {retry_round}: {len(failed_interactions)} interactions ===")
 
-            retry_results = _retry_cascade(failed_interactions, existing_pathways, pathways_formatted, db)
-            all_results.update(retry_results)
+            retry_results = _retry_cascade(failed_interactions, index, db)
+            success_count += _commit_results(failed_interactions, retry_results, db)
 
             # Update failed list
             failed_interactions = [i for i in failed_interactions if str(i.id) not in retry_results]
@@ -425,34 +875,6 @@ def assign_initial_terms(interaction_ids: List[int] = None):
                 logger.info("All interactions successfully assigned!")
                 break
 
-        # Apply all results to database
-        success_count = 0
-        for interaction in todo:
-            str_id = str(interaction.id)
-            if str_id in all_results:
-                result = all_results[str_id]
-                d = dict(interaction.data or {})
-
-                # Store function-level pathways
-                d['step2_function_proposals'] = result.get('function_pathways', [])
-                d['step2_proposal'] = result.get('primary_pathway')  # Backward compat
-
-                # Also update each function in the data
-                functions = d.get('functions', [])
-                for fp in result.get('function_pathways', []):
-                    try:
-                        idx = int(fp.get('function_index', -1))
-                    except (TypeError, ValueError):
-                        idx = -1
-                    if 0 <= idx < len(functions):
-                        functions[idx]['step2_pathway'] = fp.get('pathway')
-                d['functions'] = functions
-
-                interaction.data = d
-                success_count += 1
-
-        db.session.commit()
-
         # Final report
         logger.info(f"\n{'='*60}")
         logger.info(f"Step 2 Complete:")
@@ -479,35 +901,14 @@ def assign_initial_terms_for_interactions(interactions: List):
         return
 
     with app.app_context():
-        existing_pathways, pathways_formatted = _get_existing_pathways(db)
+        index = _get_existing_pathways(db)
 
         logger.info(f"Recovery: Processing {len(interactions)} unassigned interactions...")
+        _attach_proteins(interactions)
 
-        results = _retry_cascade(interactions, existing_pathways, pathways_formatted, db)
-
-        for interaction in interactions:
-            str_id = str(interaction.id)
-            if str_id in results:
-                result = results[str_id]
-                d = dict(interaction.data or {})
-
-                # Store function-level pathways
-                d['step2_function_proposals'] = result.get('function_pathways', [])
-                d['step2_proposal'] = result.get('primary_pathway')  # Backward compat
-
-                # Also update each function in the data
-                functions = d.get('functions', [])
-                for fp in result.get('function_pathways', []):
-                    try:
-                        idx = int(fp.get('function_index', -1))
-                    except (TypeError, ValueError):
-                        idx = -1
-                    if 0 <= idx < len(functions):
-                        functions[idx]['step2_pathway'] = fp.get('pathway')
-                d['functions'] = functions
-
-                interaction.data = d
+        results = _retry_cascade(interactions, index, db)
 
+        _write_results(interactions, results, db)
         db.session.commit()
         logger.info(f"Recovery: Assigned {len(results)}/{len(interactions)} interactions")
 
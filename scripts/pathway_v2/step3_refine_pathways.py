@@ -10,15 +10,20 @@ Output: 'step3_function_pathways' array and 'step3_finalized_pathway' in Interac
 GUARANTEE: 100% of interactions with step2_proposal MUST have step3_finalized_pathway.
 Includes recovery loop to catch any missing assignments.
 
+With STEP3_BATCH_MODE=1 the first pass is submitted as one Gemini Batch Mode
+job and falls back to concurrent realtime calls if the job fails or runs too
+long. Retries and the recovery entry point always use realtime calls.
+
 Usage:
     python3 scripts/pathway_v2/step3_refine_pathways.py
+    STEP3_BATCH_MODE=1 python3 scripts/pathway_v2/step3_refine_pathways.py
 """
 
+import os
 import sys
 import logging
-import time
 from pathlib import Path
-from typing import List, Dict, Set, Optional
+from typing import Callable, List, Dict, Set, Optional
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
@@ -26,10 +31,14 @@ sys.path.insert(0, str(PROJECT_ROOT))
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-from scripts.pathway_v2.llm_utils import _call_gemini_json
+from scripts.pathway_v2.llm_utils import _call_gemini_json, _call_gemini_batch
+from scripts.pathway_v2.async_utils import run_parallel, chunk_list, MAX_CONCURRENT_FLASH
 
 BATCH_SIZE = 20
 MAX_RETRY_ROUNDS = 3
+# Set STEP3_BATCH_MODE=1 to send the first pass as one Gemini Batch Mode job
+# (cheaper, no RPM pressure, but it can take up to BATCH_MAX_WAIT to finish)
+STEP3_BATCH_MODE = os.environ.get('STEP3_BATCH_MODE', '0') != '0'
 
 STEP3_PROMPT = """You are a biological pathway standardization expert.
 Task: REFINE and STANDARDIZE the proposed pathway names for EACH FUNCTION.
@@ -159,27 +168,25 @@ def _format_pathways_with_hierarchy(existing_pathways, proposed_pathways) -> str
     return "\n".join(lines) if lines else "None yet"
 
 
-def _process_batch(batch: List, context_str: str) -> Dict[str, Dict]:
-    """
-    Process a batch of interactions. Returns dict of:
-    {interaction_id: {"function_refinements": [...], "primary_pathway": "..."}}
-    """
-    if not batch:
-        return {}
-
-    batch_map = {str(item.id): item for item in batch}
+def _build_batch_prompt(batch: List, context_str: str) -> str:
+    """Build the Step 3 prompt for a batch of interactions."""
     items_str = "\n".join([_format_interaction_for_step3(item) for item in batch])
+    return STEP3_PROMPT.format(global_context_list=context_str, interactions_list=items_str)
 
-    resp = _call_gemini_json(
-        STEP3_PROMPT.format(global_context_list=context_str, interactions_list=items_str),
-        temperature=0.1
-    )
+
+def _parse_batch_response(batch: List, resp: Dict) -> Dict[str, Dict]:
+    """Map a batch LLM response to {interaction_id: result} for the batch's interactions."""
+    return _parse_refinements({str(item.id) for item in batch}, resp)
+
+
+def _parse_refinements(batch_ids: Set[str], resp: Dict) -> Dict[str, Dict]:
+    """Map a batch LLM response to {interaction_id: result} for the given string IDs."""
     refinements = resp.get('refinements', [])
 
     results = {}
     for r in refinements:
         str_id = str(r.get('interaction_id'))
-        if str_id in batch_map:
+        if str_id in batch_ids:
             primary = r.get('primary_pathway') or r.get('finalized_pathway')
             func_refs = r.get('function_refinements', [])
             if primary:
@@ -191,11 +198,20 @@ def _process_batch(batch: List, context_str: str) -> Dict[str, Dict]:
     return results
 
 
-def _process_single(interaction, context_str: str) -> Optional[Dict]:
+def _process_batch(batch: List, context_str: str) -> Dict[str, Dict]:
     """
-    Process a single interaction with simplified prompt.
-    Returns dict with function_refinements and primary_pathway, or None.
+    Process a batch of interactions. Returns dict of:
+    {interaction_id: {"function_refinements": [...], "primary_pathway": "..."}}
     """
+    if not batch:
+        return {}
+
+    resp = _call_gemini_json(_build_batch_prompt(batch, context_str), temperature=0.1)
+    return _parse_batch_response(batch, resp)
+
+
+def _build_single_prompt(interaction, context_str: str) -> Optional[str]:
+    """Build the simplified prompt for one interaction, or None if it has no proposals."""
     proposals = interaction.data.get('step2_function_proposals', []) if interaction.data else []
     fallback = interaction.data.get('step2_proposal', '') if interaction.data else ''
 
@@ -211,13 +227,15 @@ def _process_single(interaction, context_str: str) -> Optional[Dict]:
     else:
         proposals_str = f"[0] {fallback}"
 
-    prompt = SIMPLE_REFINE_PROMPT.format(
+    return SIMPLE_REFINE_PROMPT.format(
         proposals=proposals_str,
         existing_pathways=context_str[:500],
         interaction_id=interaction.id
     )
 
-    resp = _call_gemini_json(prompt, temperature=0.2)
+
+def _parse_single_response(resp: Dict) -> Optional[Dict]:
+    """Turn a single-interaction LLM response into a result dict, or None."""
     primary = resp.get('primary_pathway')
     if not primary:
         return None
@@ -228,9 +246,107 @@ def _process_single(interaction, context_str: str) -> Optional[Dict]:
     }
 
 
+def _process_single(interaction, context_str: str) -> Optional[Dict]:
+    """
+    Process a single interaction with simplified prompt.
+    Returns dict with function_refinements and primary_pathway, or None.
+    """
+    prompt = _build_single_prompt(interaction, context_str)
+    if prompt is None:
+        return None
+    return _parse_single_response(_call_gemini_json(prompt, temperature=0.2))
+
+
+def _run_batches(batches: List[List], context_str: str, desc: str, simple: bool = False) -> List:
+    """
+    Run Step 3 LLM calls for many batches concurrently.
+
+    Prompts are built and responses parsed on this thread, so ORM objects are
+    never touched by the workers; they only call the LLM. With `simple`, each
+    batch is a single interaction sent with the simplified prompt. Concurrency is bounded by
+    MAX_CONCURRENT_FLASH and the shared Gemini rate limiter replaces the old
+    fixed sleeps between calls.
+
+    Returns:
+        Per batch, in order: a results dict (see _process_batch) or the
+        Exception the call raised
+    """
+    requests = []
+    for batch in batches:
+        try:
+            if simple:
+                requests.append((_build_single_prompt(batch[0], context_str), 0.2))
+            else:
+                requests.append((_build_batch_prompt(batch, context_str), 0.1))
+        except Exception as e:
+            requests.append(e)
+
+    responses = run_parallel(
+        requests,
+        lambda request: _call_gemini_json(request[0], temperature=request[1]) if isinstance(request, tuple) and request[0] else {},
+        max_concurrent=MAX_CONCURRENT_FLASH,
+        desc=desc
+    )
+
+    outcomes = []
+    for batch, request, resp in zip(batches, requests, responses):
+        if isinstance(request, Exception):
+            outcomes.append(request)
+        elif isinstance(resp, Exception):
+            outcomes.append(resp)
+        elif simple:
+            result = _parse_single_response(resp)
+            outcomes.append({str(batch[0].id): result} if result else {})
+        else:
+            outcomes.append(_parse_batch_response(batch, resp))
+    return outcomes
+
+
+def _run_batches_offline(batches: List[List], context_str: str,
+                         release: Optional[Callable[[], None]] = None) -> Optional[List]:
+    """
+    Run the first-pass batches as one Gemini Batch Mode job.
+
+    Prompts and interaction IDs are read up front, so the interactions are
+    not touched again once `release` has run.
+
+    Args:
+        batches: Interaction batches
+        context_str: Global pathway context for the prompt
+        release: Called after the prompts are built and before the job is
+                 submitted, e.g. to end the read transaction
+
+    Returns:
+        Per batch, in order: a results dict or the Exception raised while
+        building its prompt; None if the job failed or timed out
+    """
+    prompts = []
+    outcomes = []
+    for batch in batches:
+        try:
+            prompts.append(_build_batch_prompt(batch, context_str))
+            outcomes.append({str(item.id) for item in batch})
+        except Exception as e:
+            outcomes.append(e)
+
+    if release is not None:
+        release()
+
+    responses = _call_gemini_batch(prompts, temperature=0.1)
+    if responses is None:
+        return None
+
+    responses = iter(responses)
+    return [
+        outcome if isinstance(outcome, Exception) else _parse_refinements(outcome, next(responses))
+        for outcome in outcomes
+    ]
+
+
 def _retry_cascade(failed_interactions: List, context_str: str) -> Dict[str, Dict]:
     """
     Retry failed interactions with progressively smaller batches.
+    Each tier's batches run concurrently.
     Returns dict of {interaction_id: {"function_refinements": [...], "primary_pathway": "..."}}.
     """
     results = {}
@@ -245,27 +361,16 @@ def _retry_cascade(failed_interactions: List, context_str: str) -> Dict[str, Dic
         logger.info(f"  Retrying {len(remaining)} interactions with batch size {batch_size}...")
         still_failed = []
 
-        for i in range(0, len(remaining), batch_size):
-            batch = remaining[i:i + batch_size]
-
-            try:
-                if batch_size == 1 and batch:
-                    result = _process_single(batch[0], context_str)
-                    if result:
-                        results[str(batch[0].id)] = result
-                    else:
-                        still_failed.extend(batch)
-                elif batch:
-                    batch_results = _process_batch(batch, context_str)
-                    results.update(batch_results)
-                    for item in batch:
-                        if str(item.id) not in batch_results:
-                            still_failed.append(item)
-
-                time.sleep(0.5)
-            except Exception as e:
-                logger.warning(f"  Retry batch failed: {e}")
+        batches = chunk_list(remaining, batch_size)
+        for batch, outcome in zip(batches, _run_batches(batches, context_str, f"Step 3 retry (size {batch_size})", simple=batch_size == 1)):
+            if isinstance(outcome, Exception):
+                logger.warning(f"  Retry batch failed: {outcome}")
                 still_failed.extend(batch)
+                continue
+            results.update(outcome)
+            for item in batch:
+                if str(item.id) not in outcome:
+                    still_failed.append(item)
 
         remaining = still_failed
 
@@ -322,28 +427,37 @@ def refine_pathways(interaction_ids: List[int] = None):
         if not todo:
             return
 
-        total_batches = (len(todo) + BATCH_SIZE - 1) // BATCH_SIZE
+        batches = chunk_list(todo, BATCH_SIZE)
+        total_batches = len(batches)
         all_results = {}
         failed_interactions = []
 
-        # First pass: process in batches
-        for batch_idx in range(total_batches):
-            batch = todo[batch_idx * BATCH_SIZE : (batch_idx + 1) * BATCH_SIZE]
-            logger.info(f"Processing batch {batch_idx+1}/{total_batches}...")
-
-            try:
-                batch_results = _process_batch(batch, context_str)
-                all_results.update(batch_results)
+        # First pass: one Batch Mode job, or all batches concurrently in realtime
+        outcomes = None
+        if STEP3_BATCH_MODE:
+            # Don't sit idle in a transaction while the job runs; the commit
+            # expires the loaded rows, so reload them in bulk afterwards
+            todo_ids = [i.id for i in todo]
+            outcomes = _run_batches_offline(batches, context_str, release=db.session.commit)
+            for ids in chunk_list(todo_ids, 1000):
+                Interaction.query.filter(Interaction.id.in_(ids)).all()
+            if outcomes is None:
+                logger.warning("Batch Mode unavailable; falling back to realtime calls")
+        if outcomes is None:
+            outcomes = _run_batches(batches, context_str, "Step 3 batches")
+
+        for batch_idx, (batch, outcome) in enumerate(zip(batches, outcomes)):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error in batch {batch_idx+1}: {outcome}")
+                failed_interactions.extend(batch)
+                continue
 
-                for item in batch:
-                    if str(item.id) not in batch_results:
-                        failed_interactions.append(item)
+            all_results.update(outcome)
+            for item in batch:
+                if str(item.id) not in outcome:
+                    failed_interactions.append(item)
 
-                logger.info(f"  Updated {len(batch_results)}/{len(batch)} items.")
-                time.sleep(1)
-            except Exception as e:
-                logger.error(f"Error in batch {batch_idx+1}: {e}")
-                failed_interactions.extend(batch)
+            logger.info(f"Batch {batch_idx+1}/{total_batches}: updated {len(outcome)}/{len(batch)} items.")
 
         # Retry cascade for failed interactions
         retry_round = 0
@@ -9,6 +9,7 @@ Expected speedup: ~15 min -> ~30-45 seconds
 """
 
 import sys
+import asyncio
 import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -20,7 +21,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 from scripts.pathway_v2.llm_utils import _call_gemini_json_cached
-from scripts.pathway_v2.async_utils import run_parallel, MAX_CONCURRENT_FLASH
+from scripts.pathway_v2.async_utils import parallel_llm_calls_stream, MAX_CONCURRENT_FLASH
 from scripts.pathway_v2.cache import get_pathway_cache, save_cache
 from scripts.pathway_v2.step6_utils import would_create_cycle, build_parent_graph
 
@@ -133,22 +134,16 @@ def discover_siblings():
 
         logger.info(f"Processing {len(parent_data_list)} parents in parallel...")
 
-        # Run all sibling discovery calls in parallel
-        results = run_parallel(
-            parent_data_list,
-            _discover_siblings_for_parent,
-            max_concurrent=MAX_CONCURRENT_FLASH,
-            desc="Sibling discovery"
-        )
-
-        # Process results and create pathways
         total_siblings_added = 0
         cache_hits = 0
 
-        for i, result in enumerate(results):
+        def _apply_result(result: Any) -> None:
+            """Write the siblings found for one parent."""
+            nonlocal total_siblings_added, cache_hits
+
             if isinstance(result, Exception):
                 logger.error(f"Failed for parent: {result}")
-                continue
+                return
 
             parent_id = result['parent_id']
             parent_name = result['parent_name']
@@ -158,7 +153,7 @@ def discover_siblings():
                 cache_hits += 1
 
             if result.get('error'):
-                continue
+                return
 
             # Get existing children for this parent (need to re-query to get current state)
             existing_links = PathwayParent.query.filter_by(parent_pathway_id=parent_id).all()
@@ -208,6 +203,20 @@ def discover_siblings():
                 logger.info(f"  Added {count} siblings under '{parent_name}'")
                 total_siblings_added += count
 
+        async def _discover_and_apply():
+            # Apply each parent's result as soon as its call returns, so DB
+            # writes overlap the slowest LLM calls instead of waiting for all
+            async for _, result in parallel_llm_calls_stream(
+                parent_data_list,
+                _discover_siblings_for_parent,
+                max_concurrent=MAX_CONCURRENT_FLASH,
+                desc="Sibling discovery"
+            ):
+                _apply_result(result)
+
+        # Run all sibling discovery calls in parallel
+        asyncio.run(_discover_and_apply())
+
         # Save cache at end
         save_cache()
 
@@ -297,6 +297,52 @@ def find_all_cycles(parent_graph: Dict[int, List[int]]) -> List[List[int]]:
     return cycles
 
 
+def detect_back_edges(adj: Dict[int, List[int]]) -> Set[Tuple[int, int]]:
+    """
+    Find all DFS back-edges in the graph in a single O(V+E) traversal.
+
+    Uses an iterative DFS with WHITE/GRAY/BLACK coloring; an edge (u, v) whose
+    target is still GRAY (on the current DFS path) closes a cycle. Every cycle
+    in the graph contains at least one back-edge.
+
+    Args:
+        adj: Adjacency map, e.g. child_id -> [parent_ids]
+
+    Returns:
+        Set of (u, v) back-edges
+    """
+    WHITE, GRAY, BLACK = 0, 1, 2
+    color: Dict[int, int] = {}
+    back_edges: Set[Tuple[int, int]] = set()
+
+    all_nodes = set(adj.keys())
+    for targets in adj.values():
+        all_nodes.update(targets)
+
+    for root in sorted(all_nodes):
+        if color.get(root, WHITE) != WHITE:
+            continue
+
+        color[root] = GRAY
+        stack = [(root, iter(adj.get(root, ())))]
+
+        while stack:
+            node, targets = stack[-1]
+            for target in targets:
+                state = color.get(target, WHITE)
+                if state == WHITE:
+                    color[target] = GRAY
+                    stack.append((target, iter(adj.get(target, ()))))
+                    break
+                if state == GRAY:
+                    back_edges.add((node, target))
+            else:
+                color[node] = BLACK
+                stack.pop()
+
+    return back_edges
+
+
 def detect_multi_parent_nodes(parent_graph: Dict[int, List[int]]) -> Dict[int, List[int]]:
     """
     Find all nodes with more than one parent.
@@ -28,6 +28,16 @@ def test_chunk_list_empty():
     assert chunk_list([], 3) == []
 
 
+def test_chunk_list_rejects_non_positive_size():
+    """Test that a chunk size below 1 raises instead of returning []."""
+    for size in (0, -1):
+        try:
+            chunk_list([1, 2, 3], size)
+        except ValueError:
+            continue
+        raise AssertionError(f"chunk_list accepted size {size}")
+
+
 def test_run_parallel_simple():
     """Test parallel execution with simple function."""
     def double(x):
@@ -64,6 +74,7 @@ def test_run_parallel_handles_exceptions():
 if __name__ == "__main__":
     test_chunk_list()
     test_chunk_list_empty()
+    test_chunk_list_rejects_non_positive_size()
     test_run_parallel_simple()
     test_run_parallel_handles_exceptions()
     print("All tests passed!")
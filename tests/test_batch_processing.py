@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Tests for concurrent batch processing in the pathway hierarchy scripts."""
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.pathway_hierarchy.hierarchy_utils import process_in_batches
+
+
+def test_concurrent_batches_not_throttled_by_default():
+    """Test that concurrent mode isn't paced by delay_between_batches unless a rate is given."""
+    def slow_double(batch):
+        time.sleep(0.2)
+        return {x: x * 2 for x in batch}
+
+    start = time.time()
+    outcome = process_in_batches(
+        list(range(12)), 2, slow_double, verbose=False, max_concurrency=6
+    )
+    elapsed = time.time() - start
+
+    assert outcome['results'] == {x: x * 2 for x in range(12)}
+    assert outcome['processed'] == 12
+    # Six 0.2s batches in parallel; a 1/1.5s token bucket would take ~3.5s
+    assert elapsed < 1.0
+    print("[OK] test_concurrent_batches_not_throttled_by_default")
+
+
+def test_on_result_runs_on_main_thread_as_batches_finish():
+    """Test that on_result sees each batch on the calling thread before slower batches finish."""
+    main_thread = threading.get_ident()
+    seen = []
+
+    def staggered(batch):
+        time.sleep(0.0 if batch[0] == 0 else 0.3)
+        return {x: x for x in batch}
+
+    def on_result(batch_num, batch, batch_results):
+        seen.append((batch_num, batch_results, threading.get_ident(), time.time() - start))
+
+    start = time.time()
+    process_in_batches(
+        list(range(8)), 2, staggered, verbose=False, max_concurrency=4, on_result=on_result
+    )
+
+    assert sorted(num for num, _, _, _ in seen) == [1, 2, 3, 4]
+    assert all(thread == main_thread for _, _, thread, _ in seen)
+    first = next(entry for entry in seen if entry[0] == 1)
+    assert first[1] == {0: 0, 1: 1}
+    assert first[3] < 0.2
+    print("[OK] test_on_result_runs_on_main_thread_as_batches_finish")
+
+
+def test_classify_with_ai_runs_calls_concurrently():
+    """Test that script 03 fans its AI calls out and maps answers back to pathway IDs."""
+    classify_script = importlib.import_module("scripts.pathway_hierarchy.03_classify_existing_pathways")
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, peak
+
+    def fake_classify(pathways, hierarchy_tree):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.1)
+        with lock:
+            in_flight[0] -= 1
+        return {
+            p['name']: {'hierarchy_chain': ['Proteostasis', p['name']], 'confidence': 0.8, 'reasoning': ''}
+            for p in pathways
+        }
+
+    pathways = [{'id': i, 'name': f"P{i}", 'description': ''} for i in range(40)]
+    applied = []
+    saved = classify_script.classify_pathways_batch
+    classify_script.classify_pathways_batch = fake_classify
+    try:
+        classifications = classify_script.classify_with_ai(
+            pathways, "tree", logging.getLogger(__name__),
+            on_batch=lambda batch, found: applied.append((len(batch), sorted(found)))
+        )
+    finally:
+        classify_script.classify_pathways_batch = saved
+
+    assert sorted(classifications) == list(range(40))
+    assert len(applied) == (40 + classify_script.BATCH_SIZE - 1) // classify_script.BATCH_SIZE
+    assert sorted(i for _, ids in applied for i in ids) == list(range(40))
+    assert classifications[7]['hierarchy_chain'] == ['Proteostasis', 'P7']
+    assert in_flight[1] > 1
+    print("[OK] test_classify_with_ai_runs_calls_concurrently")
+
+
+if __name__ == "__main__":
+    test_concurrent_batches_not_throttled_by_default()
+    test_on_result_runs_on_main_thread_as_batches_finish()
+    test_classify_with_ai_runs_calls_concurrently()
+    print("All tests passed!")
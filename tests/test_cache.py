@@ -2,13 +2,16 @@
 """Tests for pathway cache."""
 
 import sys
+import json
 import tempfile
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from scripts.pathway_hierarchy import pathway_config
 from scripts.pathway_v2.cache import PathwayCache
+from scripts.pathway_v2.llm_utils import ResponseCache
 
 
 def test_parent_cache():
@@ -60,6 +63,51 @@ def test_persistence():
         assert cache2.get_parent("Autophagy") == "Protein Quality Control"
 
 
+def test_load_legacy_format():
+    """Test loading a cache file written with prefixed flat keys."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_file = Path(tmpdir) / "legacy_cache.json"
+        cache_file.write_text(json.dumps({
+            "parent:autophagy": "Protein Quality Control",
+            "siblings:cell death": [{"name": "Apoptosis"}],
+        }))
+
+        cache = PathwayCache(cache_file=cache_file, load_existing=True)
+        assert cache.get_parent("Autophagy") == "Protein Quality Control"
+        assert cache.get_siblings("Cell Death") == [{"name": "Apoptosis"}]
+
+
+def test_bump_revision():
+    """Test that bumping the revision invalidates existing entries."""
+    cache = PathwayCache(load_existing=False)
+
+    cache.set_parent("Autophagy", "Protein Quality Control")
+    cache.bump_revision()
+
+    assert cache.get_parent("Autophagy") is None
+    assert not cache.has_parent("Autophagy")
+    assert cache.stats()["total"] == 0
+
+    cache.set_parent("Autophagy", "Cellular Homeostasis")
+    assert cache.get_parent("Autophagy") == "Cellular Homeostasis"
+
+
+def test_config_refresh_invalidates():
+    """Test that refreshing the pathway config invalidates existing entries."""
+    cache = PathwayCache(load_existing=False)
+
+    cache.set_parent("Autophagy", "Protein Quality Control")
+    cache.set_siblings("Cell Death", [{"name": "Apoptosis"}])
+    pathway_config.refresh_config()
+
+    assert cache.get_parent("Autophagy") is None
+    assert cache.get_siblings("Cell Death") is None
+    assert cache.stats()["total"] == 0
+
+    cache.set_parent("Autophagy", "Cellular Homeostasis")
+    assert cache.get_parent("Autophagy") == "Cellular Homeostasis"
+
+
 def test_stats():
     """Test cache statistics."""
     cache = PathwayCache(load_existing=False)
@@ -74,10 +122,45 @@ def test_stats():
     assert stats["siblings"] == 1
 
 
+def test_response_cache_persistence():
+    """Test that LLM responses are stored per prompt and generation config."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_file = Path(tmpdir) / "responses.sqlite"
+
+        cache1 = ResponseCache(cache_file)
+        assert cache1.get("prompt", 0.2, 8192) is None
+        cache1.set("prompt", 0.2, 8192, {"assignments": [{"interaction_id": "1"}]})
+
+        cache2 = ResponseCache(cache_file)
+        assert cache2.get("prompt", 0.2, 8192) == {"assignments": [{"interaction_id": "1"}]}
+        assert cache2.get("prompt", 0.3, 8192) is None
+        assert cache2.get("prompt", 0.2, 16384) is None
+        assert cache2.get("other prompt", 0.2, 8192) is None
+
+
+def test_response_cache_key_includes_model():
+    """Test that switching GEMINI_MODEL misses entries stored under the old model."""
+    from scripts.pathway_v2 import llm_utils
+
+    key = ResponseCache.key("prompt", 0.2, 8192)
+    original = llm_utils.GEMINI_MODEL
+    llm_utils.GEMINI_MODEL = original + "-next"
+    try:
+        assert ResponseCache.key("prompt", 0.2, 8192) != key
+    finally:
+        llm_utils.GEMINI_MODEL = original
+
+
 if __name__ == "__main__":
     test_parent_cache()
     test_case_insensitive()
     test_siblings_cache()
     test_persistence()
+    test_load_legacy_format()
+    test_bump_revision()
+    test_config_refresh_invalidates()
     test_stats()
+    test_response_cache_persistence()
+    test_response_cache_key_includes_model()
     print("All tests passed!")
+
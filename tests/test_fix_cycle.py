@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Tests for the parent graph disk cache in fix_cycle."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from flask import Flask
+from sqlalchemy import update
+
+from models import db, Pathway, PathwayParent
+import scripts.pathway_v2.fix_cycle as fix_cycle
+
+
+def test_parent_graph_cache_notices_swapped_parents():
+    """Test that two links swapping parents in place invalidates the cached graph."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    saved_path = fix_cycle.PARENT_GRAPH_CACHE_PATH
+    with tempfile.TemporaryDirectory() as tmp, app.app_context():
+        fix_cycle.PARENT_GRAPH_CACHE_PATH = Path(tmp) / "parent_graph.cache"
+        try:
+            db.metadata.create_all(db.engine, tables=[Pathway.__table__, PathwayParent.__table__])
+            db.session.add_all([Pathway(id=i, name=f"P{i}") for i in range(1, 5)])
+            db.session.add_all([
+                PathwayParent(id=1, child_pathway_id=1, parent_pathway_id=3),
+                PathwayParent(id=2, child_pathway_id=2, parent_pathway_id=4),
+            ])
+            db.session.commit()
+
+            assert fix_cycle.load_or_build_parent_graph(db, PathwayParent) == {1: [3], 2: [4]}
+
+            # A->P1, B->P2 becomes A->P2, B->P1: count, created_at and plain sums are unchanged
+            db.session.execute(update(PathwayParent).where(PathwayParent.id == 1).values(parent_pathway_id=4))
+            db.session.execute(update(PathwayParent).where(PathwayParent.id == 2).values(parent_pathway_id=3))
+            db.session.commit()
+
+            assert fix_cycle.load_or_build_parent_graph(db, PathwayParent) == {1: [4], 2: [3]}
+        finally:
+            fix_cycle.PARENT_GRAPH_CACHE_PATH = saved_path
+    print("[OK] test_parent_graph_cache_notices_swapped_parents")
+
+
+if __name__ == "__main__":
+    test_parent_graph_cache_notices_swapped_parents()
+    print("All tests passed!")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Tests for the descendant level recalculation in fix_dna_damage_response."""
+
+import sys
+from collections import deque
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from flask import Flask
+
+from models import db, Pathway, PathwayParent
+from scripts.pathway_v2.fix_dna_damage_response import _recalculate_descendant_levels
+
+# (child, parent) links of a small DAG where several nodes have two parents
+# at different depths, so later visits overwrite earlier ones
+EDGES = [(1, 0), (2, 0), (3, 1), (3, 2), (4, 3), (5, 4), (5, 1), (6, 5), (7, 2), (8, 7), (8, 6)]
+
+
+def _per_node_walk(levels, ancestors, parent_id, parent_level):
+    """The original walk: FIFO queue, one node at a time, links in id order."""
+    children = {}
+    for child, parent in EDGES:
+        children.setdefault(parent, []).append(child)
+
+    updated = 0
+    queue = deque([(parent_id, parent_level)])
+    while queue:
+        current_id, current_level = queue.popleft()
+        for child in children.get(current_id, ()):
+            new_level = current_level + 1
+            new_ancestors = ancestors[current_id] + [current_id]
+            if levels[child] != new_level or ancestors[child] != new_ancestors:
+                updated += 1
+            levels[child] = new_level
+            ancestors[child] = new_ancestors
+            queue.append((child, new_level))
+    return updated
+
+
+def test_level_by_level_walk_matches_per_node_walk():
+    """Test that the batched BFS gives the same levels, ancestors and count as the per-node walk."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[Pathway.__table__, PathwayParent.__table__])
+        db.session.add_all([
+            Pathway(id=i, name=f"P{i}", hierarchy_level=0, ancestor_ids=[99] if i == 0 else [])
+            for i in range(9)
+        ])
+        db.session.add_all([
+            PathwayParent(id=n, child_pathway_id=c, parent_pathway_id=p)
+            for n, (c, p) in enumerate(EDGES, start=1)
+        ])
+        db.session.commit()
+
+        levels = {i: 0 for i in range(9)}
+        ancestors = {i: [99] if i == 0 else [] for i in range(9)}
+        expected_updated = _per_node_walk(levels, ancestors, 0, 3)
+
+        # Held across the call, as fix_dna_damage_response holds its pathways
+        loaded = {p.id: p for p in Pathway.query.all()}
+        updated = _recalculate_descendant_levels(db, Pathway, PathwayParent, 0, 3)
+
+        # Loaded objects carry the new values before the commit
+        assert {i: p.hierarchy_level for i, p in loaded.items()} == levels
+        assert {i: p.ancestor_ids for i, p in loaded.items()} == ancestors
+
+        db.session.commit()
+        db.session.expire_all()
+        stored = {p.id: (p.hierarchy_level, p.ancestor_ids) for p in Pathway.query.all()}
+
+    assert updated == expected_updated
+    assert stored == {i: (levels[i], ancestors[i]) for i in range(9)}
+    print("[OK] test_level_by_level_walk_matches_per_node_walk")
+
+
+if __name__ == "__main__":
+    test_level_by_level_walk_matches_per_node_walk()
+    print("All tests passed!")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Tests for ontology name matching."""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.pathway_hierarchy import ontology_client
+from scripts.pathway_hierarchy.ontology_client import (
+    OntologyHierarchy,
+    OntologyTerm,
+    find_best_ontology_match,
+)
+
+
+def _hierarchy(source, names):
+    hierarchy = OntologyHierarchy(source)
+    for i, name in enumerate(names):
+        hierarchy.add_term(OntologyTerm(id=f"{source}:{i}", name=name, source=source))
+    return hierarchy
+
+
+def test_match_same_as_full_scan():
+    """Test that token-index narrowing returns what a full scan of the terms would."""
+    kegg = _hierarchy("KEGG", [])
+    saved = ontology_client.RAPIDFUZZ_AVAILABLE
+    try:
+        for available in {saved, False}:
+            ontology_client.RAPIDFUZZ_AVAILABLE = available
+
+            go = _hierarchy("GO", ["Wnt signaling pathway", "autophagy"])
+            assert find_best_ontology_match("macroautophagy pathway", go, kegg) == ("GO:1", "GO", 0.9)
+
+            go = _hierarchy("GO", ["Wnt signaling pathway", "macroautophagy"])
+            assert find_best_ontology_match("autophagy", go, kegg) == ("GO:1", "GO", 0.9)
+
+            # A weak fuzzy candidate must not hide a substring hit outside the candidates
+            go = _hierarchy("GO", ["autophagy", "neuronal macroautophagx process"])
+            assert find_best_ontology_match("neuronal macroautophagy", go, kegg) == ("GO:0", "GO", 0.9)
+
+            # A closer fuzzy hit outside the candidates still wins over the substring hit
+            go = _hierarchy("GO", ["signaling wnt", "signalling"])
+            assert find_best_ontology_match("signaling", go, kegg)[:2] == ("GO:1", "GO")
+    finally:
+        ontology_client.RAPIDFUZZ_AVAILABLE = saved
+    print("[OK] test_match_same_as_full_scan")
+
+
+if __name__ == "__main__":
+    test_match_same_as_full_scan()
+    print("All tests passed!")
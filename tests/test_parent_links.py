@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Tests for the chunked PathwayParent insert helper."""
+
+import importlib
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from models import db, Pathway, PathwayParent
+from scripts.pathway_hierarchy.hierarchy_utils import insert_parent_links
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    db.metadata.create_all(engine, tables=[Pathway.__table__, PathwayParent.__table__])
+    with engine.begin() as conn:
+        conn.execute(Pathway.__table__.insert(), [
+            {"id": i, "name": f"P{i}", "hierarchy_level": 0 if i == 1 else 1}
+            for i in range(1, 2502)
+        ])
+    return Session(engine)
+
+
+def _rows(child_ids, parent_id=1):
+    return [
+        {
+            'child_pathway_id': child_id,
+            'parent_pathway_id': parent_id,
+            'relationship_type': 'is_a',
+            'confidence': 1.0,
+            'source': 'test',
+        }
+        for child_id in child_ids
+    ]
+
+
+def test_insert_parent_links_chunks_large_batches():
+    """Test that more rows than one chunk are all inserted and counted."""
+    session = _make_session()
+    created = insert_parent_links(session, _rows(range(2, 2502)), chunk_size=1000)
+
+    assert created == 2500
+    assert session.scalar(select(func.count()).select_from(PathwayParent)) == 2500
+    print("[OK] test_insert_parent_links_chunks_large_batches")
+
+
+def test_insert_parent_links_skips_existing_pairs():
+    """Test that pairs already present are skipped across chunks."""
+    session = _make_session()
+    insert_parent_links(session, _rows(range(2, 12)))
+    created = insert_parent_links(session, _rows(range(2, 22)), chunk_size=3)
+
+    assert created == 10
+    assert session.scalar(select(func.count()).select_from(PathwayParent)) == 20
+    assert insert_parent_links(session, []) == 0
+    print("[OK] test_insert_parent_links_skips_existing_pairs")
+
+
+def test_create_parent_links_uses_chunked_insert():
+    """Test that create_parent_links inserts more pairs than one chunk holds."""
+    build = importlib.import_module("scripts.pathway_hierarchy.02_build_base_hierarchy")
+    session = _make_session()
+    created = build.create_parent_links(session, [(i, 1) for i in range(2, 2502)], source='test')
+
+    assert created == 2500
+    assert session.scalar(select(func.count()).select_from(PathwayParent)) == 2500
+    print("[OK] test_create_parent_links_uses_chunked_insert")
+
+
+if __name__ == "__main__":
+    test_insert_parent_links_chunks_large_batches()
+    test_insert_parent_links_skips_existing_pairs()
+    test_create_parent_links_uses_chunked_insert()
+    print("All tests passed!")
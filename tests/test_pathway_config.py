@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Tests for the pathway config revision token."""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy import create_engine, update
+
+from models import db, Pathway, PathwayParent
+from scripts.pathway_hierarchy.pathway_config import _get_db_revision
+
+
+def _make_engine():
+    engine = create_engine("sqlite://")
+    db.metadata.create_all(engine, tables=[Pathway.__table__, PathwayParent.__table__])
+    with engine.begin() as conn:
+        conn.execute(Pathway.__table__.insert(), [
+            {"id": i, "name": f"P{i}", "hierarchy_level": 0 if i < 3 else 1}
+            for i in range(1, 6)
+        ])
+        conn.execute(PathwayParent.__table__.insert(), [
+            {"id": 1, "child_pathway_id": 3, "parent_pathway_id": 1},
+            {"id": 2, "child_pathway_id": 4, "parent_pathway_id": 2},
+        ])
+    return engine
+
+
+def test_revision_changes_when_link_is_reparented():
+    """Test that moving a link to a new parent changes the revision."""
+    engine = _make_engine()
+    with engine.begin() as conn:
+        before = _get_db_revision(conn)
+        conn.execute(update(PathwayParent).where(PathwayParent.id == 1).values(parent_pathway_id=2))
+        after = _get_db_revision(conn)
+
+    assert before is not None
+    assert before != after
+    print("[OK] test_revision_changes_when_link_is_reparented")
+
+
+def test_revision_changes_when_links_swap_parents():
+    """Test that two links exchanging parents changes the revision."""
+    engine = _make_engine()
+    with engine.begin() as conn:
+        before = _get_db_revision(conn)
+        conn.execute(update(PathwayParent).where(PathwayParent.id == 1).values(parent_pathway_id=2))
+        conn.execute(update(PathwayParent).where(PathwayParent.id == 2).values(parent_pathway_id=1))
+        after = _get_db_revision(conn)
+
+    assert before != after
+    print("[OK] test_revision_changes_when_links_swap_parents")
+
+
+if __name__ == "__main__":
+    test_revision_changes_when_link_is_reparented()
+    test_revision_changes_when_links_swap_parents()
+    print("All tests passed!")
@@ -6,15 +6,23 @@ Tests the pure helper functions used in step2_assign_initial_terms.py.
 """
 
 import sys
+import tempfile
 from pathlib import Path
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+import scripts.pathway_v2.step2_assign_initial_terms as step2
+from scripts.pathway_v2.llm_utils import ResponseCache
 from scripts.pathway_v2.step2_assign_initial_terms import (
     _format_interaction,
     _extract_pathways_from_result,
+    PathwayIndex,
+    _pack_batches,
+    _call_step2_llm,
+    _check_batch_shape,
+    _commit_results,
 )
 
 
@@ -153,6 +161,116 @@ def test_extract_pathways_handles_none_values():
     print("[OK] test_extract_pathways_handles_none_values")
 
 
+def test_pathway_index_formatted_updates_on_new_name():
+    """Test that the cached listing is rebuilt only when a new name is added."""
+    index = PathwayIndex()
+    assert index.formatted == "None yet"
+
+    index.add("Autophagy", level=1)
+    index.add("Aggrephagy", level=2)
+    formatted = index.formatted
+    assert "Level 1 (Broad" in formatted
+    assert "Autophagy" in formatted
+    assert "Aggrephagy" in formatted
+
+    assert index.add("Autophagy", level=1) is False
+    assert index.formatted is formatted  # Unchanged, still cached
+
+    index.update({"Mitophagy"})
+    assert "Aggrephagy, Mitophagy" in index.formatted
+    assert len(index) == 3
+    print("[OK] test_pathway_index_formatted_updates_on_new_name")
+
+
+def test_pack_batches_respects_function_budget():
+    """Test that batches are capped by item count and total functions."""
+    interactions = [
+        MockInteraction(i, "A", "B", {"functions": [{"description": "f"}] * n})
+        for i, n in enumerate([30, 1, 0, 30, 2, 30, 1])
+    ]
+    batches = _pack_batches(interactions, max_items=3, max_functions=61)
+
+    assert sorted(item.id for batch in batches for item in batch) == list(range(7))
+    assert [[item.id for item in batch] for batch in batches] == [[0, 3], [5, 4, 1], [2, 6]]
+    print("[OK] test_pack_batches_respects_function_budget")
+
+
+def test_call_step2_llm_caches_only_validated_responses():
+    """Test that a malformed answer is never stored and the validated retry is."""
+    good = {"assignments": [{"interaction_id": "1", "function_pathways": []}]}
+    answers = [{"oops": True}, good]
+    saved = (step2._call_gemini_json, step2.RESPONSE_CACHE, step2.RESPONSE_CACHE_ENABLED)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ResponseCache(Path(tmpdir) / "responses.sqlite")
+        step2._call_gemini_json = lambda prompt, **kwargs: answers.pop(0)
+        step2.RESPONSE_CACHE, step2.RESPONSE_CACHE_ENABLED = cache, True
+        try:
+            assert _call_step2_llm("prompt", 8192, 0.2, cache=True, check_shape=_check_batch_shape) == good
+            assert cache.get("prompt", 0.2, 8192) == good
+            # Served from the cache: no answers left for a live call
+            assert _call_step2_llm("prompt", 8192, 0.2, cache=True, check_shape=_check_batch_shape) == good
+        finally:
+            step2._call_gemini_json, step2.RESPONSE_CACHE, step2.RESPONSE_CACHE_ENABLED = saved
+    print("[OK] test_call_step2_llm_caches_only_validated_responses")
+
+
+def test_call_step2_llm_does_not_cache_malformed_responses():
+    """Test that a response still malformed after the retry is not stored."""
+    saved = (step2._call_gemini_json, step2.RESPONSE_CACHE, step2.RESPONSE_CACHE_ENABLED)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ResponseCache(Path(tmpdir) / "responses.sqlite")
+        step2._call_gemini_json = lambda prompt, **kwargs: {"oops": True}
+        step2.RESPONSE_CACHE, step2.RESPONSE_CACHE_ENABLED = cache, True
+        try:
+            assert _call_step2_llm("prompt", 8192, 0.2, cache=True, check_shape=_check_batch_shape) == {}
+            assert cache.get("prompt", 0.2, 8192) is None
+        finally:
+            step2._call_gemini_json, step2.RESPONSE_CACHE, step2.RESPONSE_CACHE_ENABLED = saved
+    print("[OK] test_call_step2_llm_does_not_cache_malformed_responses")
+
+
+def test_commit_results_keeps_loaded_interactions_fresh():
+    """Test that a per-batch commit doesn't expire the batch, so reading ids/data costs no SELECTs."""
+    from flask import Flask
+    from sqlalchemy import event
+    from models import db, Protein, Interaction
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[Protein.__table__, Interaction.__table__])
+        proteins = [Protein(symbol=f"P{i}") for i in range(6)]
+        db.session.add_all(proteins)
+        db.session.flush()
+        db.session.add_all([
+            Interaction(protein_a_id=proteins[i].id, protein_b_id=proteins[i + 1].id,
+                        data={"functions": [{"description": f"f{i}"}]})
+            for i in range(5)
+        ])
+        db.session.commit()
+
+        batch = Interaction.query.order_by(Interaction.id).all()
+        results = {
+            str(item.id): {"function_pathways": [{"function_index": 0, "pathway": "Autophagy"}],
+                           "primary_pathway": "Autophagy"}
+            for item in batch[:3]
+        }
+        assert _commit_results(batch, results, db) == 3
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+        ids = [str(item.id) for item in batch]
+        proposals = [item.data.get('step2_proposal') for item in batch]
+
+        assert statements == []
+        assert ids == [str(i) for i in range(1, 6)]
+        assert proposals == ["Autophagy"] * 3 + [None] * 2
+        assert db.session().expire_on_commit
+    print("[OK] test_commit_results_keeps_loaded_interactions_fresh")
+
+
 if __name__ == "__main__":
     print("\n" + "="*60)
     print("Step 2 Function-Level Pathway Assignment - Unit Tests")
@@ -166,6 +284,11 @@ if __name__ == "__main__":
     test_extract_pathways_from_result_functions_only()
     test_extract_pathways_from_result_full()
     test_extract_pathways_handles_none_values()
+    test_pathway_index_formatted_updates_on_new_name()
+    test_pack_batches_respects_function_budget()
+    test_call_step2_llm_caches_only_validated_responses()
+    test_call_step2_llm_does_not_cache_malformed_responses()
+    test_commit_results_keeps_loaded_interactions_fresh()
 
     print("\n" + "="*60)
     print("[OK] ALL TESTS PASSED")
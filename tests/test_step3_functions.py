@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 """Tests for step3_refine_pathways pure functions."""
 
+import os
 import sys
 from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from scripts.pathway_v2.step3_refine_pathways import _format_interaction_for_step3
+from types import SimpleNamespace
+
+import scripts.pathway_v2.llm_utils as llm_utils
+from scripts.pathway_v2.step3_refine_pathways import _format_interaction_for_step3, _run_batches_offline
 
 class MockInteraction:
     def __init__(self, id, data):
@@ -46,8 +50,92 @@ def test_format_interaction_no_data():
     assert 'Unknown' in result
     print("[OK] test_format_interaction_no_data")
 
+class StubBatches:
+    """Stand-in for client.batches: the job reports `states` in turn, then `responses`."""
+    def __init__(self, states, responses):
+        self.states = list(states)
+        self.responses = responses
+        self.cancelled = False
+        self.submitted = None
+
+    def _job(self):
+        state = self.states.pop(0) if len(self.states) > 1 else self.states[0]
+        dest = SimpleNamespace(inlined_responses=[
+            SimpleNamespace(response=SimpleNamespace(text=text)) for text in self.responses
+        ])
+        return SimpleNamespace(name="batches/stub", state=SimpleNamespace(name=state), dest=dest)
+
+    def create(self, model, src, config):
+        self.submitted = src
+        return self._job()
+
+    def get(self, name):
+        return self._job()
+
+    def cancel(self, name):
+        self.cancelled = True
+
+def _run_offline_with_stub(batches, stub, release=None, monotonic=None):
+    """Run _run_batches_offline against `stub` without sleeping or a real API key."""
+    saved = (llm_utils._get_client, llm_utils.time.sleep, llm_utils.time.monotonic, os.environ.get('GOOGLE_API_KEY'))
+    llm_utils._get_client = lambda api_key: SimpleNamespace(batches=stub)
+    llm_utils.time.sleep = lambda seconds: None
+    llm_utils.time.monotonic = monotonic or saved[2]
+    os.environ['GOOGLE_API_KEY'] = 'test'
+    try:
+        return _run_batches_offline(batches, "ctx", release=release)
+    finally:
+        llm_utils._get_client, llm_utils.time.sleep, llm_utils.time.monotonic = saved[:3]
+        if saved[3] is None:
+            del os.environ['GOOGLE_API_KEY']
+        else:
+            os.environ['GOOGLE_API_KEY'] = saved[3]
+
+def test_run_batches_offline_success():
+    """Test that a succeeded job maps each response back to its batch."""
+    batches = [
+        [MockInteraction(1, {'step2_proposal': 'A'}), MockInteraction(2, {'step2_proposal': 'B'})],
+        [MockInteraction(3, {'step2_proposal': 'C'})],
+    ]
+    stub = StubBatches(["JOB_STATE_RUNNING", "JOB_STATE_SUCCEEDED"], [
+        '{"refinements": [{"interaction_id": "1", "primary_pathway": "A1"}, {"interaction_id": "3", "primary_pathway": "X"}]}',
+        '{"refinements": [{"interaction_id": "3", "primary_pathway": "C1"}]}',
+    ])
+    released = []
+    outcomes = _run_offline_with_stub(batches, stub, release=lambda: released.append(stub.submitted))
+
+    assert released == [None]  # released before the job was submitted
+    assert len(stub.submitted) == 2
+    assert outcomes == [
+        {'1': {'function_refinements': [], 'primary_pathway': 'A1'}},
+        {'3': {'function_refinements': [], 'primary_pathway': 'C1'}},
+    ]
+    print("[OK] test_run_batches_offline_success")
+
+def test_run_batches_offline_timeout_cancels_job():
+    """Test that a job still running at max_wait is cancelled and None returned."""
+    stub = StubBatches(["JOB_STATE_RUNNING"], [])
+    clock = iter(range(0, 100 * 3600, 600))  # each status check advances 10 minutes
+    outcomes = _run_offline_with_stub(
+        [[MockInteraction(1, {'step2_proposal': 'A'})]], stub, monotonic=lambda: next(clock)
+    )
+
+    assert outcomes is None
+    assert stub.cancelled
+    print("[OK] test_run_batches_offline_timeout_cancels_job")
+
+def test_run_batches_offline_response_count_mismatch():
+    """Test that a job returning fewer responses than requests yields None."""
+    batches = [[MockInteraction(1, {'step2_proposal': 'A'})], [MockInteraction(2, {'step2_proposal': 'B'})]]
+    stub = StubBatches(["JOB_STATE_SUCCEEDED"], ['{"refinements": []}'])
+    assert _run_offline_with_stub(batches, stub) is None
+    print("[OK] test_run_batches_offline_response_count_mismatch")
+
 if __name__ == "__main__":
     test_format_interaction_with_proposals()
     test_format_interaction_fallback()
     test_format_interaction_no_data()
+    test_run_batches_offline_success()
+    test_run_batches_offline_timeout_cancels_job()
+    test_run_batches_offline_response_count_mismatch()
     print("\nALL TESTS PASSED")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Tests for step6_utils cycle detection."""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.pathway_v2.step6_utils import detect_back_edges
+
+
+def test_detect_back_edges_two_cycle():
+    """Test that a 2-node cycle yields one back-edge between its nodes."""
+    back_edges = detect_back_edges({1: [2], 2: [1]})
+
+    assert len(back_edges) == 1
+    assert back_edges <= {(1, 2), (2, 1)}
+    print("[OK] test_detect_back_edges_two_cycle")
+
+
+def test_detect_back_edges_three_cycle():
+    """Test that a 3-node cycle yields exactly one back-edge on the cycle."""
+    back_edges = detect_back_edges({1: [2], 2: [3], 3: [1]})
+
+    assert len(back_edges) == 1
+    assert back_edges <= {(1, 2), (2, 3), (3, 1)}
+    print("[OK] test_detect_back_edges_three_cycle")
+
+
+def test_detect_back_edges_diamond_dag():
+    """Test that a diamond (two paths to the same ancestor) is not reported as a cycle."""
+    # child -> parents: 4 has parents 2 and 3, both of which have parent 1
+    assert detect_back_edges({4: [2, 3], 2: [1], 3: [1], 1: []}) == set()
+    print("[OK] test_detect_back_edges_diamond_dag")
+
+
+if __name__ == "__main__":
+    test_detect_back_edges_two_cycle()
+    test_detect_back_edges_three_cycle()
+    test_detect_back_edges_diamond_dag()
+    print("All tests passed!")